@@ -0,0 +1,234 @@
+"""
+Comment CRUD Operations Module.
+
+This module provides functions for performing CRUD operations on the 'comments' table.
+
+Functions:
+    - create_comment: Create a new comment on a post.
+    - read_comment: Retrieve a list of comments on a post.
+    - read_latest_comments: Retrieve the latest comments of many posts in one query.
+    - delete_comment_by_id: Delete a comment by comment ID, post ID and user ID.
+
+Usage:
+    - Import the functions as needed.
+    - Use these functions to interact with the 'comments' table in the database.
+
+Example:
+    from api.cruds.comment import create_comment, read_comment, read_latest_comments
+    from api.schemas.comment import CommentCreate
+    from api.utils.pagination import PageQuery
+
+    async with get_db() as session:
+        # Example: Comment on post 1 of user 1 as user 2
+        created_comment = await create_comment(
+            session,
+            comment_create=CommentCreate(contents="Nice"),
+            post_user_id=1,
+            post_id=1,
+            user_id=2,
+        )
+
+        # Example: Read one page of comments on post 1 of user 1
+        comments_page = await read_comment(
+            session, post_user_id=1, post_id=1, page=PageQuery(limit=20)
+        )
+
+        # Example: Read the 3 latest comments of each post on a page
+        comments_by_post = await read_latest_comments(session, post_ids=[1, 2], limit=3)
+
+        # Example: Delete a comment written by user 2
+        deleted = await delete_comment_by_id(session, comment_id=1, post_id=1, user_id=2)
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.engine import Result
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import api.schemas.comment as comment_schema
+from api.cruds import counter
+from api.models import model
+from api.utils.pagination import PageQuery
+
+
+async def create_comment(
+    db: AsyncSession,
+    comment_create: comment_schema.CommentCreate,
+    post_user_id: int,
+    post_id: int,
+    user_id: int,
+) -> Optional[comment_schema.CommentCreateResponse]:
+    """
+    Create a new comment on a post.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        comment_create (comment_schema.CommentCreate): Comment data for creation.
+        post_user_id (int): ID of the user who created the post.
+        post_id (int): ID of the post to comment on.
+        user_id (int): ID of the user creating the comment.
+
+    Returns:
+        Optional[comment_schema.CommentCreateResponse]: Created comment data,
+            or None if the post was not found or was deleted concurrently.
+    """
+    result: Result = await db.execute(
+        select(
+            exists().where(
+                model.Post.post_id == post_id, model.Post.user_id == post_user_id
+            )
+        )
+    )
+    if not result.scalar():
+        return None
+
+    values = {"user_id": user_id, "post_id": post_id, **comment_create.model_dump()}
+    try:
+        await counter.add_comment_count(db, user_id=user_id, delta=1)
+        result = await db.execute(insert(model.Comment.__table__).values(**values))
+        await db.commit()
+    except IntegrityError:
+        # The post was deleted after the existence check.
+        await db.rollback()
+        return None
+    return comment_schema.CommentCreateResponse(
+        comment_id=result.inserted_primary_key[0], **values
+    )
+
+
+async def read_comment(
+    db: AsyncSession,
+    post_user_id: int,
+    post_id: int,
+    page: PageQuery = PageQuery(),
+) -> List[Tuple[int, int, int, str]]:
+    """
+    Retrieve a list of comments on a post.
+
+    When 'page.limit' is given, one page is fetched by keyset on comment_id and one
+    extra row is returned so the caller can tell whether another page exists
+    (see api.utils.pagination.paginate). Rows for a 'page.before' cursor are
+    returned in descending comment_id order.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        post_user_id (int): ID of the user who created the post.
+        post_id (int): ID of the post whose comments to retrieve.
+        page (PageQuery): Page size, or None to return every comment, and the
+            comment IDs after or before which to return comments.
+
+    Returns:
+        List[Tuple[int, int, int, str]]: List of comment IDs, user IDs, post IDs
+            and comment contents.
+    """
+    query = select(
+        model.Comment.comment_id,
+        model.Comment.user_id,
+        model.Comment.post_id,
+        model.Comment.contents,
+    ).filter(
+        model.Comment.post_id == post_id,
+        exists().where(
+            model.Post.post_id == post_id, model.Post.user_id == post_user_id
+        ),
+    )
+    if page.after is not None:
+        query = query.filter(model.Comment.comment_id > page.after)
+    if page.before is not None:
+        query = query.filter(model.Comment.comment_id < page.before).order_by(
+            model.Comment.comment_id.desc()
+        )
+    else:
+        query = query.order_by(model.Comment.comment_id)
+    if page.limit is not None:
+        query = query.limit(page.limit + 1)
+
+    result: Result = await db.execute(query)
+    return result.all()
+
+
+async def read_latest_comments(
+    db: AsyncSession, post_ids: Sequence[int], limit: int
+) -> Dict[int, List[Tuple[int, int, int, str]]]:
+    """
+    Retrieve the latest comments of many posts in one query.
+
+    The comments of every post are fetched together with an IN query, ranked
+    per post by a window function, so the number of queries does not grow
+    with the number of posts.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        post_ids (Sequence[int]): IDs of the posts whose comments to retrieve.
+        limit (int): Maximum number of comments per post.
+
+    Returns:
+        Dict[int, List[Tuple[int, int, int, str]]]: Comments of each post in
+            ascending comment_id order, keyed by post ID. Posts without
+            comments map to an empty list.
+    """
+    comments: Dict[int, List[Tuple[int, int, int, str]]] = {
+        post_id: [] for post_id in post_ids
+    }
+    if not post_ids:
+        return comments
+
+    ranked = (
+        select(
+            model.Comment.comment_id,
+            model.Comment.user_id,
+            model.Comment.post_id,
+            model.Comment.contents,
+            func.row_number()
+            .over(
+                partition_by=model.Comment.post_id,
+                order_by=model.Comment.comment_id.desc(),
+            )
+            .label("comment_rank"),
+        )
+        .filter(model.Comment.post_id.in_(post_ids))
+        .subquery()
+    )
+    result: Result = await db.execute(
+        select(
+            ranked.c.comment_id, ranked.c.user_id, ranked.c.post_id, ranked.c.contents
+        )
+        .filter(ranked.c.comment_rank <= limit)
+        .order_by(ranked.c.post_id, ranked.c.comment_id)
+    )
+    for row in result:
+        comments[row.post_id].append(row)
+    return comments
+
+
+async def delete_comment_by_id(
+    db: AsyncSession, comment_id: int, post_id: int, user_id: int
+) -> bool:
+    """
+    Delete a comment by comment ID, post ID and user ID without loading it.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        comment_id (int): ID of the comment to delete.
+        post_id (int): ID of the post the comment is on.
+        user_id (int): ID of the user who created the comment.
+
+    Returns:
+        bool: True if the comment was deleted, False if it was not found.
+    """
+    result: Result = await db.execute(
+        delete(model.Comment)
+        .where(
+            model.Comment.comment_id == comment_id,
+            model.Comment.post_id == post_id,
+            model.Comment.user_id == user_id,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        return False
+    await counter.add_comment_count(db, user_id=user_id, delta=-1)
+    await db.commit()
+    return True
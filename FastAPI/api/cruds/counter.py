@@ -0,0 +1,181 @@
+"""
+User Counter Operations Module.
+
+This module maintains the denormalized 'post_count' and 'comment_count'
+columns of the 'users' table, so that a user's counts are read from their
+row instead of counting their posts and comments. The counters change with
+every post and comment, so they are not covered by the version stamp of
+GET /users (see api.cruds.version); that listing derives its ETag from the
+response instead when it returns them.
+
+Functions:
+    - add_post_count: Add to a user's post count.
+    - add_comment_count: Add to a user's comment count.
+    - subtract_comment_counts: Subtract comments about to be deleted from their authors' counts.
+    - reconcile_counts: Recount the counters of every user in batches, repairing drift.
+
+Constants:
+    - RECONCILE_BATCH_SIZE: Number of users recounted per transaction.
+
+Usage:
+    - Call the add and subtract functions in the transaction of the write they
+      account for, before committing it. They do not commit.
+    - Call the add functions before inserting the posts or comments they
+      count. The INSERT's foreign key check share-locks the user's row, and
+      two concurrent inserts for one user would then deadlock upgrading that
+      lock for the counter UPDATE; updating first takes the exclusive lock
+      up front.
+    - Run 'reconcile_counts' periodically, see api.reconcile_counts.
+
+Example:
+    from api.cruds import counter
+
+    await counter.add_post_count(db, user_id=1, delta=1)
+    await db.execute(insert(model.Post.__table__).values(**values))
+    await db.commit()
+
+    repaired = await counter.reconcile_counts(db, batch_size=1000, pause=0.1)
+"""
+import asyncio
+from typing import Any
+
+from sqlalchemy import func, select, update
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models import model
+
+RECONCILE_BATCH_SIZE = 1000
+
+
+async def add_post_count(db: AsyncSession, user_id: int, delta: int) -> None:
+    """
+    Add to a user's post count.
+
+    The version stamp of the user's posts is bumped in the same statement, so
+    creating or deleting posts needs no separate bump_posts_version call.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        user_id (int): ID of the user.
+        delta (int): Number of posts created, negative for deleted posts.
+
+    Returns:
+        None
+    """
+    await db.execute(
+        update(model.User)
+        .where(model.User.user_id == user_id)
+        .values(
+            post_count=model.User.post_count + delta,
+            posts_version=model.User.posts_version + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def add_comment_count(db: AsyncSession, user_id: int, delta: int) -> None:
+    """
+    Add to a user's comment count.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        user_id (int): ID of the user.
+        delta (int): Number of comments created, negative for deleted comments.
+
+    Returns:
+        None
+    """
+    await db.execute(
+        update(model.User)
+        .where(model.User.user_id == user_id)
+        .values(comment_count=model.User.comment_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def subtract_comment_counts(db: AsyncSession, where: Any) -> None:
+    """
+    Subtract comments about to be deleted from their authors' counts.
+
+    Used before deletions that remove other users' comments, such as the
+    comments cascaded by deleting a post. One statement updates every author.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        where (Any): Condition on model.Comment selecting the comments.
+
+    Returns:
+        None
+    """
+    deleted = (
+        select(func.count())  # pylint: disable=not-callable
+        .select_from(model.Comment)
+        .where(where, model.Comment.user_id == model.User.user_id)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(model.User)
+        .where(model.User.user_id.in_(select(model.Comment.user_id).where(where)))
+        .values(comment_count=model.User.comment_count - deleted)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def reconcile_counts(
+    db: AsyncSession, batch_size: int = RECONCILE_BATCH_SIZE, pause: float = 0.0
+) -> int:
+    """
+    Recount the counters of every user in batches, repairing drift.
+
+    Users are walked in user_id order. Each batch is recounted with one
+    UPDATE of the rows whose counters differ from the actual counts and
+    committed on its own, followed by a sleep of 'pause' seconds.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        batch_size (int): Number of users recounted per transaction.
+        pause (float): Seconds to sleep between batches.
+
+    Returns:
+        int: Number of users whose counters were repaired.
+    """
+    posts = (
+        select(func.count())  # pylint: disable=not-callable
+        .select_from(model.Post)
+        .where(model.Post.user_id == model.User.user_id)
+        .scalar_subquery()
+    )
+    comments = (
+        select(func.count())  # pylint: disable=not-callable
+        .select_from(model.Comment)
+        .where(model.Comment.user_id == model.User.user_id)
+        .scalar_subquery()
+    )
+    repaired = 0
+    after = 0
+    while True:
+        result: Result = await db.execute(
+            select(model.User.user_id)
+            .where(model.User.user_id > after)
+            .order_by(model.User.user_id)
+            .limit(batch_size)
+        )
+        user_ids = result.scalars().all()
+        if not user_ids:
+            return repaired
+        result = await db.execute(
+            update(model.User)
+            .where(
+                model.User.user_id.between(user_ids[0], user_ids[-1]),
+                (model.User.post_count != posts)
+                | (model.User.comment_count != comments),
+            )
+            .values(post_count=posts, comment_count=comments)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        repaired += result.rowcount
+        after = user_ids[-1]
+        if pause:
+            await asyncio.sleep(pause)
@@ -5,18 +5,42 @@ This module provides functions for performing CRUD (Create, Read, Update, Delete
 
 Functions:
     - create_post: Create a new post in the database.
+    - bulk_create_post: Create many posts in a single transaction.
     - read_post: Retrieve a list of posts by user ID from the database.
     - get_post: Retrieve a post by post ID and user ID from the database.
     - update_post: Update an existing post in the database.
+    - update_post_by_id: Update a post by post ID and user ID in a single statement.
     - delete_post: Delete an existing post from the database.
+    - delete_post_by_id: Delete a post by post ID and user ID without loading it.
+    - post_events_channel: Return the pub/sub channel of a user's post events.
+    - invalidate_post_cache: Invalidate the cached posts of a user.
+    - set_post_cache_backend: Replace the backend of the post cache.
+    - get_post_cache_stats: Report the hit rate and size of the post cache.
+    - clear_post_cache: Invalidate every cached post list.
+
+Constants:
+    - POST_CACHE_SIZE: Maximum number of cached post lists.
+    - POST_CACHE_MAX_BYTES: Maximum estimated memory of the cached post lists.
+    - POST_CACHE_TTL_SECONDS: Lifetime of a cached post list in seconds.
 
 Usage:
     - Import the functions as needed.
     - Use these functions to interact with the 'posts' table in the database.
+    - The write functions publish an event on the user's post events channel
+      after committing (see api.utils.pubsub): "created", "bulk_created",
+      "updated" or "deleted".
+
+Note:
+    read_post is served from a read-through cache of each user's post lists
+    (see api.utils.result_cache). The write functions invalidate the user's
+    lists after committing. The default backend is in-process: other worker
+    processes see a write within POST_CACHE_TTL_SECONDS, and results read
+    from a lagging replica are cached as well, separately from the primary.
 
 Example:
     from api.cruds.post import create_post, read_post, get_user_by_id, get_post, update_post, delete_post
     from api.schemas.post import PostCreate
+    from api.utils.pagination import PageQuery
     from sqlalchemy.ext.asyncio import AsyncSession
 
     async with AsyncSession() as session:
@@ -24,9 +48,19 @@ Example:
         new_post_data = PostCreate(contents="Example post contents")
         created_post = await create_post(session, post_create=new_post_data, user_id=1)
 
+        # Example: Create many posts at once
+        post_ids = await bulk_create_post(
+            session, post_creates=[new_post_data, new_post_data], user_id=1
+        )
+
         # Example: Read posts by user ID
         posts_list = await read_post(session, user_id=1)
 
+        # Example: Read one page of posts after post ID 10
+        posts_page = await read_post(
+            session, user_id=1, page=PageQuery(limit=20, after=10)
+        )
+
         # Example: Get user by ID
         user_by_id = await get_user_by_id(session, user_id=1)
 
@@ -35,61 +69,184 @@ Example:
 
         # Example: Update post
         updated_post_data = PostCreate(contents="Updated post contents")
-        updated_post = await update_post(session, original=created_post, post_create=updated_post_data)
+        updated_post = await update_post(session, original=post_by_id, post_create=updated_post_data)
 
         # Example: Delete post
         await delete_post(session, original=updated_post)
+
+        # Example: Update and delete posts without loading them first
+        updated = await update_post_by_id(
+            session, post_id=1, user_id=1, post_create=updated_post_data
+        )
+        deleted = await delete_post_by_id(session, post_id=1, user_id=1)
+
+    # Example: Receive the events of user 1's posts
+    subscription = get_broker().subscribe(post_events_channel(1))
 """
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import delete, exists, insert, select, update
 from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import api.schemas.post as post_schema
+from api.cruds import counter, version
 from api.models import model
+from api.utils import CacheBackend, InProcessCacheBackend, ResultCache
+from api.utils.pagination import PageQuery
+from api.utils.pubsub import get_broker
+
+POST_CACHE_SIZE = 10000
+POST_CACHE_MAX_BYTES = 64 * 1024 * 1024
+POST_CACHE_TTL_SECONDS = 60
+
+_post_cache = ResultCache(
+    InProcessCacheBackend(
+        max_size=POST_CACHE_SIZE,
+        ttl=POST_CACHE_TTL_SECONDS,
+        max_bytes=POST_CACHE_MAX_BYTES,
+    )
+)
 
 
 async def create_post(
     db: AsyncSession, post_create: post_schema.PostCreate, user_id: int
-) -> model.Post:
+) -> post_schema.PostCreateResponse:
     """
     Create a new post in the database.
 
+    The generated post_id is taken from the INSERT itself (RETURNING or the
+    cursor's lastrowid, depending on the dialect), so the row is not read back.
+
     Args:
         db (AsyncSession): AsyncSQLAlchemy session.
         post_create (post_schema.PostCreate): Post data for creation.
         user_id (int): ID of the user creating the post.
 
     Returns:
-        model.Post: Created post data.
+        post_schema.PostCreateResponse: Created post data.
     """
-    post = model.Post(user_id=user_id, **post_create.model_dump())
-    db.add(post)
-    await db.flush()
+    values = {"user_id": user_id, **post_create.model_dump()}
+    await counter.add_post_count(db, user_id=user_id, delta=1)
+    result: Result = await db.execute(insert(model.Post.__table__).values(**values))
     await db.commit()
-    await db.refresh(post)
+    post = post_schema.PostCreateResponse(
+        post_id=result.inserted_primary_key[0], **values
+    )
+    await _posts_changed("created", **post.model_dump())
     return post
 
 
-async def read_post(db: AsyncSession, user_id: int) -> List[Tuple[int, int, str]]:
+async def bulk_create_post(
+    db: AsyncSession, post_creates: List[post_schema.PostCreate], user_id: int
+) -> List[int]:
+    """
+    Create many posts in a single transaction.
+
+    Where the dialect can return keys from a batched INSERT, the posts are
+    inserted with RETURNING in parameter order. Otherwise, as on MySQL, they
+    are inserted with one multi-row INSERT, and the IDs are the consecutive
+    values from the first generated ID. InnoDB allocates consecutive values
+    to a multi-row INSERT whose row count is known in advance, under every
+    innodb_autoinc_lock_mode, assuming auto_increment_increment is 1.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        post_creates (List[post_schema.PostCreate]): Post data for creation.
+        user_id (int): ID of the user creating the posts.
+
+    Returns:
+        List[int]: IDs of the created posts, in the order of 'post_creates'.
+    """
+    table = model.Post.__table__
+    rows = [{"user_id": user_id, **post.model_dump()} for post in post_creates]
+    dialect = db.get_bind().dialect
+    await counter.add_post_count(db, user_id=user_id, delta=len(rows))
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        result: Result = await db.execute(
+            insert(table).returning(table.c.post_id, sort_by_parameter_order=True),
+            rows,
+        )
+        post_ids = list(result.scalars())
+    else:
+        result = await db.execute(insert(table).values(rows))
+        post_ids = list(range(result.lastrowid, result.lastrowid + len(rows)))
+    await db.commit()
+    await _posts_changed("bulk_created", user_id=user_id, post_ids=post_ids)
+    return post_ids
+
+
+async def read_post(
+    db: AsyncSession,
+    user_id: int,
+    page: PageQuery = PageQuery(),
+    fields: Optional[Sequence[str]] = None,
+    version: Optional[int] = None,
+) -> List[Tuple[int, int, str]]:
     """
     Retrieve a list of posts by user ID from the database.
 
+    When 'page.limit' is given, one page is fetched by keyset on post_id and
+    one extra row is returned so the caller can tell whether another page exists
+    (see api.utils.pagination.paginate). Rows for a 'page.before' cursor are
+    returned in descending post_id order. No posts are returned for a user
+    whose account deletion is pending.
+
+    Results are cached per user until the user's posts change. Concurrent
+    cache misses with the same arguments share one query (see
+    api.utils.result_cache).
+
     Args:
         db (AsyncSession): AsyncSQLAlchemy session.
         user_id (int): ID of the user whose posts to retrieve.
+        page (PageQuery): Page size, or None to return every post, and the
+            post IDs after or before which to return posts.
+        fields (Optional[Sequence[str]]): Names of the columns to select, every
+            column of post_schema.POST_FIELDS if None.
+        version (Optional[int]): Version stamp of the user's posts read by the
+            caller before this call (see api.cruds.version). Only calls passing
+            the same stamp share a query or a cached result, so the rows are
+            never older than it.
 
     Returns:
         List[Tuple[int, int, str]]: List of tuples containing post IDs, user IDs, and post contents.
     """
-    result: Result = await db.execute(
-        select(
-            model.Post.post_id,
-            model.Post.user_id,
-            model.Post.contents,
-        ).filter(model.Post.user_id == user_id)
+    # Primary and replica results are cached apart, so a lagging replica
+    # cannot hide a client's own writes from it.
+    key = (str(db.get_bind().url), page, fields and tuple(fields), version)
+    return await _post_cache.get_or_load(
+        str(user_id),
+        key,
+        lambda: _query_posts(db=db, user_id=user_id, page=page, fields=fields),
     )
+
+
+async def _query_posts(
+    db: AsyncSession,
+    user_id: int,
+    page: PageQuery,
+    fields: Optional[Sequence[str]],
+) -> List[Tuple[int, int, str]]:
+    query = select(
+        *(getattr(model.Post, field) for field in fields or post_schema.POST_FIELDS)
+    ).filter(
+        model.Post.user_id == user_id,
+        ~exists().where(
+            model.User.user_id == user_id, model.User.deleted_at.is_not(None)
+        ),
+    )
+    if page.after is not None:
+        query = query.filter(model.Post.post_id > page.after)
+    if page.before is not None:
+        query = query.filter(model.Post.post_id < page.before).order_by(
+            model.Post.post_id.desc()
+        )
+    else:
+        query = query.order_by(model.Post.post_id)
+    if page.limit is not None:
+        query = query.limit(page.limit + 1)
+
+    result: Result = await db.execute(query)
     return result.all()
 
 
@@ -132,11 +289,68 @@ async def update_post(
     """
     original.contents = post_create.contents
     db.add(original)
+    await version.bump_posts_version(db, user_id=original.user_id)
     await db.commit()
     await db.refresh(original)
+    await _posts_changed(
+        "updated",
+        post_id=original.post_id,
+        user_id=original.user_id,
+        contents=original.contents,
+    )
     return original
 
 
+async def update_post_by_id(
+    db: AsyncSession, post_id: int, user_id: int, post_create: post_schema.PostCreate
+) -> Optional[post_schema.PostCreateResponse]:
+    """
+    Update a post by post ID and user ID in a single statement.
+
+    The post is not loaded beforehand. The updated row is read back with
+    RETURNING where the dialect supports it; otherwise the response is built
+    from the known values once the affected row count confirms the update.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        post_id (int): ID of the post to update.
+        user_id (int): ID of the user who created the post.
+        post_create (post_schema.PostCreate): Updated post data.
+
+    Returns:
+        Optional[post_schema.PostCreateResponse]: Updated post data, or None if not found.
+    """
+    query = (
+        update(model.Post)
+        .where(model.Post.post_id == post_id, model.Post.user_id == user_id)
+        .values(**post_create.model_dump())
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.update_returning:
+        result: Result = await db.execute(
+            query.returning(model.Post.post_id, model.Post.user_id, model.Post.contents)
+        )
+        row = result.first()
+        if row is None:
+            await db.commit()
+            return None
+        await version.bump_posts_version(db, user_id=user_id)
+        await db.commit()
+        post = post_schema.PostCreateResponse.model_validate(row)
+    else:
+        result = await db.execute(query)
+        if result.rowcount == 0:
+            await db.commit()
+            return None
+        await version.bump_posts_version(db, user_id=user_id)
+        await db.commit()
+        post = post_schema.PostCreateResponse(
+            post_id=post_id, user_id=user_id, **post_create.model_dump()
+        )
+    await _posts_changed("updated", **post.model_dump())
+    return post
+
+
 async def delete_post(db: AsyncSession, original: model.Post) -> None:
     """
     Delete an existing post from the database.
@@ -148,5 +362,118 @@ async def delete_post(db: AsyncSession, original: model.Post) -> None:
     Returns:
         None
     """
+    post_id = original.post_id
+    user_id = original.user_id
+    await counter.subtract_comment_counts(db, model.Comment.post_id == post_id)
+    await counter.add_post_count(db, user_id=user_id, delta=-1)
     await db.delete(original)
     await db.commit()
+    await _posts_changed("deleted", post_id=post_id, user_id=user_id)
+
+
+async def delete_post_by_id(db: AsyncSession, post_id: int, user_id: int) -> bool:
+    """
+    Delete a post by post ID and user ID without loading it.
+
+    Comments on the post are deleted by the database (ON DELETE CASCADE),
+    after being subtracted from their authors' comment counts.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        post_id (int): ID of the post to delete.
+        user_id (int): ID of the user who created the post.
+
+    Returns:
+        bool: True if the post was deleted, False if it was not found.
+    """
+    await counter.subtract_comment_counts(
+        db,
+        model.Comment.post_id.in_(
+            select(model.Post.post_id).where(
+                model.Post.post_id == post_id, model.Post.user_id == user_id
+            )
+        ),
+    )
+    result: Result = await db.execute(
+        delete(model.Post)
+        .where(model.Post.post_id == post_id, model.Post.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await db.commit()
+        return False
+    await counter.add_post_count(db, user_id=user_id, delta=-1)
+    await db.commit()
+    await _posts_changed("deleted", post_id=post_id, user_id=user_id)
+    return True
+
+
+def post_events_channel(user_id: int) -> str:
+    """
+    Return the pub/sub channel of a user's post events.
+
+    Args:
+        user_id (int): ID of the user who created the posts.
+
+    Returns:
+        str: Name of the channel.
+    """
+    return f"posts:{user_id}"
+
+
+async def invalidate_post_cache(user_id: int) -> None:
+    """
+    Invalidate the cached posts of a user.
+
+    Call it after committing a change to what read_post returns for the user
+    outside of this module, such as the deletion of the user.
+
+    Args:
+        user_id (int): ID of the user.
+
+    Returns:
+        None
+    """
+    await _post_cache.invalidate(str(user_id))
+
+
+def set_post_cache_backend(backend: CacheBackend) -> None:
+    """
+    Replace the backend of the post cache, e.g. with one shared by every worker.
+
+    Call it on startup, before the first request.
+
+    Args:
+        backend (CacheBackend): The new backend.
+
+    Returns:
+        None
+    """
+    _post_cache.backend = backend
+
+
+def get_post_cache_stats() -> Dict[str, Any]:
+    """
+    Report the hit rate and size of the post cache.
+
+    Returns:
+        Dict[str, Any]: Hits, misses, hit rate, invalidations and backend size.
+    """
+    return _post_cache.stats()
+
+
+def clear_post_cache() -> None:
+    """
+    Invalidate every cached post list and reset the counters.
+
+    Returns:
+        None
+    """
+    _post_cache.clear()
+
+
+async def _posts_changed(event: str, user_id: int, **data: Any) -> None:
+    await invalidate_post_cache(user_id)
+    await get_broker().publish(
+        post_events_channel(user_id), {"event": event, "user_id": user_id, **data}
+    )
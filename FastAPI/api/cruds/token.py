@@ -7,11 +7,18 @@ Constants:
     - SECRET_KEY: Secret key used for JWT encoding and decoding.
     - ALGORITHM: JWT encoding algorithm.
     - ACCESS_TOKEN_EXPIRE_MINUTES: Expiration time for access tokens in minutes.
+    - STATELESS_AUTH: Authorize requests from the token claims without loading the user.
+    - DECODED_TOKEN_CACHE_SIZE: Maximum number of cached verified token payloads.
 
 Functions:
     - create_access_token: Generate a new JWT access token.
+    - decode_access_token: Verify and decode a JWT access token, using a cache.
+    - get_decoded_token_cache_stats: Report the size and hit/miss counters of the cache.
+    - clear_decoded_token_cache: Invalidate every cached token payload.
     - get_current_user: Get the current authenticated user based on the provided JWT token.
-    - get_user_by_name: Retrieve a user by their name from the database.
+    - get_current_db_user: Get the current authenticated user as a database model.
+    - get_token_version: Retrieve the current token version of a user.
+    - get_user_by_name: Retrieve a user by their name, see api.cruds.user.
 
 Usage:
     - Import the functions and constants as needed.
@@ -21,6 +28,7 @@ Example:
     from api.schemas.oauth2 import oauth2_scheme
     from api.cruds.token import create_access_token, get_current_user, get_user_by_name
     from api.db import get_db
+    from api.utils.hash_service import hash_service
     from fastapi import Depends, FastAPI, HTTPException, status
     from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -31,9 +39,10 @@ Example:
         auth_info: token_schema.Token, db: AsyncSession = Depends(get_db)
     ):
         user = await get_user_by_name(db=db, user_name=auth_info.username)
-        password_hash = HashGenerator().hash_string(auth_info.password)
-        if user.password_hash == password_hash:
-            access_token = create_access_token(data={"sub": auth_info.username})
+        if user and await hash_service.verify(auth_info.password, user.password_hash):
+            access_token = create_access_token(
+                data={"sub": user.user_name, "uid": user.user_id, "ver": user.token_version}
+            )
             return {
                 "access_token": access_token,
                 "token_type": "bearer",
@@ -43,24 +52,44 @@ Example:
     @app.get("/get-current-user", dependencies=[Depends(get_current_user)])
     async def get_current_usermodel(auth_user: user_schema.User):
         return {"message": auth_user.user_name}
+
+Note:
+    When STATELESS_AUTH is enabled, tokens carrying "uid" and "ver" claims are
+    authorized by comparing "ver" with the user's token version, read through
+    the user cache of api.cruds.user. update_user bumps the version, so
+    tokens issued before an update are rejected: at once by the worker that
+    made the update, and within USER_CACHE_TTL_SECONDS of api.cruds.user by
+    the other workers.
+
+    Verified token payloads are cached by token string until the token's "exp",
+    so a client reusing its bearer token skips signature verification.
 """
+import os
+import time
 from datetime import datetime, timedelta
-from typing import Annotated, Optional, Tuple
+from typing import Annotated, Dict, Optional, Union
 
 from fastapi import Depends, HTTPException, status
 from jose import JWTError, jwt
-from sqlalchemy import select
-from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
 
+import api.cruds.user as user_crud
 import api.schemas.token as token_schema
+import api.schemas.user as user_schema
 from api.db import get_db
 from api.models import model
 from api.schemas.oauth2 import oauth2_scheme
+from api.utils import TTLCache
 
 SECRET_KEY = "your-secret-key"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+STATELESS_AUTH = os.environ.get("STATELESS_AUTH", "false").lower() == "true"
+DECODED_TOKEN_CACHE_SIZE = 10000
+
+_decoded_tokens = TTLCache(
+    max_size=DECODED_TOKEN_CACHE_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
 
 
 def create_access_token(data: dict) -> str:
@@ -80,19 +109,72 @@ def create_access_token(data: dict) -> str:
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> dict:
+    """
+    Verify and decode a JWT access token, using a cache.
+
+    Verified payloads are cached by token string until the token expires, so
+    repeated requests with the same token skip signature verification.
+
+    Args:
+        token (str): Encoded JWT access token.
+
+    Returns:
+        dict: Decoded token payload.
+
+    Raises:
+        JWTError: If the token is invalid or expired.
+    """
+    payload = _decoded_tokens.get(token)
+    if payload is not None:
+        return payload
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    expires = payload.get("exp")
+    if isinstance(expires, (int, float)):
+        _decoded_tokens.set(
+            token, payload, ttl=min(expires - time.time(), _decoded_tokens.ttl)
+        )
+    return payload
+
+
+def get_decoded_token_cache_stats() -> Dict[str, int]:
+    """
+    Report the size and hit/miss counters of the decoded token cache.
+
+    Returns:
+        Dict[str, int]: Current size, hits and misses.
+    """
+    return _decoded_tokens.stats()
+
+
+def clear_decoded_token_cache() -> None:
+    """
+    Invalidate every cached token payload and reset the counters.
+
+    Returns:
+        None
+    """
+    _decoded_tokens.clear()
+
+
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)], db: AsyncSession = Depends(get_db)
-):
+) -> Union[model.User, user_schema.User]:
     """
     Get the current authenticated user based on the provided JWT token.
 
+    When STATELESS_AUTH is enabled and the token carries "uid" and "ver"
+    claims, the user is built from the claims once "ver" matches the cached
+    token version, without loading the user row.
+
     Args:
         token (Annotated[str, Depends(token_schema.oauth2_scheme)]):
             JWT token provided in the request.
         db (AsyncSession): AsyncSQLAlchemy session.
 
     Returns:
-        model.User: Authenticated user data.
+        Union[model.User, user_schema.User]: Authenticated user data.
 
     Raises:
         HTTPException: If authentication fails.
@@ -103,14 +185,30 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         user_name: str = payload.get("sub")
         if user_name is None:
             raise credentials_exception
-        token_data = token_schema.TokenData(user_name=user_name)
-    except JWTError as e:
+        token_data = token_schema.TokenData(
+            user_name=user_name,
+            user_id=payload.get("uid"),
+            token_version=payload.get("ver"),
+        )
+    except (JWTError, ValueError) as e:
         raise credentials_exception from e
 
+    if (
+        STATELESS_AUTH
+        and token_data.user_id is not None
+        and token_data.token_version is not None
+    ):
+        token_version = await get_token_version(db=db, user_id=token_data.user_id)
+        if token_version is None or token_version != token_data.token_version:
+            raise credentials_exception
+        return user_schema.User(
+            user_id=token_data.user_id, user_name=token_data.user_name
+        )
+
     user = await get_user_by_name(db=db, user_name=token_data.user_name)
 
     if user is None:
@@ -118,6 +216,56 @@ async def get_current_user(
     return user
 
 
+async def get_current_db_user(
+    auth_user: Annotated[
+        Union[model.User, user_schema.User], Depends(get_current_user)
+    ],
+    db: AsyncSession = Depends(get_db),
+) -> model.User:
+    """
+    Get the current authenticated user as a database model.
+
+    Use this instead of get_current_user for operations that modify the user
+    row itself, which need the model attached to the request session.
+
+    Args:
+        auth_user (Union[model.User, user_schema.User]): Authenticated user data.
+        db (AsyncSession): AsyncSQLAlchemy session.
+
+    Returns:
+        model.User: Authenticated user data.
+
+    Raises:
+        HTTPException: If the user no longer exists.
+    """
+    if isinstance(auth_user, model.User):
+        return auth_user
+
+    user = await user_crud.get_user_by_id(db=db, user_id=auth_user.user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
+async def get_token_version(db: AsyncSession, user_id: int) -> Optional[int]:
+    """
+    Retrieve the current token version of a user.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        user_id (int): ID of the user.
+
+    Returns:
+        Optional[int]: Token version, or None if the user does not exist.
+    """
+    user = await user_crud.get_user_by_id(db=db, user_id=user_id)
+    return user.token_version if user else None
+
+
 async def get_user_by_name(db: AsyncSession, user_name: str) -> Optional[model.User]:
     """
     Retrieve a user by their name from the database.
@@ -129,8 +277,4 @@ async def get_user_by_name(db: AsyncSession, user_name: str) -> Optional[model.U
     Returns:
         Optional[model.User]: User data if found, otherwise None.
     """
-    result: Result = await db.execute(
-        select(model.User).filter(model.User.user_name == user_name)
-    )
-    user: Optional[Tuple[model.User]] = result.first()
-    return user[0] if user else None  # 要素が一つであってもtupleで返却されるので１つ目の要素を取り出す
+    return await user_crud.get_user_by_name(db=db, user_name=user_name)
@@ -6,11 +6,24 @@ for the 'users' table in the database.
 
 Functions:
     - create_user: Create a new user in the database.
-    - read_user: Retrieve a list of user IDs and names from the database.
+    - import_users: Create many users in batches, skipping conflicting user names.
+    - read_user: Retrieve a list of user IDs, names and post and comment counts.
+    - stream_user: Stream user IDs and names from the database in chunks.
     - get_user_by_id: Retrieve a user by their ID.
     - get_user_by_name: Retrieve a user by their username.
     - update_user: Update user information in the database.
     - delete_user: Delete a user from the database.
+    - request_user_deletion: Soft-delete a user and record a pending purge.
+    - purge_user: Delete a soft-deleted user's comments, posts and row in batches.
+    - get_user_deletion: Retrieve the progress of a user's deletion.
+    - read_pending_user_deletions: Retrieve the IDs of users whose purge is unfinished.
+    - get_user_cache_stats: Report the size and hit/miss counters of the user cache.
+    - clear_user_cache: Invalidate every cached user.
+
+Constants:
+    - USER_CACHE_SIZE: Maximum number of cached users and user names.
+    - USER_CACHE_TTL_SECONDS: Lifetime of a cached lookup in seconds (default 1).
+    - USER_PURGE_BATCH_SIZE: Number of rows deleted per purge transaction.
 
 Usage:
     - Import the functions and use them to interact with the 'users' table.
@@ -25,9 +38,16 @@ Example:
         new_user = UserCreate(user_name="example_user")
         created_user = await create_user(db, user_create=new_user)
 
+        # Create many users, skipping user names that already exist
+        conflicts = await import_users(db, user_creates=[new_user], batch_size=1000)
+
         # Read user data
         user_list = await read_user(db)
 
+        # Stream user data in chunks
+        async for chunk in stream_user(db, chunk_size=1000):
+            ...
+
         # Get user by ID
         retrieved_user = await get_user_by_id(db, user_id=created_user.user_id)
 
@@ -36,17 +56,56 @@ Example:
 
         # Delete user
         await delete_user(db, original=updated_user)
+
+        # Or soft-delete the user now and purge their data in the background
+        deletion = await request_user_deletion(db, original=updated_user)
+        deletion = await purge_user(db, user_id=deletion.user_id)
+
+Note:
+    get_user_by_id and get_user_by_name share an in-process cache indexed by
+    both user_id and user_name. Found users are cached as detached snapshots
+    and merged into the caller's session without a SELECT; lookups of missing
+    users are cached too. create_user, update_user and delete_user write
+    through to the cache of the local process, other worker processes see
+    the change within USER_CACHE_TTL_SECONDS. Concurrent cache misses for the
+    same user share one query (see api.utils.singleflight).
+
+    Authentication reads the user, including the token version that revokes
+    access tokens, through this cache, so USER_CACHE_TTL_SECONDS bounds how
+    long another worker keeps accepting a revoked token or a deleted
+    account. Keep it short: a busy worker still answers most lookups of an
+    active user from the cache.
+
+    Soft-deleted users (deleted_at set) are treated as missing by the lookups
+    and left out of read_user and stream_user until purge_user removes them.
 """
-from typing import List, Optional, Tuple
+import asyncio
+import datetime
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
 
-from sqlalchemy import select, update
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.engine import Result
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 import api.schemas.user as user_schema
+from api.cruds import counter, post, version
 from api.exceptions import IntegrityViolationError
 from api.models import model
+from api.utils import TTLCache
+from api.utils.pagination import PageQuery
+from api.utils.singleflight import coalesce
+
+USER_CACHE_SIZE = 10000
+USER_CACHE_TTL_SECONDS = float(os.environ.get("USER_CACHE_TTL_SECONDS", "1"))
+USER_PURGE_BATCH_SIZE = 1000
+
+_NOT_FOUND = object()
+_UNCACHED = object()
+_users_by_id = TTLCache(max_size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+_user_ids_by_name = TTLCache(max_size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
 
 
 async def create_user(
@@ -55,6 +114,9 @@ async def create_user(
     """
     Create a new user in the database.
 
+    The generated user_id is taken from the INSERT itself (RETURNING or the
+    cursor's lastrowid, depending on the dialect), so the row is not read back.
+
     Args:
         db (AsyncSession): AsyncSQLAlchemy session.
         user_create (user_schema.UserCreate): User creation data.
@@ -66,33 +128,152 @@ async def create_user(
         IntegrityError: If a user with the same username already exists.
     """
     try:
-        user = model.User(**user_create.model_dump())
-        db.add(user)
+        values = {
+            **user_create.model_dump(),
+            "token_version": 0,
+            "post_count": 0,
+            "comment_count": 0,
+        }
+        result: Result = await db.execute(insert(model.User.__table__).values(**values))
+        await version.bump_table_version(db, version.USERS_TABLE)
         await db.commit()
-        await db.refresh(user)
-        return user
     except IntegrityError as e:
         await db.rollback()
         raise IntegrityViolationError from e
+    user = model.User(user_id=result.inserted_primary_key[0], **values)
+    _cache_user(user)
+    return user
 
 
-async def read_user(db: AsyncSession) -> List[Tuple[int, str]]:
+async def import_users(
+    db: AsyncSession, user_creates: List[user_schema.UserCreate], batch_size: int = 1000
+) -> List[int]:
     """
-    Retrieve a list of user IDs and names from the database.
+    Create many users in batches, skipping conflicting user names.
+
+    Each batch is checked for user names that already exist or repeat earlier
+    in the import, and the remaining users are inserted with one executemany
+    and committed. If a batch still fails, for example because of a concurrent
+    insert, it is retried row by row so that only the conflicting rows are
+    skipped.
 
     Args:
         db (AsyncSession): AsyncSQLAlchemy session.
+        user_creates (List[user_schema.UserCreate]): User creation data.
+        batch_size (int): Number of users inserted per transaction.
 
     Returns:
-        List[Tuple[int, str]]: List of user IDs and names.
+        List[int]: Indexes in 'user_creates' of the users that were not created.
     """
-    result: Result = await db.execute(
+    table = model.User.__table__
+    conflicts: List[int] = []
+    seen: Set[str] = set()
+    for start in range(0, len(user_creates), batch_size):
+        batch = list(enumerate(user_creates[start : start + batch_size], start))
+        result: Result = await db.execute(
+            select(table.c.user_name).where(
+                table.c.user_name.in_([user.user_name for _, user in batch])
+            )
+        )
+        existing = set(result.scalars())
+
+        rows = []
+        for index, user in batch:
+            if user.user_name in existing or user.user_name in seen:
+                conflicts.append(index)
+                continue
+            seen.add(user.user_name)
+            rows.append((index, {**user.model_dump(), "token_version": 0}))
+        if not rows:
+            continue
+
+        conflicts.extend(await _insert_users(db=db, rows=rows))
+        await _forget_not_found(db=db, user_names=[v["user_name"] for _, v in rows])
+    return sorted(conflicts)
+
+
+@coalesce
+async def read_user(  # pylint: disable=unused-argument
+    db: AsyncSession,
+    page: PageQuery = PageQuery(),
+    fields: Optional[Sequence[str]] = None,
+    version: Optional[int] = None,
+) -> List[Tuple[int, str, int, int]]:
+    """
+    Retrieve a list of user IDs, names and post and comment counts from the database.
+
+    When 'page.limit' is given, one page is fetched by keyset on user_id and
+    one extra row is returned so the caller can tell whether another page exists
+    (see api.utils.pagination.paginate). Rows for a 'page.before' cursor are
+    returned in descending user_id order.
+
+    Concurrent calls with the same arguments share one query (see
+    api.utils.singleflight).
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        page (PageQuery): Page size, or None to return every user, and the
+            user IDs after or before which to return users.
+        fields (Optional[Sequence[str]]): Names of the columns to select, every
+            column of user_schema.USER_FIELDS if None.
+        version (Optional[int]): Version stamp of GET /users read by the
+            caller before this call (see api.cruds.version). Only calls passing
+            the same stamp share a query, so the rows are never older than it.
+
+    Returns:
+        List[Tuple[int, str, int, int]]: List of user IDs, names, post counts
+            and comment counts.
+    """
+    query = select(
+        *(getattr(model.User, field) for field in fields or user_schema.USER_FIELDS)
+    ).filter(model.User.deleted_at.is_(None))
+    if page.after is not None:
+        query = query.filter(model.User.user_id > page.after)
+    if page.before is not None:
+        query = query.filter(model.User.user_id < page.before).order_by(
+            model.User.user_id.desc()
+        )
+    else:
+        query = query.order_by(model.User.user_id)
+    if page.limit is not None:
+        query = query.limit(page.limit + 1)
+
+    result: Result = await db.execute(query)
+    return result.all()
+
+
+async def stream_user(
+    db: AsyncSession, after: Optional[int] = None, chunk_size: int = 1000
+) -> AsyncIterator[List[Tuple[int, str]]]:
+    """
+    Stream user IDs and names from the database in chunks.
+
+    Rows are fetched with a server-side cursor, so at most 'chunk_size' rows
+    are held in memory at a time regardless of the size of the table.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        after (Optional[int]): Only stream users with a user_id greater than this.
+        chunk_size (int): Number of rows fetched per round trip.
+
+    Yields:
+        List[Tuple[int, str]]: Chunk of user IDs and names in user_id order.
+    """
+    query = (
         select(
             model.User.user_id,
             model.User.user_name,
         )
+        .filter(model.User.deleted_at.is_(None))
+        .order_by(model.User.user_id)
+        .execution_options(yield_per=chunk_size)
     )
-    return result.all()
+    if after is not None:
+        query = query.filter(model.User.user_id > after)
+
+    result: AsyncResult = await db.stream(query)
+    async for partition in result.partitions():
+        yield partition
 
 
 async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[model.User]:
@@ -106,11 +287,14 @@ async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[model.User]
     Returns:
         Optional[model.User]: Retrieved user data, or None if not found.
     """
-    result: Result = await db.execute(
-        select(model.User).filter(model.User.user_id == user_id)
-    )
-    user: Optional[Tuple[model.User]] = result.first()
-    return user[0] if user else None  # 要素が一つであってもtupleで返却されるので１つ目の要素を取り出す
+    cached = _users_by_id.get(user_id, _UNCACHED)
+    if cached is _NOT_FOUND:
+        return None
+    if cached is not _UNCACHED:
+        return await db.merge(cached, load=False)
+
+    snapshot = await _load_user_by_id(db=db, user_id=user_id)
+    return None if snapshot is None else await db.merge(snapshot, load=False)
 
 
 async def get_user_by_name(db: AsyncSession, user_name: str) -> Optional[model.User]:
@@ -124,11 +308,16 @@ async def get_user_by_name(db: AsyncSession, user_name: str) -> Optional[model.U
     Returns:
         Optional[model.User]: Retrieved user data, or None if not found.
     """
-    result: Result = await db.execute(
-        select(model.User).filter(model.User.user_name == user_name)
-    )
-    user: Optional[Tuple[model.User]] = result.first()
-    return user[0] if user else None  # 要素が一つであってもtupleで返却されるので１つ目の要素を取り出す
+    user_id = _user_ids_by_name.get(user_name, _UNCACHED)
+    if user_id is _NOT_FOUND:
+        return None
+    if user_id is not _UNCACHED:
+        cached_user = await get_user_by_id(db=db, user_id=user_id)
+        if cached_user is not None and cached_user.user_name == user_name:
+            return cached_user
+
+    snapshot = await _load_user_by_name(db=db, user_name=user_name)
+    return None if snapshot is None else await db.merge(snapshot, load=False)
 
 
 async def update_user(
@@ -137,6 +326,9 @@ async def update_user(
     """
     Update user information in the database.
 
+    The user's token version is bumped so that access tokens issued before the
+    update are rejected.
+
     Args:
         db (AsyncSession): AsyncSQLAlchemy session.
         original (model.User): Original user data.
@@ -145,27 +337,36 @@ async def update_user(
     Returns:
         model.User: Updated user data.
     """
+    user_id = original.user_id
+    _forget_user(user_id=user_id, user_name=original.user_name)
+    _user_ids_by_name.pop(user_create.user_name)
     try:
         await db.execute(
             update(model.User)
-            .where(model.User.user_id == original.user_id)
-            .values(**user_create.model_dump())
+            .where(model.User.user_id == user_id)
+            .values(
+                **user_create.model_dump(),
+                token_version=model.User.token_version + 1,
+            )
         )
-
+        await version.bump_table_version(db, version.USERS_TABLE)
         await db.commit()
-
-        await db.refresh(original)
-        return original
-
     except IntegrityError as e:
         await db.rollback()
         raise IntegrityViolationError from e
+    await db.refresh(original)
+    _cache_user(original)
+    return original
 
 
 async def delete_user(db: AsyncSession, original: model.User) -> None:
     """
     Delete an existing user from the database.
 
+    The user is deleted by a single statement; their posts and comments are
+    deleted by the database (ON DELETE CASCADE) without being loaded. Other
+    users' comments on their posts are subtracted from those users' counts.
+
     Args:
         db (AsyncSession): AsyncSQLAlchemy session.
         original (model.User): User data to be deleted.
@@ -173,5 +374,285 @@ async def delete_user(db: AsyncSession, original: model.User) -> None:
     Returns:
         None
     """
-    await db.delete(original)
+    user_id = original.user_id
+    user_name = original.user_name
+    await counter.subtract_comment_counts(
+        db,
+        model.Comment.post_id.in_(
+            select(model.Post.post_id).where(model.Post.user_id == user_id)
+        ),
+    )
+    await db.execute(delete(model.User).where(model.User.user_id == user_id))
+    await version.bump_table_version(db, version.USERS_TABLE)
+    await db.commit()
+    _users_by_id.set(user_id, _NOT_FOUND)
+    _user_ids_by_name.set(user_name, _NOT_FOUND)
+    await post.invalidate_post_cache(user_id)
+
+
+async def request_user_deletion(
+    db: AsyncSession, original: model.User
+) -> model.AccountDeletion:
+    """
+    Soft-delete a user and record a pending purge.
+
+    The user is hidden from authentication and listings at once, and their
+    access tokens are revoked. Their posts, comments and row are deleted
+    later by purge_user, so the request does not wait for the purge.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        original (model.User): User data to be deleted.
+
+    Returns:
+        model.AccountDeletion: Progress of the deletion.
+    """
+    user_id = original.user_id
+    user_name = original.user_name
+    now = _utcnow()
+    await db.execute(
+        update(model.User)
+        .where(model.User.user_id == user_id)
+        .values(deleted_at=now, token_version=model.User.token_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    values = {
+        "user_id": user_id,
+        "requested_at": now,
+        "deleted_posts": 0,
+        "deleted_comments": 0,
+    }
+    await db.execute(insert(model.AccountDeletion.__table__).values(**values))
+    await version.bump_table_version(db, version.USERS_TABLE)
+    await db.commit()
+    _users_by_id.set(user_id, _NOT_FOUND)
+    _user_ids_by_name.set(user_name, _NOT_FOUND)
+    await post.invalidate_post_cache(user_id)
+    return model.AccountDeletion(**values)
+
+
+async def purge_user(
+    db: AsyncSession,
+    user_id: int,
+    batch_size: int = USER_PURGE_BATCH_SIZE,
+    pause: float = 0.0,
+) -> Optional[model.AccountDeletion]:
+    """
+    Delete a soft-deleted user's comments, posts and row in batches.
+
+    The user's comments, the comments on the user's posts and then the posts
+    are deleted 'batch_size' rows per transaction, recording the progress in
+    the same transaction and sleeping 'pause' seconds between batches, so that
+    no transaction holds locks for long. An interrupted purge resumes where it
+    stopped when called again.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        user_id (int): ID of the user to purge.
+        batch_size (int): Number of rows deleted per transaction.
+        pause (float): Seconds to sleep between batches.
+
+    Returns:
+        Optional[model.AccountDeletion]: Progress of the deletion, or None if
+            the user's deletion was not requested.
+    """
+    deletion = await get_user_deletion(db=db, user_id=user_id)
+    if deletion is None or deletion.finished_at is not None:
+        return deletion
+
+    users_posts = select(model.Post.post_id).where(model.Post.user_id == user_id)
+    steps = [
+        (
+            model.Comment.comment_id,
+            model.Comment.user_id == user_id,
+            "deleted_comments",
+        ),
+        (
+            model.Comment.comment_id,
+            model.Comment.post_id.in_(users_posts),
+            "deleted_comments",
+        ),
+        (model.Post.post_id, model.Post.user_id == user_id, "deleted_posts"),
+    ]
+    for key, where, progress in steps:
+        while True:
+            result: Result = await db.execute(
+                select(key).where(where).order_by(key).limit(batch_size)
+            )
+            ids = result.scalars().all()
+            if not ids:
+                break
+            if key.class_ is model.Comment:
+                await counter.subtract_comment_counts(
+                    db, model.Comment.comment_id.in_(ids)
+                )
+            await db.execute(
+                delete(key.class_)
+                .where(key.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            await db.execute(
+                update(model.AccountDeletion)
+                .where(model.AccountDeletion.user_id == user_id)
+                .values({progress: getattr(model.AccountDeletion, progress) + len(ids)})
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            if pause:
+                await asyncio.sleep(pause)
+
+    await db.execute(delete(model.User).where(model.User.user_id == user_id))
+    await db.execute(
+        update(model.AccountDeletion)
+        .where(model.AccountDeletion.user_id == user_id)
+        .values(finished_at=_utcnow())
+        .execution_options(synchronize_session=False)
+    )
     await db.commit()
+    return await get_user_deletion(db=db, user_id=user_id)
+
+
+async def get_user_deletion(
+    db: AsyncSession, user_id: int
+) -> Optional[model.AccountDeletion]:
+    """
+    Retrieve the progress of a user's deletion.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        user_id (int): ID of the user.
+
+    Returns:
+        Optional[model.AccountDeletion]: Progress of the deletion, or None if
+            the user's deletion was not requested.
+    """
+    result: Result = await db.execute(
+        select(model.AccountDeletion)
+        .filter(model.AccountDeletion.user_id == user_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def read_pending_user_deletions(db: AsyncSession) -> List[int]:
+    """
+    Retrieve the IDs of users whose purge is unfinished.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+
+    Returns:
+        List[int]: IDs of the users, in the order their deletion was requested.
+    """
+    result: Result = await db.execute(
+        select(model.AccountDeletion.user_id)
+        .filter(model.AccountDeletion.finished_at.is_(None))
+        .order_by(model.AccountDeletion.requested_at)
+    )
+    return result.scalars().all()
+
+
+def get_user_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Report the size and hit/miss counters of the user cache.
+
+    Returns:
+        Dict[str, Dict[str, int]]: Counters of the by-id and by-name indexes.
+    """
+    return {"by_id": _users_by_id.stats(), "by_name": _user_ids_by_name.stats()}
+
+
+def clear_user_cache() -> None:
+    """
+    Invalidate every cached user.
+
+    Returns:
+        None
+    """
+    _users_by_id.clear()
+    _user_ids_by_name.clear()
+
+
+@coalesce
+async def _load_user_by_id(db: AsyncSession, user_id: int) -> Optional[model.User]:
+    result: Result = await db.execute(
+        select(model.User).filter(
+            model.User.user_id == user_id, model.User.deleted_at.is_(None)
+        )
+    )
+    user: Optional[Tuple[model.User]] = result.first()
+    if user is None:
+        _users_by_id.set(user_id, _NOT_FOUND)
+        return None
+    return _cache_user(user[0])
+
+
+@coalesce
+async def _load_user_by_name(db: AsyncSession, user_name: str) -> Optional[model.User]:
+    result: Result = await db.execute(
+        select(model.User).filter(
+            model.User.user_name == user_name, model.User.deleted_at.is_(None)
+        )
+    )
+    user: Optional[Tuple[model.User]] = result.first()
+    if user is None:
+        _user_ids_by_name.set(user_name, _NOT_FOUND)
+        return None
+    return _cache_user(user[0])
+
+
+def _cache_user(user: model.User) -> model.User:
+    snapshot = model.User(
+        user_id=user.user_id,
+        user_name=user.user_name,
+        password_hash=user.password_hash,
+        token_version=user.token_version,
+    )
+    make_transient_to_detached(snapshot)
+    _users_by_id.set(user.user_id, snapshot)
+    _user_ids_by_name.set(user.user_name, user.user_id)
+    return snapshot
+
+
+async def _insert_users(
+    db: AsyncSession, rows: List[Tuple[int, Dict[str, Any]]]
+) -> List[int]:
+    # Returns the indexes of the rows that conflicted.
+    table = model.User.__table__
+    try:
+        await db.execute(insert(table), [values for _, values in rows])
+        await version.bump_table_version(db, version.USERS_TABLE)
+        await db.commit()
+        return []
+    except IntegrityError:
+        await db.rollback()
+    conflicts = []
+    for index, values in rows:
+        try:
+            await db.execute(insert(table).values(**values))
+            await version.bump_table_version(db, version.USERS_TABLE)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            conflicts.append(index)
+    return conflicts
+
+
+async def _forget_not_found(db: AsyncSession, user_names: List[str]) -> None:
+    # Earlier lookups may have cached new users' names and IDs as not found.
+    for user_name in user_names:
+        _user_ids_by_name.pop(user_name)
+    result: Result = await db.execute(
+        select(model.User.user_id).where(model.User.user_name.in_(user_names))
+    )
+    for user_id in result.scalars():
+        _users_by_id.pop(user_id)
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _forget_user(user_id: int, user_name: str) -> None:
+    _users_by_id.pop(user_id)
+    _user_ids_by_name.pop(user_name)
@@ -0,0 +1,130 @@
+"""
+Version Stamp Operations Module.
+
+This module maintains the version stamps from which the ETags of the list
+endpoints are built. A stamp is a counter bumped by every write that changes
+what a listing returns, so a client's ETag can be checked with one primary
+key lookup instead of running the listing query.
+
+Functions:
+    - bump_table_version: Bump the version stamp of a table.
+    - bump_posts_version: Bump the version stamp of a user's posts.
+    - read_table_version: Retrieve the version stamp of a table.
+    - read_posts_version: Retrieve the version stamp of a user's posts.
+
+Constants:
+    - USERS_TABLE: Name of the stamp of GET /users.
+
+Usage:
+    - Call the bump functions in the transaction of the write they account
+      for, right before committing it. They do not commit. A reader fetches
+      the stamp before the rows, so it can only pair new rows with the old
+      stamp, never the reverse.
+    - 'bump_posts_version' updates the row of the user whose posts changed,
+      which the write locks anyway. Writes that change the user's post count
+      bump it through api.cruds.counter.add_post_count instead.
+    - 'bump_table_version' updates a row shared by every writer of the table,
+      so only writes that change the stamped columns call it: creating,
+      renaming and deleting users. Post and comment writes do not, which is
+      why the post and comment counts are not covered by the USERS_TABLE
+      stamp.
+
+Example:
+    from api.cruds import version
+
+    await db.execute(update(model.Post).where(...).values(contents="New"))
+    await version.bump_posts_version(db, user_id=1)
+    await db.commit()
+
+    await db.execute(update(model.User).where(...).values(user_name="New"))
+    await version.bump_table_version(db, version.USERS_TABLE)
+    await db.commit()
+
+    stamp = await version.read_posts_version(db, user_id=1)
+"""
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models import model
+
+USERS_TABLE = "users"
+
+
+async def bump_table_version(db: AsyncSession, table_name: str) -> None:
+    """
+    Bump the version stamp of a table.
+
+    Call it last before committing the write that changed the table, so the
+    shared stamp row stays locked only until that commit.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        table_name (str): Name of the stamp, e.g. USERS_TABLE.
+
+    Returns:
+        None
+    """
+    await db.execute(
+        update(model.TableVersion)
+        .where(model.TableVersion.table_name == table_name)
+        .values(version=model.TableVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def bump_posts_version(db: AsyncSession, user_id: int) -> None:
+    """
+    Bump the version stamp of a user's posts.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        user_id (int): ID of the user whose posts changed.
+
+    Returns:
+        None
+    """
+    await db.execute(
+        update(model.User)
+        .where(model.User.user_id == user_id)
+        .values(posts_version=model.User.posts_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def read_table_version(db: AsyncSession, table_name: str) -> Optional[int]:
+    """
+    Retrieve the version stamp of a table.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        table_name (str): Name of the stamp, e.g. USERS_TABLE.
+
+    Returns:
+        Optional[int]: Version stamp, or None if the stamp does not exist.
+    """
+    return await db.scalar(
+        select(model.TableVersion.version).where(
+            model.TableVersion.table_name == table_name
+        )
+    )
+
+
+async def read_posts_version(db: AsyncSession, user_id: int) -> Optional[int]:
+    """
+    Retrieve the version stamp of a user's posts.
+
+    Args:
+        db (AsyncSession): AsyncSQLAlchemy session.
+        user_id (int): ID of the user.
+
+    Returns:
+        Optional[int]: Version stamp, or None if the user does not exist or
+            is soft-deleted.
+    """
+    return await db.scalar(
+        select(model.User.posts_version).where(
+            model.User.user_id == user_id, model.User.deleted_at.is_(None)
+        )
+    )
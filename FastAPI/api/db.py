@@ -4,34 +4,213 @@ Asynchronous Database Module.
 This module provides functionality for working with an asynchronous database
 using SQLAlchemy's async capabilities.
 It includes an asynchronous engine, session creation, and a function
-to get an asynchronous database session.
+to get an asynchronous database session. Read-only endpoints can use
+'get_read_db' to be routed to a read replica.
 
 Usage:
     - Import the 'async_engine', 'async_session', and 'Base' objects.
     - Use the 'get_db' coroutine function to obtain an asynchronous database session.
+    - Use 'create_engine_from_settings' to build an engine with the configured pool.
+    - Call 'enable_sqlite_foreign_keys' on other SQLite engines, such as in tests.
+    - Await 'warm_up_pool' on startup to open the pool's connections in advance.
+    - Use the 'get_read_db' dependency in read-only endpoints.
+    - Call 'pin_reads_to_primary' on the response of a successful write.
 
 Example:
     async with get_db() as session:
         # Perform database operations using the 'session' object
 
+Settings:
+    The engine is configured from the following environment variables.
+
+    - ASYNC_DB_URL: Asynchronous database connection URL.
+    - ASYNC_DB_REPLICA_URL: Read replica connection URL, reads use the primary if unset.
+    - READ_YOUR_WRITES_SECONDS: Seconds a client's reads stay on the primary
+      after it wrote (default 5).
+    - DB_POOL_SIZE: Number of connections kept open in the pool (default 20).
+    - DB_MAX_OVERFLOW: Connections allowed beyond DB_POOL_SIZE (default 10).
+    - DB_POOL_TIMEOUT: Seconds to wait for a free connection (default 30).
+    - DB_POOL_RECYCLE: Seconds after which a connection is replaced (default 3600).
+    - DB_POOL_PRE_PING: Test connections before use, "true" or "false" (default "false").
+    - DB_WARM_UP_ATTEMPTS: Attempts to warm up the pool on startup (default 3).
+    - DB_WARM_UP_RETRY_SECONDS: Seconds between warm-up attempts (default 1).
+    - DB_ECHO: SQL logging, "false", "true" or "debug" (default "false").
+
 Note:
-    Make sure to update the 'ASYNC_DB_URL' variable
-    with the appropriate asynchronous database connection URL.
+    By default connections are not pinged before use, which would cost a round
+    trip per checkout. Instead they are replaced after DB_POOL_RECYCLE seconds, before
+    the server's idle timeout closes them.
 
+    Pool size settings are ignored for SQLite URLs, which use SQLAlchemy's
+    default pool for that dialect. SQLite engines created from the settings
+    open connections with foreign keys enabled, so ON DELETE CASCADE behaves
+    as on MySQL.
+
+    Read-your-writes is tracked per client with a cookie holding the time until
+    which its reads are pinned to the primary, so it holds across workers
+    without shared state.
 """
+import asyncio
+import logging
+import math
+import os
+import time
+from typing import Optional, Union
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio.engine import AsyncEngine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-ASYNC_DB_URL = "mysql+aiomysql://root@db:3306/prod?charset=utf8"
 
-async_engine = create_async_engine(ASYNC_DB_URL, echo=True)
+def _env_bool(name: str, default: str) -> bool:
+    return os.environ.get(name, default).lower() in ("1", "true", "yes")
+
+
+def _env_echo(name: str, default: str) -> Union[bool, str]:
+    value = os.environ.get(name, default).lower()
+    return "debug" if value == "debug" else value in ("1", "true", "yes")
+
+
+ASYNC_DB_URL = os.environ.get(
+    "ASYNC_DB_URL", "mysql+aiomysql://root@db:3306/prod?charset=utf8"
+)
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "3600"))
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", "false")
+DB_ECHO = _env_echo("DB_ECHO", "false")
+DB_WARM_UP_ATTEMPTS = int(os.environ.get("DB_WARM_UP_ATTEMPTS", "3"))
+DB_WARM_UP_RETRY_SECONDS = float(os.environ.get("DB_WARM_UP_RETRY_SECONDS", "1"))
+ASYNC_DB_REPLICA_URL = os.environ.get("ASYNC_DB_REPLICA_URL")
+READ_YOUR_WRITES_SECONDS = float(os.environ.get("READ_YOUR_WRITES_SECONDS", "5"))
+PRIMARY_READS_COOKIE = "primary_reads_until"
+
+logger = logging.getLogger(__name__)
+
+
+def _enable_foreign_keys(dbapi_connection, _connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def enable_sqlite_foreign_keys(engine: Union[Engine, AsyncEngine]) -> None:
+    """
+    Enable foreign keys on every connection a SQLite engine opens.
+
+    SQLite leaves foreign keys off by default, so without this ON DELETE
+    CASCADE and foreign key checks do not behave as on MySQL.
+
+    Args:
+        engine (Union[Engine, AsyncEngine]): SQLite engine.
+
+    Returns:
+        None
+    """
+    if isinstance(engine, AsyncEngine):
+        engine = engine.sync_engine
+    event.listen(engine, "connect", _enable_foreign_keys)
+
+
+def create_engine_from_settings(url: str = ASYNC_DB_URL) -> AsyncEngine:
+    """
+    Create an asynchronous engine configured from the settings.
+
+    Args:
+        url (str): Asynchronous database connection URL.
+
+    Returns:
+        AsyncEngine: Configured asynchronous engine.
+    """
+    options = {
+        "echo": DB_ECHO,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+    if url.startswith("sqlite"):
+        engine = create_async_engine(url, **options)
+        enable_sqlite_foreign_keys(engine)
+        return engine
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    return create_async_engine(url, **options)
+
+
+async_engine = create_engine_from_settings()
 async_session = sessionmaker(
     autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession
 )
 
+async_replica_engine = (
+    create_engine_from_settings(ASYNC_DB_REPLICA_URL) if ASYNC_DB_REPLICA_URL else None
+)
+async_replica_session = (
+    sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=async_replica_engine,
+        class_=AsyncSession,
+    )
+    if async_replica_engine
+    else None
+)
+
 Base = declarative_base()
 
 
+async def warm_up_pool(
+    engine: AsyncEngine = async_engine,
+    size: Optional[int] = None,
+    attempts: int = DB_WARM_UP_ATTEMPTS,
+    retry_seconds: float = DB_WARM_UP_RETRY_SECONDS,
+) -> bool:
+    """
+    Open pool connections in advance so the first requests do not pay for them.
+
+    Connections are opened concurrently and returned to the pool immediately.
+    If the database cannot be reached, for example because it is still
+    starting, the attempt is retried up to 'attempts' times. After that the
+    failure is logged and the pool is left to connect on demand, so startup
+    does not fail.
+
+    Args:
+        engine (AsyncEngine): Engine whose pool to warm up.
+        size (Optional[int]): Number of connections to open, DB_POOL_SIZE by default.
+        attempts (int): Maximum number of attempts.
+        retry_seconds (float): Seconds to wait between attempts.
+
+    Returns:
+        bool: True if every connection was opened.
+    """
+    size = DB_POOL_SIZE if size is None else size
+    for attempt in range(1, attempts + 1):
+        connections = await asyncio.gather(
+            *(engine.connect() for _ in range(size)), return_exceptions=True
+        )
+        errors = [c for c in connections if isinstance(c, BaseException)]
+        for connection in connections:
+            if not isinstance(connection, BaseException):
+                await connection.close()
+        if not errors:
+            return True
+        logger.warning(
+            "Could not warm up the connection pool (attempt %d of %d): %s",
+            attempt,
+            attempts,
+            errors[0],
+        )
+        if attempt < attempts:
+            await asyncio.sleep(retry_seconds)
+    return False
+
+
 async def get_db():
     """
     Coroutine function to get an asynchronous database session.
@@ -46,3 +225,63 @@ async def get_db():
     """
     async with async_session() as session:
         yield session
+
+
+async def get_replica_db():
+    """
+    Coroutine function to get an asynchronous read replica session.
+
+    Yields None if no read replica is configured.
+    """
+    if async_replica_session is None:
+        yield None
+        return
+    async with async_replica_session() as session:
+        yield session
+
+
+async def get_read_db(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    replica_db: AsyncSession = Depends(get_replica_db),
+) -> AsyncSession:
+    """
+    Get a session for read-only queries.
+
+    Returns the read replica session, unless no replica is configured or the
+    client wrote within the last READ_YOUR_WRITES_SECONDS, in which case the
+    primary session is returned so that the client sees its own writes.
+
+    Args:
+        request (Request): Incoming request.
+        db (AsyncSession): Primary session.
+        replica_db (AsyncSession): Read replica session, or None.
+
+    Returns:
+        AsyncSession: Session to run read-only queries on.
+    """
+    if replica_db is None:
+        return db
+    try:
+        primary_reads_until = float(request.cookies.get(PRIMARY_READS_COOKIE, 0))
+    except ValueError:
+        primary_reads_until = 0
+    return db if primary_reads_until > time.time() else replica_db
+
+
+def pin_reads_to_primary(response: Response) -> None:
+    """
+    Route the client's reads to the primary for READ_YOUR_WRITES_SECONDS.
+
+    Args:
+        response (Response): Response of a successful write.
+
+    Returns:
+        None
+    """
+    response.set_cookie(
+        PRIMARY_READS_COOKIE,
+        str(time.time() + READ_YOUR_WRITES_SECONDS),
+        max_age=math.ceil(READ_YOUR_WRITES_SECONDS),
+        httponly=True,
+    )
@@ -1 +1,5 @@
+from .fields_exceptions import InvalidFieldsError
+from .hash_exceptions import HashQueueFullError
 from .integrity_exceptions import IntegrityViolationError
+from .pagination_exceptions import InvalidCursorError
+from .pubsub_exceptions import SubscriptionEvictedError
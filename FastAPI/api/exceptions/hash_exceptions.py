@@ -0,0 +1,2 @@
+class HashQueueFullError(Exception):
+    pass
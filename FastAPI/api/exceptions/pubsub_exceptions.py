@@ -0,0 +1,2 @@
+class SubscriptionEvictedError(Exception):
+    pass
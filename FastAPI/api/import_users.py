@@ -0,0 +1,71 @@
+"""
+Bulk User Import Command.
+
+This script imports users from a CSV file with 'user_name' and 'password'
+columns. Passwords are hashed in parallel in a process pool and the users are
+inserted in batches; rows whose user name already exists are reported and
+skipped without aborting the import.
+
+Usage:
+    python -m api.import_users users.csv [--batch-size N] [--workers N]
+"""
+import argparse
+import asyncio
+import csv
+import os
+from typing import Optional
+
+import api.cruds.user as user_crud
+import api.schemas.user as user_schema
+from api.db import async_session
+from api.utils.hash_service import HashService
+
+
+async def import_csv(path: str, batch_size: int, workers: Optional[int]) -> int:
+    """
+    Import users from a CSV file and print the conflicting rows.
+
+    Args:
+        path (str): Path of the CSV file.
+        batch_size (int): Number of users inserted per transaction.
+        workers (Optional[int]): Number of hashing processes, CPU count if None.
+
+    Returns:
+        int: Number of conflicting rows.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [user_schema.UserImportItem(**row) for row in csv.DictReader(f)]
+
+    hash_service = HashService(
+        executor_type="process",
+        max_workers=workers or os.cpu_count() or 1,
+        max_pending=len(rows),
+    )
+    try:
+        password_hashes = await hash_service.hash_many([row.password for row in rows])
+    finally:
+        hash_service.shutdown()
+    user_creates = [
+        user_schema.UserCreate(user_name=row.user_name, password_hash=password_hash)
+        for row, password_hash in zip(rows, password_hashes)
+    ]
+
+    async with async_session() as db:
+        conflicts = await user_crud.import_users(
+            db=db, user_creates=user_creates, batch_size=batch_size
+        )
+
+    for index in conflicts:
+        # 1行目はヘッダーなのでデータ行は2行目から始まる
+        print(f"line {index + 2}: user_name already exists: {rows[index].user_name}")
+    print(f"created {len(rows) - len(conflicts)} users, {len(conflicts)} conflicts")
+    return len(conflicts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import users from a CSV file.")
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(import_csv(args.path, batch_size=args.batch_size, workers=args.workers))
@@ -1,15 +1,82 @@
 """
 Main FastAPI application module.
 
-This module sets up a FastAPI application and includes routers for user, post, and token.
+This module sets up a FastAPI application and includes routers for user, post,
+comment, token and metrics.
+On startup the database connection pool is warmed up, and on shutdown it is disposed.
+Startup does not wait for the database: if it cannot be reached, the pool connects on demand.
+Successful writes pin the client's reads to the primary database for a short time;
+logging in does not, as it changes no data.
+Requests rejected by the password hashing pool are answered with 503 Service Unavailable.
+Responses are encoded with orjson through the default FastJSONResponse class.
 """
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 
-from api.routers import post, token, user
+from api import db
+from api.exceptions import HashQueueFullError
+from api.routers import comment, metrics, post, token, user
+from api.utils.hash_service import hash_service
+from api.utils.responses import FastJSONResponse
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+READ_ONLY_PATHS = ("/token",)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """
+    Warm up the connection pool on startup and dispose of it on shutdown.
+
+    The password hashing pool is shut down on shutdown as well.
+    """
+    await db.warm_up_pool()
+    if db.async_replica_engine is not None:
+        await db.warm_up_pool(db.async_replica_engine)
+    yield
+    await db.async_engine.dispose()
+    if db.async_replica_engine is not None:
+        await db.async_replica_engine.dispose()
+    hash_service.shutdown()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """
+    Pin the client's reads to the primary after a successful write.
+
+    Requests to READ_ONLY_PATHS, such as logging in, are not writes even
+    though they are POSTs.
+    """
+    response = await call_next(request)
+    if (
+        request.method not in SAFE_METHODS
+        and request.url.path not in READ_ONLY_PATHS
+        and response.status_code < 400
+    ):
+        db.pin_reads_to_primary(response)
+    return response
 
-app = FastAPI()
 
 app.include_router(user.router)
 app.include_router(post.router)
+app.include_router(comment.router)
 app.include_router(token.router)
+app.include_router(metrics.router)
+
+
+@app.exception_handler(HashQueueFullError)
+async def hash_queue_full_handler(_request: Request, _exc: HashQueueFullError):
+    """
+    Ask the client to retry when the password hashing pool is saturated.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
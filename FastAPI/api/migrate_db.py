@@ -1,9 +1,19 @@
+import argparse
+import os
+from typing import Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 
+from api import migrations
+from api.db import enable_sqlite_foreign_keys
 from api.models.model import Base
 
-DB_URL = "mysql+pymysql://root@db:3306/prod?charset=utf8"
-engine = create_engine(DB_URL, echo=True)
+DB_URL = os.environ.get("DB_URL", "mysql+pymysql://root@db:3306/prod?charset=utf8")
+DB_ECHO = os.environ.get("DB_ECHO", "false").lower() in ("1", "true", "yes")
+engine = create_engine(DB_URL, echo=DB_ECHO)
+if DB_URL.startswith("sqlite"):
+    enable_sqlite_foreign_keys(engine)
 
 
 def reset_database():
@@ -12,6 +22,8 @@ def reset_database():
 
     この関数は現在のデータベースのテーブルを全て削除し、
     api.models.modelに定義されているテーブルを再作成します。
+    再作成したスキーマは最新のマイグレーションが適用済みとして記録されます。
+    既存のデータは全て失われるため、開発環境でのみ使用してください。
 
     Args:
         null
@@ -20,8 +32,93 @@ def reset_database():
         null
     """
     Base.metadata.drop_all(bind=engine)
+    migrations.runner.schema_migrations.drop(bind=engine, checkfirst=True)
     Base.metadata.create_all(bind=engine)
+    migrations.stamp(engine)
+
+
+def upgrade_database(
+    bind: Engine = engine,
+    target: Optional[int] = None,
+    batch_size: int = 1000,
+    pause: float = 0.0,
+) -> list:
+    """
+    未適用のマイグレーションを順に適用する関数。
+
+    テーブルは削除しないため、既存のデータを保持したまま実行できます。
+    カラムの追加やインデックスの作成はオンラインDDLで行い、
+    既存行の更新は batch_size 行ごとにコミットし、バッチの間に pause 秒待機します。
+
+    Args:
+        bind (Engine): マイグレーションを適用するデータベースのエンジン。
+        target (Optional[int]): 適用する最大のバージョン。Noneの場合は全て適用する。
+        batch_size (int): 既存行の更新で1トランザクションに含める行数。
+        pause (float): 既存行の更新のバッチ間に待機する秒数。
+
+    Returns:
+        list: 適用したバージョンのリスト。
+    """
+    return migrations.upgrade(bind, target=target, batch_size=batch_size, pause=pause)
+
+
+def create_missing_indexes(bind: Engine = engine) -> list:
+    """
+    api.models.modelに定義されていて、データベースに存在しないインデックスを作成する関数。
+
+    テーブルは削除しないため、既存のデータを保持したまま実行できます。
+    MySQLではALGORITHM=INPLACE, LOCK=NONEを指定したオンラインDDLで作成するため、
+    作成中もテーブルへの読み書きはブロックされません。
+
+    Args:
+        bind (Engine): インデックスを作成するデータベースのエンジン。
+
+    Returns:
+        list: 作成したインデックス名のリスト。
+    """
+    op = migrations.Operations(bind)
+    created = []
+    for table in Base.metadata.sorted_tables:
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if op.create_index(index):
+                created.append(index.name)
+    return created
 
 
 if __name__ == "__main__":
-    reset_database()
+    parser = argparse.ArgumentParser(description="データベースのスキーマを管理する。")
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="適用済みのバージョンと未適用のマイグレーションを表示する",
+    )
+    parser.add_argument("--target", type=int, default=None, help="適用する最大のバージョン")
+    parser.add_argument(
+        "--batch-size", type=int, default=1000, help="既存行の更新で1トランザクションに含める行数"
+    )
+    parser.add_argument("--pause", type=float, default=0.0, help="既存行の更新のバッチ間に待機する秒数")
+    parser.add_argument(
+        "--indexes",
+        action="store_true",
+        help="テーブルを削除せずに不足しているインデックスのみを作成する",
+    )
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="全てのテーブルを削除して再作成する (既存のデータは失われる)",
+    )
+    args = parser.parse_args()
+    if args.status:
+        print(f"current: {migrations.current_version(engine)}")
+        for migration in migrations.pending_migrations(engine, args.target):
+            print(f"pending: {migration.version} {migration.description}")
+    elif args.indexes:
+        print(create_missing_indexes())
+    elif args.reset:
+        reset_database()
+    else:
+        print(
+            upgrade_database(
+                target=args.target, batch_size=args.batch_size, pause=args.pause
+            )
+        )
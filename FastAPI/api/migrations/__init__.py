@@ -0,0 +1,3 @@
+from .operations import Operations
+from .runner import current_version, pending_migrations, stamp, upgrade
+from .versions import MIGRATIONS, Migration
@@ -0,0 +1,275 @@
+"""
+Online Schema Operations.
+
+This module provides the schema operations used by migrations. Each operation
+is idempotent, so a migration interrupted halfway can simply be run again, and
+each is written so that it does not lock a large table for the duration of the
+change.
+
+Usage:
+    - Migrations receive an 'Operations' instance bound to the target engine.
+    - Use 'add_column', 'create_index' and 'set_on_delete' for online DDL.
+    - Use 'backfill' to update existing rows in throttled, bounded batches.
+
+Example:
+    op.add_column("users", Column("token_version", Integer, server_default="0"))
+    op.create_index(Index("ix_posts_user_id_post_id", posts.c.user_id, posts.c.post_id))
+    op.backfill(op.table("users"), {"token_version": 0})
+
+Note:
+    - On MySQL, columns are added with ALGORITHM=INSTANT and indexes with
+      ALGORITHM=INPLACE, LOCK=NONE, so reads and writes continue while they
+      are applied. Other dialects use plain DDL.
+    - SQLite cannot alter constraints, so 'set_on_delete' leaves SQLite
+      databases unchanged.
+    - 'backfill' walks the primary key and commits every 'batch_size' rows,
+      sleeping 'pause' seconds between batches, so no transaction holds row
+      locks or undo log for more than one batch.
+"""
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Column, Index, MetaData, Table, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.sql import func, select
+
+
+class Operations:
+    """
+    Operations class for applying schema changes to a database.
+    """
+
+    def __init__(self, bind: Engine, batch_size: int = 1000, pause: float = 0.0):
+        """
+        Constructor method to initialize the Operations.
+
+        Args:
+            bind (Engine): Engine of the database to change.
+            batch_size (int): Number of rows updated per 'backfill' transaction.
+            pause (float): Seconds to sleep between 'backfill' batches.
+        """
+        self.bind = bind
+        self.batch_size = batch_size
+        self.pause = pause
+
+    def has_table(self, table_name: str) -> bool:
+        """
+        Check whether a table exists.
+
+        Args:
+            table_name (str): Name of the table.
+
+        Returns:
+            bool: True if the table exists.
+        """
+        return inspect(self.bind).has_table(table_name)
+
+    def has_column(self, table_name: str, column_name: str) -> bool:
+        """
+        Check whether a column exists.
+
+        Args:
+            table_name (str): Name of the table.
+            column_name (str): Name of the column.
+
+        Returns:
+            bool: True if the column exists.
+        """
+        columns = inspect(self.bind).get_columns(table_name)
+        return any(column["name"] == column_name for column in columns)
+
+    def has_index(self, table_name: str, index_name: str) -> bool:
+        """
+        Check whether an index exists.
+
+        Args:
+            table_name (str): Name of the table.
+            index_name (str): Name of the index.
+
+        Returns:
+            bool: True if the index exists.
+        """
+        indexes = inspect(self.bind).get_indexes(table_name)
+        return any(index["name"] == index_name for index in indexes)
+
+    def table(self, table_name: str) -> Table:
+        """
+        Reflect a table as it currently exists in the database.
+
+        Args:
+            table_name (str): Name of the table.
+
+        Returns:
+            Table: The reflected table, for building 'backfill' statements.
+        """
+        return Table(table_name, MetaData(), autoload_with=self.bind)
+
+    def create_tables(self, metadata: MetaData) -> None:
+        """
+        Create the tables of 'metadata' that do not exist yet.
+
+        Args:
+            metadata (MetaData): Tables to create.
+
+        Returns:
+            None
+        """
+        metadata.create_all(bind=self.bind, checkfirst=True)
+
+    def add_column(self, table_name: str, column: Column) -> bool:
+        """
+        Add a column to a table unless it already exists.
+
+        Give NOT NULL columns a server_default, so existing rows are filled in
+        without rewriting the table; use 'backfill' for computed values.
+
+        Args:
+            table_name (str): Name of the table.
+            column (Column): Column to add.
+
+        Returns:
+            bool: True if the column was added.
+        """
+        if self.has_column(table_name, column.name):
+            return False
+        preparer = self.bind.dialect.identifier_preparer
+        statement = (
+            f"ALTER TABLE {preparer.quote(table_name)} "
+            f"ADD COLUMN {CreateColumn(column).compile(dialect=self.bind.dialect)}"
+        )
+        if self.bind.dialect.name == "mysql":
+            statement += ", ALGORITHM=INSTANT"
+        with self.bind.begin() as conn:
+            conn.execute(text(statement))
+        return True
+
+    def create_index(self, index: Index) -> bool:
+        """
+        Create an index unless it already exists.
+
+        Args:
+            index (Index): Index to create, bound to its table.
+
+        Returns:
+            bool: True if the index was created.
+        """
+        if self.has_index(index.table.name, index.name):
+            return False
+        if self.bind.dialect.name == "mysql":
+            preparer = self.bind.dialect.identifier_preparer
+            columns = ", ".join(preparer.quote(column.name) for column in index.columns)
+            unique = "UNIQUE " if index.unique else ""
+            statement = (
+                f"ALTER TABLE {preparer.format_table(index.table)} "
+                f"ADD {unique}INDEX {preparer.quote(index.name)} ({columns}), "
+                "ALGORITHM=INPLACE, LOCK=NONE"
+            )
+            with self.bind.begin() as conn:
+                conn.execute(text(statement))
+        else:
+            index.create(bind=self.bind)
+        return True
+
+    def set_on_delete(
+        self, table_name: str, column_name: str, ondelete: str, name: str
+    ) -> bool:
+        """
+        Replace the foreign key on a column with one using an ON DELETE action.
+
+        On MySQL the constraint is replaced in place with foreign key checks
+        disabled for the statement; the existing rows already satisfy the
+        constraint, so the table is neither copied nor locked.
+
+        Args:
+            table_name (str): Name of the table holding the foreign key.
+            column_name (str): Name of the foreign key column.
+            ondelete (str): ON DELETE action, e.g. "CASCADE".
+            name (str): Name of the new constraint.
+
+        Returns:
+            bool: True if the foreign key was replaced.
+        """
+        if self.bind.dialect.name == "sqlite":
+            return False
+        (foreign_key,) = [
+            foreign_key
+            for foreign_key in inspect(self.bind).get_foreign_keys(table_name)
+            if foreign_key["constrained_columns"] == [column_name]
+        ]
+        current = foreign_key["options"].get("ondelete") or ""
+        if current.upper() == ondelete.upper():
+            return False
+        preparer = self.bind.dialect.identifier_preparer
+        referred_columns = ", ".join(
+            preparer.quote(column) for column in foreign_key["referred_columns"]
+        )
+        drop = (
+            "DROP FOREIGN KEY"
+            if self.bind.dialect.name == "mysql"
+            else "DROP CONSTRAINT"
+        )
+        statement = (
+            f"ALTER TABLE {preparer.quote(table_name)} "
+            f"{drop} {preparer.quote(foreign_key['name'])}, "
+            f"ADD CONSTRAINT {preparer.quote(name)} "
+            f"FOREIGN KEY ({preparer.quote(column_name)}) "
+            f"REFERENCES {preparer.quote(foreign_key['referred_table'])} "
+            f"({referred_columns}) ON DELETE {ondelete}"
+        )
+        with self.bind.begin() as conn:
+            if self.bind.dialect.name == "mysql":
+                conn.execute(text("SET SESSION foreign_key_checks = 0"))
+                statement += ", ALGORITHM=INPLACE, LOCK=NONE"
+            try:
+                conn.execute(text(statement))
+            finally:
+                if self.bind.dialect.name == "mysql":
+                    conn.execute(text("SET SESSION foreign_key_checks = 1"))
+        return True
+
+    def backfill(
+        self, table: Table, values: Dict[str, Any], where: Optional[Any] = None
+    ) -> int:
+        """
+        Update existing rows in batches of 'batch_size' primary keys.
+
+        Each batch is committed in its own transaction, followed by a sleep of
+        'pause' seconds to leave room for production traffic and replication.
+
+        Args:
+            table (Table): Table to update, see 'table'.
+            values (Dict[str, Any]): Values to set, may be SQL expressions.
+            where (Optional[Any]): Additional condition for the rows to update.
+
+        Returns:
+            int: Number of updated rows.
+        """
+        (key,) = table.primary_key.columns
+        updated = 0
+        with self.bind.connect() as conn:
+            lower = conn.scalar(select(func.min(key)))
+            last = conn.scalar(select(func.max(key)))
+        if lower is None:
+            return 0
+        lower -= 1
+        while lower < last:
+            with self.bind.begin() as conn:
+                upper = conn.scalar(
+                    select(key)
+                    .where(key > lower)
+                    .order_by(key)
+                    .offset(self.batch_size - 1)
+                    .limit(1)
+                )
+                upper = last if upper is None else upper
+                statement = (
+                    table.update().where(key > lower, key <= upper).values(values)
+                )
+                if where is not None:
+                    statement = statement.where(where)
+                updated += conn.execute(statement).rowcount
+            lower = upper
+            if self.pause and lower < last:
+                time.sleep(self.pause)
+        return updated
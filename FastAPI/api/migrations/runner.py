@@ -0,0 +1,135 @@
+"""
+Migration Runner.
+
+This module applies the pending migrations of api.migrations.versions to a
+database and records each applied version in the 'schema_migrations' table.
+
+Usage:
+    - Call 'upgrade' to apply all pending migrations, or up to 'target'.
+    - Call 'current_version' and 'pending_migrations' to inspect a database.
+    - Call 'stamp' to mark migrations as applied without running them.
+
+Example:
+    applied = upgrade(engine, batch_size=5000, pause=0.1)
+
+Note:
+    A migration is recorded after it completes. Migrations that backfill
+    commit in batches and are not atomic, but every operation is idempotent,
+    so an interrupted migration is completed by running 'upgrade' again.
+"""
+import datetime
+from typing import List, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import select
+
+from api.migrations.operations import Operations
+from api.migrations.versions import MIGRATIONS, Migration
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("description", String(256), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def current_version(bind: Engine) -> int:
+    """
+    Get the highest applied migration version.
+
+    Args:
+        bind (Engine): Engine of the database.
+
+    Returns:
+        int: The highest applied version, 0 if none is applied.
+    """
+    applied = _applied_versions(bind)
+    return max(applied, default=0)
+
+
+def pending_migrations(bind: Engine, target: Optional[int] = None) -> List[Migration]:
+    """
+    Get the migrations not applied yet, in order.
+
+    Args:
+        bind (Engine): Engine of the database.
+        target (Optional[int]): Highest version to include, all if None.
+
+    Returns:
+        List[Migration]: The pending migrations.
+    """
+    applied = _applied_versions(bind)
+    return [
+        migration
+        for migration in sorted(MIGRATIONS, key=lambda migration: migration.version)
+        if migration.version not in applied
+        and (target is None or migration.version <= target)
+    ]
+
+
+def upgrade(
+    bind: Engine,
+    target: Optional[int] = None,
+    batch_size: int = 1000,
+    pause: float = 0.0,
+) -> List[int]:
+    """
+    Apply the pending migrations in order.
+
+    Args:
+        bind (Engine): Engine of the database.
+        target (Optional[int]): Highest version to apply, all if None.
+        batch_size (int): Number of rows updated per backfill transaction.
+        pause (float): Seconds to sleep between backfill batches.
+
+    Returns:
+        List[int]: The applied versions.
+    """
+    op = Operations(bind, batch_size=batch_size, pause=pause)
+    applied = []
+    for migration in pending_migrations(bind, target):
+        migration.upgrade(op)
+        _record(bind, migration)
+        applied.append(migration.version)
+    return applied
+
+
+def stamp(bind: Engine, target: Optional[int] = None) -> List[int]:
+    """
+    Mark the pending migrations as applied without running them.
+
+    Used after creating the schema directly from api.models.model.
+
+    Args:
+        bind (Engine): Engine of the database.
+        target (Optional[int]): Highest version to mark, all if None.
+
+    Returns:
+        List[int]: The marked versions.
+    """
+    migrations = pending_migrations(bind, target)
+    for migration in migrations:
+        _record(bind, migration)
+    return [migration.version for migration in migrations]
+
+
+def _applied_versions(bind: Engine) -> set:
+    schema_migrations.create(bind=bind, checkfirst=True)
+    with bind.connect() as conn:
+        return set(conn.scalars(select(schema_migrations.c.version)))
+
+
+def _record(bind: Engine, migration: Migration) -> None:
+    with bind.begin() as conn:
+        conn.execute(
+            schema_migrations.insert().values(
+                version=migration.version,
+                description=migration.description,
+                applied_at=datetime.datetime.now(datetime.timezone.utc).replace(
+                    tzinfo=None
+                ),
+            )
+        )
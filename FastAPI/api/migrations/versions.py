@@ -0,0 +1,149 @@
+"""
+Schema Migrations.
+
+Each migration is a function taking an 'Operations' instance, registered in
+'MIGRATIONS' with a version number. Versions are applied in ascending order
+and never change once released; a schema change is made by appending a new
+migration, and api.models.model is updated to match.
+
+Migrations describe the schema as it was at their version instead of
+importing api.models.model, so replaying them from an empty database always
+produces the same schema.
+"""
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy.schema import Column, ForeignKey, Index, MetaData, Table
+from sqlalchemy.sql import func, insert, select
+from sqlalchemy.types import DateTime, Integer, String
+
+from api.migrations.operations import Operations
+
+
+class Migration(NamedTuple):
+    """
+    A versioned schema migration.
+    """
+
+    version: int
+    description: str
+    upgrade: Callable[[Operations], None]
+
+
+def _0001_initial(op: Operations) -> None:
+    metadata = MetaData()
+    Table(
+        "users",
+        metadata,
+        Column("user_id", Integer, autoincrement=True, primary_key=True),
+        Column("user_name", String(256), nullable=False, unique=True),
+        Column("password_hash", String(256), nullable=False),
+    )
+    Table(
+        "posts",
+        metadata,
+        Column("post_id", Integer, autoincrement=True, primary_key=True),
+        Column("user_id", Integer, ForeignKey("users.user_id")),
+        Column("contents", String(256)),
+    )
+    Table(
+        "comments",
+        metadata,
+        Column("comment_id", Integer, autoincrement=True, primary_key=True),
+        Column("user_id", Integer, ForeignKey("users.user_id")),
+        Column("post_id", Integer, ForeignKey("posts.post_id")),
+        Column("contents", String(256)),
+    )
+    op.create_tables(metadata)
+
+
+def _0002_users_token_version(op: Operations) -> None:
+    op.add_column(
+        "users", Column("token_version", Integer, nullable=False, server_default="0")
+    )
+
+
+def _0003_lookup_indexes(op: Operations) -> None:
+    posts = op.table("posts")
+    comments = op.table("comments")
+    op.create_index(Index("ix_posts_user_id_post_id", posts.c.user_id, posts.c.post_id))
+    op.create_index(
+        Index(
+            "ix_comments_post_id_comment_id", comments.c.post_id, comments.c.comment_id
+        )
+    )
+    op.create_index(Index("ix_comments_user_id", comments.c.user_id))
+
+
+def _0004_on_delete_cascade(op: Operations) -> None:
+    op.set_on_delete("posts", "user_id", "CASCADE", name="fk_posts_user_id")
+    op.set_on_delete("comments", "user_id", "CASCADE", name="fk_comments_user_id")
+    op.set_on_delete("comments", "post_id", "CASCADE", name="fk_comments_post_id")
+
+
+def _0005_account_deletions(op: Operations) -> None:
+    op.add_column("users", Column("deleted_at", DateTime, nullable=True))
+    metadata = MetaData()
+    Table(
+        "account_deletions",
+        metadata,
+        Column("user_id", Integer, primary_key=True, autoincrement=False),
+        Column("requested_at", DateTime, nullable=False),
+        Column("deleted_posts", Integer, nullable=False, server_default="0"),
+        Column("deleted_comments", Integer, nullable=False, server_default="0"),
+        Column("finished_at", DateTime, nullable=True),
+    )
+    op.create_tables(metadata)
+
+
+def _0006_user_counters(op: Operations) -> None:
+    op.add_column(
+        "users", Column("post_count", Integer, nullable=False, server_default="0")
+    )
+    op.add_column(
+        "users", Column("comment_count", Integer, nullable=False, server_default="0")
+    )
+    users = op.table("users")
+    posts = op.table("posts")
+    comments = op.table("comments")
+    op.backfill(
+        users,
+        {
+            "post_count": select(func.count())  # pylint: disable=not-callable
+            .select_from(posts)
+            .where(posts.c.user_id == users.c.user_id)
+            .scalar_subquery(),
+            "comment_count": select(func.count())  # pylint: disable=not-callable
+            .select_from(comments)
+            .where(comments.c.user_id == users.c.user_id)
+            .scalar_subquery(),
+        },
+    )
+
+
+def _0007_version_stamps(op: Operations) -> None:
+    op.add_column(
+        "users", Column("posts_version", Integer, nullable=False, server_default="0")
+    )
+    metadata = MetaData()
+    table_versions = Table(
+        "table_versions",
+        metadata,
+        Column("table_name", String(64), primary_key=True),
+        Column("version", Integer, nullable=False, server_default="0"),
+    )
+    op.create_tables(metadata)
+    with op.bind.begin() as conn:
+        count = func.count()  # pylint: disable=not-callable
+        if conn.scalar(select(count).select_from(table_versions)) == 0:
+            conn.execute(insert(table_versions).values(table_name="users", version=0))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "initial schema", _0001_initial),
+    Migration(2, "users.token_version", _0002_users_token_version),
+    Migration(3, "indexes for hot lookup columns", _0003_lookup_indexes),
+    Migration(4, "ON DELETE CASCADE foreign keys", _0004_on_delete_cascade),
+    Migration(5, "background account deletion", _0005_account_deletions),
+    Migration(6, "users.post_count and users.comment_count", _0006_user_counters),
+    Migration(7, "version stamps for list ETags", _0007_version_stamps),
+]
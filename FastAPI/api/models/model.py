@@ -7,11 +7,18 @@ api.db モジュール
 - User: ユーザー情報を表すデータベーステーブルのモデルクラス。
 - Post: 投稿情報を表すデータベーステーブルのモデルクラス。
 - Comment: コメント情報を表すデータベーステーブルのモデルクラス。
+- AccountDeletion: アカウント削除の進捗を表すデータベーステーブルのモデルクラス。
+- TableVersion: テーブルのバージョンスタンプを表すデータベーステーブルのモデルクラス。
 
 これらのクラスはデータベース内の異なるテーブルを表し、それぞれのテーブルに対する関連性も定義されています。
+頻繁に検索される外部キーには複合インデックスを定義しています。
+外部キーには ON DELETE CASCADE を指定しており、ユーザーや投稿を削除すると
+関連する投稿とコメントはデータベースによって削除されます (passive_deletes)。
 """
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.event import listen
 from sqlalchemy.orm import relationship
+from sqlalchemy.schema import DDL
 
 from api.db import Base
 
@@ -24,6 +31,14 @@ class User(Base):
         user_id (int): ユーザーの一意の識別子。
         user_name (str): ユーザーの名前。
         password_hash (str): ユーザーのパスワードのハッシュ値。
+        token_version (int): アクセストークンの世代。更新すると発行済みトークンが無効になる。
+        post_count (int): ユーザーが作成した投稿の数。投稿の作成・削除と同じトランザクションで更新される。
+        comment_count (int): ユーザーが作成したコメントの数。コメントの作成・削除と同じトランザクションで更新される。
+        posts_version (int): ユーザーの投稿一覧のバージョンスタンプ。投稿の作成・更新・削除で
+            増加し、投稿一覧の ETag に使用される。
+        deleted_at (datetime): アカウントの削除を受け付けた日時。削除されていない場合はNone。
+            削除を受け付けたユーザーは認証と一覧から除外され、投稿とコメントは
+            バックグラウンドで削除される。
         post (relationship): ユーザーが作成した投稿との関連性。
         comment (relationship): ユーザーが作成したコメントとの関連性。
     """
@@ -33,9 +48,18 @@ class User(Base):
     user_id = Column(Integer, autoincrement=True, primary_key=True)
     user_name = Column(String(256), nullable=False, unique=True)
     password_hash = Column(String(256), nullable=False)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
+    post_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    posts_version = Column(Integer, nullable=False, default=0, server_default="0")
+    deleted_at = Column(DateTime, nullable=True)
 
-    post = relationship("Post", back_populates="user", cascade="delete")
-    comment = relationship("Comment", back_populates="user", cascade="delete")
+    post = relationship(
+        "Post", back_populates="user", cascade="delete", passive_deletes=True
+    )
+    comment = relationship(
+        "Comment", back_populates="user", cascade="delete", passive_deletes=True
+    )
 
 
 class Post(Base):
@@ -48,16 +72,25 @@ class Post(Base):
         contents (str): 投稿の内容。
         user (relationship): 投稿を作成したユーザーとの関連性。
         comment (relationship): 投稿に対するコメントとの関連性。
+
+    Indexes:
+        ix_posts_user_id_post_id: ユーザーごとの投稿一覧と (user_id, post_id) での検索に使用。
     """
 
     __tablename__ = "posts"
+    __table_args__ = (Index("ix_posts_user_id_post_id", "user_id", "post_id"),)
 
     post_id = Column(Integer, autoincrement=True, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.user_id"))
+    user_id = Column(
+        Integer,
+        ForeignKey("users.user_id", name="fk_posts_user_id", ondelete="CASCADE"),
+    )
     contents = Column(String(256))
 
     user = relationship("User", back_populates="post")
-    comment = relationship("Comment", back_populates="post", cascade="delete")
+    comment = relationship(
+        "Comment", back_populates="post", cascade="delete", passive_deletes=True
+    )
 
 
 class Comment(Base):
@@ -71,14 +104,77 @@ class Comment(Base):
         contents (str): コメントの内容。
         user (relationship): コメントを作成したユーザーとの関連性。
         post (relationship): コメントが対象とする投稿との関連性。
+
+    Indexes:
+        ix_comments_post_id_comment_id: 投稿ごとのコメント一覧に使用。
+        ix_comments_user_id: ユーザーごとのコメントの検索と削除に使用。
     """
 
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_post_id_comment_id", "post_id", "comment_id"),
+        Index("ix_comments_user_id", "user_id"),
+    )
 
     comment_id = Column(Integer, autoincrement=True, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.user_id"))
-    post_id = Column(Integer, ForeignKey("posts.post_id"))
+    user_id = Column(
+        Integer,
+        ForeignKey("users.user_id", name="fk_comments_user_id", ondelete="CASCADE"),
+    )
+    post_id = Column(
+        Integer,
+        ForeignKey("posts.post_id", name="fk_comments_post_id", ondelete="CASCADE"),
+    )
     contents = Column(String(256))
 
     user = relationship("User", back_populates="comment")
     post = relationship("Post", back_populates="comment")
+
+
+class AccountDeletion(Base):
+    """
+    アカウント削除の進捗を表すデータベーステーブルのモデルクラスです。
+
+    削除の完了後もユーザーの行とは独立して残るため、外部キーは持ちません。
+
+    Attributes:
+        user_id (int): 削除するユーザーの識別子。
+        requested_at (datetime): 削除を受け付けた日時。
+        deleted_posts (int): 削除済みの投稿の数。
+        deleted_comments (int): 削除済みのコメントの数。
+        finished_at (datetime): 削除が完了した日時。完了していない場合はNone。
+    """
+
+    __tablename__ = "account_deletions"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    requested_at = Column(DateTime, nullable=False)
+    deleted_posts = Column(Integer, nullable=False, default=0, server_default="0")
+    deleted_comments = Column(Integer, nullable=False, default=0, server_default="0")
+    finished_at = Column(DateTime, nullable=True)
+
+
+class TableVersion(Base):
+    """
+    テーブルのバージョンスタンプを表すデータベーステーブルのモデルクラスです。
+
+    テーブル全体の一覧に影響する書き込みのコミット後に、別のトランザクションで増加し、
+    一覧の ETag に使用されます。書き込みのトランザクションではこの行をロックしません。
+    テーブルの作成時にスタンプの行が作成されます。
+
+    Attributes:
+        table_name (str): スタンプの名前。
+        version (int): バージョンスタンプ。
+    """
+
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+listen(
+    TableVersion.__table__,
+    "after_create",
+    DDL("INSERT INTO table_versions (table_name, version) VALUES ('users', 0)"),
+)
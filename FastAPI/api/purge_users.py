@@ -0,0 +1,51 @@
+"""
+Account Purge Command.
+
+This script purges the posts, comments and rows of users whose account
+deletion was accepted but not finished, for example because the worker that
+ran the background purge was restarted. Each user is purged in small batched
+transactions and the progress is printed as it finishes.
+
+Usage:
+    python -m api.purge_users [--batch-size N] [--pause SECONDS]
+"""
+import argparse
+import asyncio
+
+import api.cruds.user as user_crud
+from api.db import async_session
+
+
+async def purge_pending(batch_size: int, pause: float) -> int:
+    """
+    Purge every user whose account deletion is unfinished.
+
+    Args:
+        batch_size (int): Number of rows deleted per transaction.
+        pause (float): Seconds to sleep between batches.
+
+    Returns:
+        int: Number of purged users.
+    """
+    async with async_session() as db:
+        user_ids = await user_crud.read_pending_user_deletions(db=db)
+        for user_id in user_ids:
+            deletion = await user_crud.purge_user(
+                db=db, user_id=user_id, batch_size=batch_size, pause=pause
+            )
+            print(
+                f"user {user_id}: deleted {deletion.deleted_posts} posts, "
+                f"{deletion.deleted_comments} comments"
+            )
+    print(f"purged {len(user_ids)} users")
+    return len(user_ids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Purge deleted user accounts.")
+    parser.add_argument(
+        "--batch-size", type=int, default=user_crud.USER_PURGE_BATCH_SIZE
+    )
+    parser.add_argument("--pause", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(purge_pending(batch_size=args.batch_size, pause=args.pause))
@@ -0,0 +1,43 @@
+"""
+Counter Reconciliation Command.
+
+This script recounts the denormalized post and comment counts of every user
+and repairs those that drifted, for example through writes made outside the
+API. Users are recounted in small batched transactions so the job can run
+against a live database.
+
+Usage:
+    python -m api.reconcile_counts [--batch-size N] [--pause SECONDS]
+"""
+import argparse
+import asyncio
+
+from api.cruds import counter
+from api.db import async_session
+
+
+async def reconcile(batch_size: int, pause: float) -> int:
+    """
+    Recount the counters of every user and print the number of repaired users.
+
+    Args:
+        batch_size (int): Number of users recounted per transaction.
+        pause (float): Seconds to sleep between batches.
+
+    Returns:
+        int: Number of users whose counters were repaired.
+    """
+    async with async_session() as db:
+        repaired = await counter.reconcile_counts(
+            db=db, batch_size=batch_size, pause=pause
+        )
+    print(f"repaired counters of {repaired} users")
+    return repaired
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repair user post and comment counts.")
+    parser.add_argument("--batch-size", type=int, default=counter.RECONCILE_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(reconcile(batch_size=args.batch_size, pause=args.pause))
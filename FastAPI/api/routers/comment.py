@@ -0,0 +1,156 @@
+"""
+Comment API Router.
+
+This module defines FastAPI routes for managing comment-related operations.
+
+Classes:
+    - router: FastAPI APIRouter instance for comment operations.
+
+Routes:
+    - GET /users/{user_id}/posts/{post_id}/comments: List comments on a post.
+    - POST /users/{user_id}/posts/{post_id}/comments: Comment on a post.
+    - DELETE /users/{user_id}/posts/{post_id}/comments/{comment_id}: Delete an own comment.
+
+Usage:
+    - Import the 'router' instance.
+    - Include the router in your FastAPI app.
+
+Example:
+    from fastapi import FastAPI
+    from api.routers import comment
+
+    app = FastAPI()
+    app.include_router(comment.router)
+
+    # Your FastAPI app now includes the comment routes.
+"""
+from typing import Annotated, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import api.cruds.comment as comment_crud
+import api.cruds.token as token_crud
+import api.schemas.comment as comment_schema
+import api.schemas.user as user_schema
+from api.db import get_db, get_read_db
+from api.utils import pagination
+from api.utils.responses import rows_response
+
+router = APIRouter()
+bearer_scheme = HTTPBearer()
+
+
+@router.get(
+    "/users/{user_id}/posts/{post_id}/comments",
+    response_model=List[comment_schema.Comment],
+)
+async def list_comments(
+    user_id: int,
+    post_id: int,
+    page: pagination.PageQuery = Depends(pagination.page_query),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    List comments on a post.
+
+    Comments are returned one page at a time in ascending comment_id order.
+    Cursors for the adjacent pages are returned in the X-Next-Cursor and
+    X-Prev-Cursor response headers and can be passed back as 'after' and
+    'before' respectively.
+
+    Args:
+        user_id (int): ID of the user who created the post.
+        post_id (int): ID of the post whose comments to list.
+        page (pagination.PageQuery): Page size and cursors of the comments to list.
+        db (AsyncSession): AsyncSQLAlchemy session.
+
+    Returns:
+        List[comment_schema.Comment]: List of comment data for the post.
+
+    Raises:
+        HTTPException: If the cursors are invalid.
+    """
+    rows = await comment_crud.read_comment(
+        db=db, post_user_id=user_id, post_id=post_id, page=page
+    )
+    comments, next_cursor, prev_cursor = pagination.paginate(
+        rows, page, key="comment_id"
+    )
+    response = rows_response(comments)
+    pagination.set_cursor_headers(response, next_cursor, prev_cursor)
+    return response
+
+
+@router.post(
+    "/users/{user_id}/posts/{post_id}/comments",
+    dependencies=[Depends(bearer_scheme)],
+    response_model=comment_schema.CommentCreateResponse,
+)
+async def create_comments(
+    auth_user: Annotated[user_schema.User, Depends(token_crud.get_current_user)],
+    user_id: int,
+    post_id: int,
+    comment_body: comment_schema.CommentCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Comment on a post as the authenticated user.
+
+    Args:
+        auth_user (Annotated[user_schema.User]): Authenticated user data.
+        user_id (int): ID of the user who created the post.
+        post_id (int): ID of the post to comment on.
+        comment_body (comment_schema.CommentCreate): Request body containing comment data.
+        db (AsyncSession): AsyncSQLAlchemy session.
+
+    Returns:
+        comment_schema.CommentCreateResponse: Created comment data.
+
+    Raises:
+        HTTPException: If the specified post is not found.
+    """
+    comment = await comment_crud.create_comment(
+        db=db,
+        comment_create=comment_body,
+        post_user_id=user_id,
+        post_id=post_id,
+        user_id=auth_user.user_id,
+    )
+    if comment is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return comment
+
+
+@router.delete(
+    "/users/{user_id}/posts/{post_id}/comments/{comment_id}",
+    dependencies=[Depends(bearer_scheme)],
+    response_model=None,
+)
+async def delete_comments(
+    auth_user: Annotated[user_schema.User, Depends(token_crud.get_current_user)],
+    post_id: int,
+    comment_id: int,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Delete a comment written by the authenticated user.
+
+    Args:
+        auth_user (Annotated[user_schema.User]): Authenticated user data.
+        post_id (int): ID of the post the comment is on.
+        comment_id (int): ID of the comment to delete.
+        db (AsyncSession): AsyncSQLAlchemy session.
+
+    Returns:
+        None
+
+    Raises:
+        HTTPException: If the specified comment is not found.
+    """
+    deleted = await comment_crud.delete_comment_by_id(
+        db=db, comment_id=comment_id, post_id=post_id, user_id=auth_user.user_id
+    )
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Comment not found")
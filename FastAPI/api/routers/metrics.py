@@ -0,0 +1,50 @@
+"""
+Metrics API Router.
+
+This module defines a FastAPI route reporting in-process runtime metrics.
+
+Classes:
+    - router: FastAPI APIRouter instance for metrics.
+
+Routes:
+    - GET /metrics: Report password hashing, cache, pub/sub and query coalescing metrics of this worker.
+
+Usage:
+    - Import the 'router' instance.
+    - Include the router in your FastAPI app.
+
+Example:
+    from fastapi import FastAPI
+    from api.routers import metrics
+
+    app = FastAPI()
+    app.include_router(metrics.router)
+"""
+from fastapi import APIRouter
+
+import api.cruds.post as post_crud
+import api.cruds.token as token_crud
+import api.cruds.user as user_crud
+from api.utils.hash_service import hash_service
+from api.utils.pubsub import get_broker
+from api.utils.singleflight import get_single_flight_stats
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Report password hashing, cache, pub/sub and query coalescing metrics of this worker.
+
+    Returns:
+        dict: Metrics grouped by component.
+    """
+    return {
+        "password_hashing": hash_service.metrics(),
+        "decoded_token_cache": token_crud.get_decoded_token_cache_stats(),
+        "user_cache": user_crud.get_user_cache_stats(),
+        "post_cache": post_crud.get_post_cache_stats(),
+        "pubsub": get_broker().metrics(),
+        "single_flight": get_single_flight_stats(),
+    }
@@ -8,7 +8,10 @@ Classes:
 
 Routes:
     - GET /users/{user_id}/posts: List posts for a specific user.
+    - GET /users/{user_id}/posts/with-comments: List posts with their latest comments.
+    - GET /users/{user_id}/posts/events: Stream changes to a user's posts as Server-Sent Events.
     - POST /user/{user_id}/posts: Create a new post for a specific user.
+    - POST /users/{user_id}/posts/bulk: Create many posts for a specific user at once.
     - PUT /users/{user_id}/posts/{post_id}: Update an existing post for a specific user.
     - DELETE /users/{user_id}/posts/{post_id}: Delete an existing post for a specific user.
 
@@ -25,38 +28,198 @@ Example:
 
     # Your FastAPI app now includes the post routes.
 """
-from typing import Annotated, List
+import json
+from typing import Annotated, AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+import api.cruds.comment as comment_crud
 import api.cruds.post as post_crud
 import api.cruds.token as token_crud
+import api.cruds.user as user_crud
+import api.cruds.version as version_crud
 import api.schemas.post as post_schema
 import api.schemas.user as user_schema
-from api.db import get_db
+from api.db import get_db, get_read_db
+from api.exceptions import InvalidFieldsError, SubscriptionEvictedError
+from api.utils import pagination
+from api.utils.etag import conditional_response, stamp_not_modified
+from api.utils.fields import parse_fields
+from api.utils.pubsub import get_broker
+from api.utils.responses import rows_response
 
 router = APIRouter()
 bearer_scheme = HTTPBearer()
 
+SSE_MEDIA_TYPE = "text/event-stream"
+SSE_KEEPALIVE_SECONDS = 15
+
 
 @router.get("/users/{user_id}/posts", response_model=List[post_schema.Post])
-async def list_posts(user_id: int, db: AsyncSession = Depends(get_db)):
+async def list_posts(
+    user_id: int,
+    page: pagination.PageQuery = Depends(pagination.optional_page_query),
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+):
     """
     List posts for a specific user.
 
+    Posts are returned in ascending post_id order. With 'limit' or a cursor
+    they are returned one page at a time (see
+    api.utils.pagination.optional_page_query). Cursors for the adjacent pages
+    are returned in the X-Next-Cursor and X-Prev-Cursor response headers and
+    can be passed back as 'after' and 'before' respectively. Without them
+    every post is returned.
+
+    With 'fields', only the listed columns (and post_id) are selected and
+    returned, e.g. "fields=post_id" for the IDs alone.
+
+    The response carries a weak ETag built from the version stamp of the
+    user's posts. If the If-None-Match header matches it, 304 Not Modified is
+    returned without querying the posts.
+
     Args:
         user_id (int): ID of the user for whom to list posts.
+        page (pagination.PageQuery): Page size and cursors of the request.
+        fields (Optional[str]): Comma-separated names of the columns to return.
+        if_none_match (Optional[str]): If-None-Match header of the request.
         db (AsyncSession): AsyncSQLAlchemy session.
 
     Returns:
         List[post_schema.Post]: List of post data for the specified user.
 
+    Raises:
+        HTTPException: If the cursors or fields are invalid.
+    """
+    try:
+        columns = parse_fields(fields, allowed=post_schema.POST_FIELDS, key="post_id")
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {e}") from e
+
+    # The stamp is read before the posts, so a write in between can only make
+    # the ETag older than the data, never newer. Passing it on keeps read_post
+    # from sharing rows read before the stamp.
+    stamp = await version_crud.read_posts_version(db=db, user_id=user_id)
+    not_modified = stamp_not_modified(if_none_match, stamp)
+    if not_modified is not None:
+        return not_modified
+
+    rows = await post_crud.read_post(
+        user_id=user_id, db=db, page=page, fields=columns, version=stamp
+    )
+    posts, next_cursor, prev_cursor = pagination.paginate(rows, page, key="post_id")
+    response = rows_response(posts)
+    pagination.set_cursor_headers(response, next_cursor, prev_cursor)
+    return conditional_response(response, if_none_match, stamp)
+
+
+@router.get(
+    "/users/{user_id}/posts/with-comments",
+    response_model=List[post_schema.PostWithComments],
+)
+async def list_posts_with_comments(
+    user_id: int,
+    response: Response,
+    page: pagination.PageQuery = Depends(pagination.optional_page_query),
+    comments: int = Query(3, ge=1, le=post_schema.MAX_LATEST_COMMENTS),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    List posts for a specific user with the latest comments of each post.
+
+    Posts are paginated as in GET /users/{user_id}/posts. The comments of the
+    whole page are loaded with one batched query, so a page costs two queries
+    however many posts it holds.
+
+    Args:
+        user_id (int): ID of the user for whom to list posts.
+        response (Response): Response used to set the cursor headers.
+        page (pagination.PageQuery): Page size and cursors of the request.
+        comments (int): Maximum number of latest comments per post.
+        db (AsyncSession): AsyncSQLAlchemy session.
+
+    Returns:
+        List[post_schema.PostWithComments]: List of post data with comments.
+
+    Raises:
+        HTTPException: If the cursors are invalid.
+    """
+    rows = await post_crud.read_post(user_id=user_id, db=db, page=page)
+    posts, next_cursor, prev_cursor = pagination.paginate(rows, page, key="post_id")
+    comments_by_post = await comment_crud.read_latest_comments(
+        db=db, post_ids=[post.post_id for post in posts], limit=comments
+    )
+    pagination.set_cursor_headers(response, next_cursor, prev_cursor)
+    return [
+        {
+            "post_id": post.post_id,
+            "user_id": post.user_id,
+            "contents": post.contents,
+            "comments": comments_by_post[post.post_id],
+        }
+        for post in posts
+    ]
+
+
+@router.get("/users/{user_id}/posts/events", response_class=StreamingResponse)
+async def stream_post_events(user_id: int, db: AsyncSession = Depends(get_read_db)):
+    """
+    Stream changes to a user's posts as Server-Sent Events.
+
+    Each created, updated or deleted post is sent as an event named after the
+    change, with the post as JSON data; a bulk creation is sent as one
+    "bulk_created" event with the IDs of the posts. A comment is sent every
+    SSE_KEEPALIVE_SECONDS to keep proxies from closing an idle connection.
+
+    A client that falls too far behind is sent an "evicted" event and the
+    stream ends; it should reload the posts with GET /users/{user_id}/posts
+    and reconnect.
+
+    Args:
+        user_id (int): ID of the user whose posts to watch.
+        db (AsyncSession): AsyncSQLAlchemy session.
+
+    Returns:
+        StreamingResponse: Stream of events.
+
     Raises:
         HTTPException: If the specified user is not found.
     """
-    return await post_crud.read_post(user_id=user_id, db=db)
+    user = await user_crud.get_user_by_id(db=db, user_id=user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    # The session is not used by the stream, so release its connection now
+    # instead of when the client disconnects.
+    await db.close()
+    return StreamingResponse(
+        _sse_post_events(user_id=user_id),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _sse_post_events(user_id: int) -> AsyncIterator[str]:
+    broker = get_broker()
+    subscription = broker.subscribe(post_crud.post_events_channel(user_id))
+    try:
+        while True:
+            try:
+                message = await subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+            except SubscriptionEvictedError:
+                yield "event: evicted\ndata: {}\n\n"
+                return
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            data = {key: value for key, value in message.items() if key != "event"}
+            yield f"event: {message['event']}\ndata: {json.dumps(data)}\n\n"
+    finally:
+        broker.unsubscribe(subscription)
 
 
 @router.post(
@@ -88,6 +251,34 @@ async def create_posts(
     )
 
 
+@router.post(
+    "/users/{user_id}/posts/bulk",
+    dependencies=[Depends(bearer_scheme)],
+    response_model=post_schema.PostBulkCreateResponse,
+)
+async def bulk_create_posts(
+    auth_user: Annotated[user_schema.User, Depends(token_crud.get_current_user)],
+    post_body: post_schema.PostBulkCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create many posts for a specific user in a single transaction.
+
+    Args:
+        auth_user (Annotated[user_schema.User]): Authenticated user data.
+        post_body (post_schema.PostBulkCreate): Request body containing the posts.
+        db (AsyncSession): AsyncSQLAlchemy session.
+
+    Returns:
+        post_schema.PostBulkCreateResponse: IDs of the created posts.
+    """
+    user_id = auth_user.user_id
+    post_ids = await post_crud.bulk_create_post(
+        db=db, post_creates=post_body.posts, user_id=user_id
+    )
+    return {"user_id": user_id, "post_ids": post_ids}
+
+
 @router.put(
     "/users/{user_id}/posts/{post_id}",
     dependencies=[Depends(bearer_scheme)],
@@ -114,11 +305,12 @@ async def update_posts(
     Raises:
         HTTPException: If the specified user or post is not found.
     """
-    post = await post_crud.get_post(db=db, user_id=auth_user.user_id, post_id=post_id)
+    post = await post_crud.update_post_by_id(
+        db=db, post_id=post_id, user_id=auth_user.user_id, post_create=post_body
+    )
     if post is None:
         raise HTTPException(status_code=404, detail="Post not found")
-
-    return await post_crud.update_post(db=db, post_create=post_body, original=post)
+    return post
 
 
 @router.delete(
@@ -145,9 +337,8 @@ async def delete_posts(
     Raises:
         HTTPException: If the specified user or post is not found.
     """
-
-    post = await post_crud.get_post(db=db, user_id=auth_user.user_id, post_id=post_id)
-    if post is None:
+    deleted = await post_crud.delete_post_by_id(
+        db=db, post_id=post_id, user_id=auth_user.user_id
+    )
+    if not deleted:
         raise HTTPException(status_code=404, detail="Post not found")
-
-    return await post_crud.delete_post(db=db, original=post)
@@ -34,7 +34,7 @@ import api.cruds.user as user_crud
 import api.schemas.token as token_schema
 import api.schemas.user as user_schema
 from api.db import get_db
-from api.utils.hash_generator import HashGenerator
+from api.utils.hash_service import hash_service
 
 router = APIRouter()
 bearer_scheme = HTTPBearer()
@@ -59,9 +59,16 @@ async def login_for_access_token(
         HTTPException: If the provided username or password is incorrect.
     """
     user = await user_crud.get_user_by_name(db=db, user_name=auth_info.user_name)
-    password_hash = HashGenerator().hash_string(auth_info.password)
-    if user.password_hash == password_hash:
-        access_token = token_crud.create_access_token(data={"sub": auth_info.user_name})
+    if user is not None and await hash_service.verify(
+        auth_info.password, user.password_hash
+    ):
+        access_token = token_crud.create_access_token(
+            data={
+                "sub": user.user_name,
+                "uid": user.user_id,
+                "ver": user.token_version,
+            }
+        )
         return {
             "access_token": access_token,
             "token_type": "bearer",
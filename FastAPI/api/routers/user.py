@@ -7,10 +7,12 @@ Classes:
     - router: FastAPI APIRouter instance for user operations.
 
 Routes:
-    - GET /users: List all users.
+    - GET /users: List all users, paginated or streamed as NDJSON.
     - POST /users: Create a new user.
+    - POST /users/import: Create many users at once, reporting conflicting user names.
     - PUT /users/{user_id}: Update an existing user.
-    - DELETE /users/{user_id}: Delete an existing user.
+    - DELETE /users/{user_id}: Delete an existing user, optionally in the background.
+    - GET /users/{user_id}/deletion: Get the progress of a user's deletion.
 
 Usage:
     - Import the 'router' instance.
@@ -25,41 +27,126 @@ Example:
 
     # Your FastAPI app now includes the user routes.
 """
+import json
 import sqlite3
-from typing import Annotated, List
+from typing import Annotated, AsyncIterator, List, Optional
 
 import pymysql
 import starlette.status
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.background import BackgroundTasks
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 import api.cruds.token as token_crud
 import api.cruds.user as user_crud
+import api.cruds.version as version_crud
 import api.schemas.user as user_schema
-from api.db import get_db
-from api.exceptions import IntegrityViolationError
-from api.utils import HashGenerator
+from api.db import async_session, get_db, get_read_db
+from api.exceptions import IntegrityViolationError, InvalidFieldsError
+from api.utils import pagination
+from api.utils.etag import conditional_response, stamp_not_modified
+from api.utils.fields import parse_fields
+from api.utils.hash_service import hash_service
+from api.utils.responses import rows_response
 
 router = APIRouter()
 bearer_scheme = HTTPBearer()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 
 @router.get("/users", response_model=List[user_schema.User])
-async def list_users(db: AsyncSession = Depends(get_db)):
+async def list_users(
+    page: pagination.PageQuery = Depends(pagination.optional_page_query),
+    fields: Optional[str] = None,
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+):
     """
     Get a list of all users.
 
+    Users are returned in ascending user_id order. With 'limit' or a cursor
+    they are returned one page at a time (see
+    api.utils.pagination.optional_page_query). Cursors for the adjacent pages
+    are returned in the X-Next-Cursor and X-Prev-Cursor response headers and
+    can be passed back as 'after' and 'before' respectively. Without them
+    every user is returned.
+
+    With 'fields', only the listed columns (and user_id) are selected and
+    returned, e.g. "fields=user_id" for the IDs alone.
+
+    The response carries a weak ETag. If the If-None-Match header matches
+    it, 304 Not Modified is returned. When the post and comment counts are
+    not requested, the ETag is built from the version stamp of the users
+    table and the users are not queried for a 304. The counts change with
+    every post and comment and are not stamped, so with them the ETag is
+    derived from the response body.
+
+    If the request accepts application/x-ndjson, every user after the
+    'after' cursor is instead streamed as newline-delimited JSON while the
+    rows are read from the database, ignoring 'limit'.
+
     Args:
+        page (pagination.PageQuery): Page size and cursors of the request.
+        fields (Optional[str]): Comma-separated names of the columns to return.
+        accept (Optional[str]): Accept header of the request.
+        if_none_match (Optional[str]): If-None-Match header of the request.
         db (AsyncSession): AsyncSQLAlchemy session.
 
     Returns:
         List[user_schema.User]: List of user data.
 
     Raises:
-        HTTPException: If an error occurs during the operation.
+        HTTPException: If the cursors or fields are invalid.
     """
-    return await user_crud.read_user(db=db)
+    try:
+        columns = parse_fields(fields, allowed=user_schema.USER_FIELDS, key="user_id")
+    except InvalidFieldsError as e:
+        raise HTTPException(
+            status_code=starlette.status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {e}",
+        ) from e
+
+    if accept is not None and NDJSON_MEDIA_TYPE in accept:
+        if page.before is not None:
+            raise HTTPException(
+                status_code=starlette.status.HTTP_400_BAD_REQUEST,
+                detail="before is not supported when streaming",
+            )
+        return StreamingResponse(
+            _ndjson_users(db=db, after=page.after), media_type=NDJSON_MEDIA_TYPE
+        )
+
+    # The stamp is read before the users, so a write in between can only make
+    # the ETag older than the data, never newer. Passing it on keeps read_user
+    # from sharing rows read before the stamp.
+    stamp = await version_crud.read_table_version(
+        db=db, table_name=version_crud.USERS_TABLE
+    )
+    if columns is None or set(columns) & set(user_schema.USER_COUNTER_FIELDS):
+        etag_stamp = None
+    else:
+        etag_stamp = stamp
+    not_modified = stamp_not_modified(if_none_match, etag_stamp)
+    if not_modified is not None:
+        return not_modified
+
+    rows = await user_crud.read_user(db=db, page=page, fields=columns, version=stamp)
+    users, next_cursor, prev_cursor = pagination.paginate(rows, page, key="user_id")
+    response = rows_response(users)
+    pagination.set_cursor_headers(response, next_cursor, prev_cursor)
+    return conditional_response(response, if_none_match, etag_stamp)
+
+
+async def _ndjson_users(db: AsyncSession, after: Optional[int]) -> AsyncIterator[bytes]:
+    async for chunk in user_crud.stream_user(db=db, after=after):
+        yield "".join(
+            json.dumps({"user_id": row.user_id, "user_name": row.user_name}) + "\n"
+            for row in chunk
+        ).encode("utf-8")
 
 
 @router.post("/users", response_model=user_schema.UserCreateResponse)
@@ -80,7 +167,7 @@ async def create_users(
         HTTPException: If an error occurs during the operation, such as duplicate user name.
     """
     try:
-        password_hash = HashGenerator().hash_string(user_body.password)
+        password_hash = await hash_service.hash(user_body.password)
         user_create = user_schema.UserCreate(
             user_name=user_body.user_name, password_hash=password_hash
         )
@@ -93,13 +180,48 @@ async def create_users(
         ) from e
 
 
+@router.post("/users/import", response_model=user_schema.UserImportResponse)
+async def import_users(
+    user_body: user_schema.UserImportRequest, db: AsyncSession = Depends(get_db)
+):
+    """
+    Create many users at once, reporting conflicting user names.
+
+    Passwords are hashed in parallel in a worker pool and the users are
+    inserted in batches. Users whose name already exists, or repeats earlier
+    in the request, are skipped and reported instead of failing the import.
+
+    Args:
+        user_body (user_schema.UserImportRequest): Request body containing the users.
+        db (AsyncSession): AsyncSQLAlchemy session.
+
+    Returns:
+        user_schema.UserImportResponse: Number of created users and the conflicts.
+    """
+    password_hashes = await hash_service.hash_many(
+        [user.password for user in user_body.users]
+    )
+    user_creates = [
+        user_schema.UserCreate(user_name=user.user_name, password_hash=password_hash)
+        for user, password_hash in zip(user_body.users, password_hashes)
+    ]
+    conflicts = await user_crud.import_users(db=db, user_creates=user_creates)
+    return {
+        "created": len(user_creates) - len(conflicts),
+        "conflicts": [
+            {"index": index, "user_name": user_creates[index].user_name}
+            for index in conflicts
+        ],
+    }
+
+
 @router.put(
     "/users/{user_id}",
     dependencies=[Depends(bearer_scheme)],
     response_model=user_schema.UserCreateResponse,
 )
 async def update_users(
-    auth_user: Annotated[user_schema.User, Depends(token_crud.get_current_user)],
+    auth_user: Annotated[user_schema.User, Depends(token_crud.get_current_db_user)],
     user_body: user_schema.UserCreateRequest,
     db: AsyncSession = Depends(get_db),
 ):
@@ -118,7 +240,7 @@ async def update_users(
         HTTPException: If an error occurs during the operation.
     """
 
-    password_hash = HashGenerator().hash_string(user_body.password)
+    password_hash = await hash_service.hash(user_body.password)
     user_create = user_schema.UserCreate(
         user_name=user_body.user_name, password_hash=password_hash
     )
@@ -131,20 +253,71 @@ async def update_users(
     "/users/{user_id}", dependencies=[Depends(bearer_scheme)], response_model=None
 )
 async def delete_users(
-    auth_user: Annotated[user_schema.User, Depends(token_crud.get_current_user)],
+    auth_user: Annotated[user_schema.User, Depends(token_crud.get_current_db_user)],
+    response: Response,
+    background_tasks: BackgroundTasks,
+    background: bool = False,
     db: AsyncSession = Depends(get_db),
 ):
     """
     Delete an existing user.
 
+    With 'background' the user is soft-deleted and hidden at once, and the
+    response is 202 Accepted with the deletion progress. Their posts and
+    comments are then purged in small batches after the response is sent;
+    GET /users/{user_id}/deletion reports the progress.
+
     Args:
         auth_user (Annotated[user_schema.User]): Authenticated user data.
+        response (Response): Response used to set the status code.
+        background_tasks (BackgroundTasks): Tasks run after the response.
+        background (bool): Purge the user's data in the background.
         db (AsyncSession): AsyncSQLAlchemy session.
 
     Returns:
-        None
+        Optional[user_schema.UserDeletion]: Deletion progress with 'background',
+            otherwise None.
 
     Raises:
         HTTPException: If an error occurs during the operation.
     """
-    return await user_crud.delete_user(db=db, original=auth_user)
+    if not background:
+        return await user_crud.delete_user(db=db, original=auth_user)
+
+    deletion = await user_crud.request_user_deletion(db=db, original=auth_user)
+    background_tasks.add_task(
+        _purge_user_in_background, engine=db.bind, user_id=deletion.user_id
+    )
+    response.status_code = starlette.status.HTTP_202_ACCEPTED
+    return user_schema.UserDeletion.model_validate(deletion)
+
+
+async def _purge_user_in_background(engine: AsyncEngine, user_id: int) -> None:
+    # The request's session may be closed before background tasks run, and
+    # would hold its connection for the whole purge.
+    async with async_session(bind=engine) as db:
+        await user_crud.purge_user(db=db, user_id=user_id)
+
+
+@router.get("/users/{user_id}/deletion", response_model=user_schema.UserDeletion)
+async def get_user_deletion(user_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Get the progress of a user's deletion.
+
+    Args:
+        user_id (int): ID of the user.
+        db (AsyncSession): AsyncSQLAlchemy session.
+
+    Returns:
+        user_schema.UserDeletion: Deletion progress.
+
+    Raises:
+        HTTPException: If the user's deletion was not requested.
+    """
+    deletion = await user_crud.get_user_deletion(db=db, user_id=user_id)
+    if deletion is None:
+        raise HTTPException(
+            status_code=starlette.status.HTTP_404_NOT_FOUND,
+            detail="Deletion not found",
+        )
+    return deletion
@@ -0,0 +1,66 @@
+"""
+Comment Models Module.
+
+This module defines Pydantic models for representing comment-related data structures.
+
+Classes:
+    - CommentBase: Base model for comment data with optional contents.
+    - Comment: Model representing a comment with comment_id, user_id, post_id and contents.
+    - CommentCreate: Model for creating a comment with optional contents.
+    - CommentCreateResponse: Model representing the response for creating a comment.
+
+Usage:
+    - Import the required model classes.
+    - Use these models for validating and handling comment-related data.
+
+Example:
+    from api.schemas.comment import Comment, CommentCreate
+
+    comment_data = {"comment_id": 1, "user_id": 1, "post_id": 1, "contents": "Nice"}
+    comment = Comment(**comment_data)
+
+    comment_creation = CommentCreate(contents="New comment contents")
+"""
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CommentBase(BaseModel):
+    """
+    Base model for comment data with optional contents.
+    """
+
+    contents: Optional[str] = Field(None)
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "contents": "Comment",
+                }
+            ]
+        }
+    }
+
+
+class Comment(CommentBase):
+    """
+    Model representing a comment with comment_id, user_id, post_id and contents.
+    """
+
+    comment_id: int
+    user_id: int
+    post_id: int
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CommentCreate(CommentBase):
+    """
+    Model for creating a comment with optional contents.
+    """
+
+
+class CommentCreateResponse(Comment):
+    """
+    Model representing the response for creating a comment.
+    """
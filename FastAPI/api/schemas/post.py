@@ -8,6 +8,9 @@ Classes:
     - Post: Model representing a post with user_id, post_id, and optional contents.
     - PostCreate: Model for creating a post with optional contents.
     - PostCreateResponse: Model representing the response for creating a post.
+    - PostBulkCreate: Model for creating up to MAX_BULK_POSTS posts at once.
+    - PostBulkCreateResponse: Model representing the response for creating posts at once.
+    - PostWithComments: Model representing a post with its latest comments.
 
 Usage:
     - Import the required model classes.
@@ -22,10 +25,16 @@ Example:
     post_creation_data = {"contents": "New post contents"}
     post_creation = PostCreate(**post_creation_data)
 """
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+import api.schemas.comment as comment_schema
+
+MAX_BULK_POSTS = 1000
+POST_FIELDS = ("post_id", "user_id", "contents")
+MAX_LATEST_COMMENTS = 20
+
 
 class PostBase(BaseModel):
     """
@@ -68,3 +77,40 @@ class PostCreateResponse(PostCreate):
     user_id: int
     post_id: int
     model_config = ConfigDict(from_attributes=True)
+
+
+class PostBulkCreate(BaseModel):
+    """
+    Model for creating up to MAX_BULK_POSTS posts at once.
+    """
+
+    posts: List[PostCreate] = Field(..., min_length=1, max_length=MAX_BULK_POSTS)
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "posts": [
+                        {"contents": "Contents1"},
+                        {"contents": "Contents2"},
+                    ]
+                }
+            ]
+        }
+    }
+
+
+class PostBulkCreateResponse(BaseModel):
+    """
+    Model representing the response for creating posts at once.
+    """
+
+    user_id: int
+    post_ids: List[int]
+
+
+class PostWithComments(Post):
+    """
+    Model representing a post with its latest comments.
+    """
+
+    comments: List[comment_schema.Comment]
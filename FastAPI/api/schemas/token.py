@@ -61,3 +61,5 @@ class TokenData(BaseModel):
     """
 
     user_name: Union[str, None] = None
+    user_id: Union[int, None] = None
+    token_version: Union[int, None] = None
@@ -5,10 +5,16 @@ This module defines Pydantic models for representing user-related data structure
 
 Classes:
     - UserBase: Base model for user data with optional user_name.
-    - User: Model representing user data with user_id and optional user_name.
+    - User: Model representing user data with user_id, optional user_name and counts.
     - UserCreateRequest: Model for creating a user with optional password.
     - UserCreate: Model representing a created user with password hash.
     - UserCreateResponse: Model representing the response for creating a user.
+    - UserCounts: Mixin adding the user's post and comment counts.
+    - UserImportItem: Model representing one user of a bulk import.
+    - UserImportRequest: Model for importing up to MAX_IMPORT_USERS users at once.
+    - UserImportConflict: Model representing a user that could not be imported.
+    - UserImportResponse: Model representing the response for importing users.
+    - UserDeletion: Model representing the progress of an account deletion.
 
 Usage:
     - Import the required model classes.
@@ -23,10 +29,15 @@ Example:
     user_creation_data = {"user_name": "new_user", "password": "P@ssw0rd"}
     user_creation = UserCreate(**user_creation_data)
 """
-from typing import Optional
+import datetime
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+MAX_IMPORT_USERS = 50000
+USER_FIELDS = ("user_id", "user_name", "post_count", "comment_count")
+USER_COUNTER_FIELDS = ("post_count", "comment_count")
+
 
 class UserBase(BaseModel):
     """
@@ -36,9 +47,21 @@ class UserBase(BaseModel):
     user_name: Optional[str] = Field(None)
 
 
-class User(UserBase):
+class UserCounts(BaseModel):
+    """
+    Mixin adding the user's post and comment counts.
+
+    The counts are denormalized on the user row and are None where the
+    user was not read from the database.
+    """
+
+    post_count: Optional[int] = Field(None)
+    comment_count: Optional[int] = Field(None)
+
+
+class User(UserCounts, UserBase):
     """
-    Model representing user data with user_id and optional user_name.
+    Model representing user data with user_id, optional user_name and counts.
     """
 
     user_id: int
@@ -48,6 +71,8 @@ class User(UserBase):
                 {
                     "use_id": 1,
                     "user_name": "anonymous",
+                    "post_count": 10,
+                    "comment_count": 25,
                 }
             ]
         }
@@ -90,7 +115,7 @@ class UserCreate(UserBase):
     }
 
 
-class UserCreateResponse(UserCreate):
+class UserCreateResponse(UserCounts, UserCreate):
     """
     Model representing the response for creating a user.
     """
@@ -103,7 +128,82 @@ class UserCreateResponse(UserCreate):
                     "user_id": 1,
                     "user_name": "anonymous",
                     "password_hash": "b03ddf3ca2e714a6548e7495e2a03f5e824eaac9837cd7f159c67b90fb4b7342",
+                    "post_count": 0,
+                    "comment_count": 0,
+                }
+            ]
+        }
+    }
+
+
+class UserImportItem(UserBase):
+    """
+    Model representing one user of a bulk import.
+    """
+
+    user_name: str
+    password: str
+
+
+class UserImportRequest(BaseModel):
+    """
+    Model for importing up to MAX_IMPORT_USERS users at once.
+    """
+
+    users: List[UserImportItem] = Field(..., min_length=1, max_length=MAX_IMPORT_USERS)
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "users": [
+                        {"user_name": "anonymous", "password": "P@ssw0rd"},
+                        {"user_name": "hoge", "password": "hoge"},
+                    ]
                 }
             ]
         }
     }
+
+
+class UserImportConflict(BaseModel):
+    """
+    Model representing a user that could not be imported.
+    """
+
+    index: int
+    user_name: str
+
+
+class UserImportResponse(BaseModel):
+    """
+    Model representing the response for importing users.
+    """
+
+    created: int
+    conflicts: List[UserImportConflict]
+
+
+class UserDeletion(BaseModel):
+    """
+    Model representing the progress of an account deletion.
+    """
+
+    user_id: int
+    requested_at: datetime.datetime
+    deleted_posts: int
+    deleted_comments: int
+    finished_at: Optional[datetime.datetime] = None
+    model_config = {
+        "from_attributes": True,
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "user_id": 1,
+                    "requested_at": "2024-01-01T00:00:00",
+                    "deleted_posts": 1000,
+                    "deleted_comments": 2500,
+                    "finished_at": None,
+                }
+            ]
+        },
+    }
@@ -1 +1,3 @@
+from .cache import TTLCache, WeightLimit
 from .hash_generator import HashGenerator
+from .result_cache import CacheBackend, InProcessCacheBackend, ResultCache
@@ -0,0 +1,168 @@
+"""
+TTLCache Class.
+
+This class provides a small in-process LRU cache whose entries expire after a
+time-to-live. It is meant for hot lookups that run on every request, such as
+authentication data, and keeps hit and miss counters for monitoring.
+
+Usage:
+    - Instantiate the TTLCache class with a maximum size and a default TTL.
+    - To bound the memory used as well, pass a WeightLimit holding a maximum
+      weight and a function estimating the weight (e.g. the size in bytes) of
+      a value.
+    - Use 'get', 'set' and 'pop' to read, write and invalidate entries.
+
+Example:
+    cache = TTLCache(max_size=1000, ttl=60)
+    sized_cache = TTLCache(max_size=1000, ttl=60, weight_limit=WeightLimit(2**20, len))
+    cache.set("key", "value")
+    value = cache.get("key")
+    cache.pop("key")
+
+Note:
+    - The cache is not shared between worker processes.
+    - The cache is not thread-safe; use it from the event loop only.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+
+class WeightLimit(NamedTuple):
+    """
+    Bound on the total weight of the values of a TTLCache.
+    """
+
+    max_weight: int
+    weigher: Callable[[Any], int]
+
+
+@dataclass
+class _Counters:
+    weight: int = 0
+    hits: int = 0
+    misses: int = 0
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry expiry.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        timer: Callable[[], float] = time.monotonic,
+        weight_limit: Optional[WeightLimit] = None,
+    ):
+        """
+        Constructor method to initialize the TTLCache.
+
+        Args:
+            max_size (int): Maximum number of entries kept in the cache.
+            ttl (float): Default time-to-live of an entry in seconds.
+            timer (Callable[[], float]): Clock used to compute expiry.
+            weight_limit (Optional[WeightLimit]): Bound on the total weight of
+                the values, or None.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.weight_limit = weight_limit
+        self._timer = timer
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._counters = _Counters()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value for a key.
+
+        Args:
+            key (Hashable): Cache key.
+            default (Any): Value returned if the key is missing or expired.
+
+        Returns:
+            Any: Cached value, or 'default'.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at, _weight = entry
+            if expires_at > self._timer():
+                self._entries.move_to_end(key)
+                self._counters.hits += 1
+                return value
+            self.pop(key)
+        self._counters.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key (Hashable): Cache key.
+            value (Any): Value to store.
+            ttl (Optional[float]): Time-to-live in seconds, overriding the default.
+
+        Returns:
+            None
+        """
+        ttl = self.ttl if ttl is None else ttl
+        self.pop(key)
+        if ttl <= 0:
+            return
+        limit = self.weight_limit
+        weight = 1 if limit is None else limit.weigher(value)
+        self._entries[key] = (value, self._timer() + ttl, weight)
+        self._counters.weight += weight
+        while len(self._entries) > self.max_size or (
+            limit is not None and self._counters.weight > limit.max_weight
+        ):
+            _key, (_value, _expires_at, weight) = self._entries.popitem(last=False)
+            self._counters.weight -= weight
+
+    def pop(self, key: Hashable) -> None:
+        """
+        Invalidate a key.
+
+        Args:
+            key (Hashable): Cache key.
+
+        Returns:
+            None
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._counters.weight -= entry[2]
+
+    def clear(self) -> None:
+        """
+        Invalidate every key and reset the counters.
+
+        Returns:
+            None
+        """
+        self._entries.clear()
+        self._counters = _Counters()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the size and hit/miss counters of the cache.
+
+        Returns:
+            Dict[str, int]: Current size, hits and misses, and the current
+                weight if the cache has a maximum weight.
+        """
+        counters = self._counters
+        stats = {
+            "size": len(self._entries),
+            "hits": counters.hits,
+            "misses": counters.misses,
+        }
+        if self.weight_limit is not None:
+            stats["weight"] = counters.weight
+        return stats
+
+    def __len__(self) -> int:
+        return len(self._entries)
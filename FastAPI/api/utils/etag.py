@@ -0,0 +1,138 @@
+"""
+ETag Helpers.
+
+This module builds weak ETags from the version stamps of api.cruds.version
+and evaluates If-None-Match request headers against them, so that list
+endpoints can answer an unchanged poll with 304 Not Modified before running
+their query. Listings of data without a stamp get an ETag derived from the
+response body instead, which saves the transfer but not the query.
+
+Functions:
+    - make_etag: Build a weak ETag from a version stamp.
+    - make_content_etag: Build a weak ETag from a response body.
+    - etag_matches: Check whether an If-None-Match header matches an ETag.
+    - not_modified_response: Build a 304 Not Modified response.
+    - stamp_not_modified: Answer a request whose copy matches a version stamp.
+    - conditional_response: Attach an ETag to a response, or answer 304.
+
+Example:
+    stamp = await read_posts_version(db, user_id=1)
+    not_modified = stamp_not_modified(if_none_match, stamp)
+    if not_modified is not None:
+        return not_modified
+    response = rows_response(await read_post(db, user_id=1))
+    return conditional_response(response, if_none_match, stamp)
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Response, status
+
+
+def make_etag(stamp: int) -> str:
+    """
+    Build a weak ETag from a version stamp.
+
+    The ETag is weak because it identifies the data, not the exact bytes of a
+    representation, and it is the same for every page of a listing; clients
+    compare it per URL.
+
+    Args:
+        stamp (int): Version stamp of the listed data.
+
+    Returns:
+        str: Weak ETag, e.g. 'W/"42"'.
+    """
+    return f'W/"{stamp}"'
+
+
+def make_content_etag(body: bytes) -> str:
+    """
+    Build a weak ETag from a response body.
+
+    Args:
+        body (bytes): Encoded response body.
+
+    Returns:
+        str: Weak ETag holding a digest of the body.
+    """
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check whether an If-None-Match header matches an ETag.
+
+    The comparison is weak, as required for If-None-Match: the W/ prefix is
+    ignored on both sides.
+
+    Args:
+        if_none_match (Optional[str]): If-None-Match header of the request.
+        etag (str): Current ETag of the resource.
+
+    Returns:
+        bool: True if the client's copy is current.
+    """
+    if if_none_match is None:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def not_modified_response(etag: str) -> Response:
+    """
+    Build a 304 Not Modified response.
+
+    Args:
+        etag (str): Current ETag of the resource.
+
+    Returns:
+        Response: Empty response carrying the ETag.
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def stamp_not_modified(
+    if_none_match: Optional[str], stamp: Optional[int]
+) -> Optional[Response]:
+    """
+    Answer a request whose copy matches a version stamp.
+
+    Args:
+        if_none_match (Optional[str]): If-None-Match header of the request.
+        stamp (Optional[int]): Version stamp of the listed data, if any.
+
+    Returns:
+        Optional[Response]: 304 Not Modified response, or None if the client's
+            copy is not current and the listing has to be read.
+    """
+    if stamp is None:
+        return None
+    etag = make_etag(stamp)
+    return not_modified_response(etag) if etag_matches(if_none_match, etag) else None
+
+
+def conditional_response(
+    response: Response, if_none_match: Optional[str], stamp: Optional[int] = None
+) -> Response:
+    """
+    Attach an ETag to a response, or answer 304 if the client's copy is current.
+
+    Args:
+        response (Response): Response of the listing.
+        if_none_match (Optional[str]): If-None-Match header of the request.
+        stamp (Optional[int]): Version stamp of the listed data. Without it
+            the ETag is derived from the response body.
+
+    Returns:
+        Response: The response carrying the ETag, or 304 Not Modified.
+    """
+    etag = make_content_etag(response.body) if stamp is None else make_etag(stamp)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+    return response
@@ -0,0 +1,48 @@
+"""
+Sparse Fieldset Helpers.
+
+This module parses the 'fields' query parameter of list endpoints, which lets
+clients ask for a subset of the columns of each row. Only the requested
+columns are selected from the database and serialized into the response.
+
+Functions:
+    - parse_fields: Parse a comma-separated 'fields' parameter.
+
+Example:
+    columns = parse_fields("post_id,contents", allowed=POST_FIELDS, key="post_id")
+    rows = await read_post(db, user_id=1, page=PageQuery(limit=20), fields=columns)
+    return rows_response(rows)
+"""
+from typing import List, Optional, Sequence
+
+from api.exceptions import InvalidFieldsError
+
+
+def parse_fields(
+    fields: Optional[str], allowed: Sequence[str], key: str
+) -> Optional[List[str]]:
+    """
+    Parse a comma-separated 'fields' parameter.
+
+    The key column is always included, because pagination cursors are built
+    from it. The columns are returned in the order of 'allowed'.
+
+    Args:
+        fields (Optional[str]): Comma-separated column names, or None.
+        allowed (Sequence[str]): Column names that may be requested.
+        key (str): Name of the key column.
+
+    Returns:
+        Optional[List[str]]: Column names to select, or None for every column.
+
+    Raises:
+        InvalidFieldsError: If an unknown column is requested.
+    """
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise InvalidFieldsError(", ".join(sorted(unknown)))
+    requested.add(key)
+    return [field for field in allowed if field in requested]
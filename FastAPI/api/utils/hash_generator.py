@@ -1,52 +1,139 @@
 """
 HashGenerator Class.
 
-This class provides a simple utility for generating SHA-256 hash values for input strings.
+This class provides a simple utility for generating hash values for input strings.
 
 Usage:
-    - Instantiate the HashGenerator class.
+    - Use the shared 'hash_generator' instance configured from the environment,
+      or instantiate the HashGenerator class with an algorithm.
     - Use the 'hash_string' method to hash a given input string.
+    - Use the 'hash_many' method to hash many strings at once.
+    - Use the 'verify_string' method to check a string against a stored hash.
 
 Example:
-    hash_generator = HashGenerator()
     hashed_value = hash_generator.hash_string("example_string")
+    hashed_values = hash_generator.hash_many(["a", "b"])
+    hash_generator.verify_string("example_string", hashed_value)
+
+    pbkdf2_generator = HashGenerator(algorithm="pbkdf2_sha256", iterations=600000)
+
+Constants:
+    - HASH_ALGORITHM: Algorithm of the shared instance (default "sha256").
+    - HASH_ITERATIONS: Iterations of the shared instance for "pbkdf2_sha256".
 
 Note:
-    - The class uses the SHA-256 hashing algorithm.
-    - The 'hash_string' method updates the internal hash object and returns the hashed string.
+    - "sha256" produces an unsalted SHA-256 hex digest, the format of existing
+      password hashes.
+    - "pbkdf2_sha256" produces "pbkdf2_sha256$<iterations>$<salt>$<digest>"
+      with a random salt per hash, so equal inputs give different hashes and
+      must be compared with 'verify_string'.
+    - Instances hold no mutable state, so one instance can be shared between
+      threads and sent to worker processes.
 """
 import hashlib
+import hmac
+import os
+import secrets
+from typing import List
+
+HASH_ALGORITHM = os.environ.get("HASH_ALGORITHM", "sha256")
+HASH_ITERATIONS = int(os.environ.get("HASH_ITERATIONS", "600000"))
 
 
 class HashGenerator:
     """
-    HashGenerator class for generating SHA-256 hash values.
+    HashGenerator class for generating hash values.
     """
 
-    def __init__(self):
+    ALGORITHMS = ("sha256", "pbkdf2_sha256")
+
+    def __init__(
+        self, algorithm: str = "sha256", iterations: int = 600000, salt_size: int = 16
+    ):
         """
         Constructor method to initialize the HashGenerator.
 
-        Initializes an internal SHA-256 hash object.
+        Args:
+            algorithm (str): "sha256" or "pbkdf2_sha256".
+            iterations (int): Number of iterations for "pbkdf2_sha256".
+            salt_size (int): Salt length in bytes for "pbkdf2_sha256".
 
         Usage:
             hash_generator = HashGenerator()
         """
-        self._hash_object = hashlib.sha256()
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Unknown hash algorithm: {algorithm}")
+        self._algorithm = algorithm
+        self._iterations = iterations
+        self._salt_size = salt_size
 
-    def hash_string(self, input_string):
+    @property
+    def algorithm(self) -> str:
+        """
+        Name of the algorithm used for new hashes.
         """
-        Hash a given input string using SHA-256.
+        return self._algorithm
+
+    def hash_string(self, input_string: str) -> str:
+        """
+        Hash a given input string.
 
         Args:
             input_string (str): The input string to be hashed.
 
         Returns:
-            str: The SHA-256 hashed string.
+            str: The hashed string.
 
         Usage:
             hashed_value = hash_generator.hash_string("example_string")
         """
-        self._hash_object.update(input_string.encode("utf-8"))
-        hashed_string = self._hash_object.hexdigest()
-        return hashed_string
+        if self._algorithm == "pbkdf2_sha256":
+            salt = secrets.token_hex(self._salt_size)
+            return self._pbkdf2_sha256(input_string, salt, self._iterations)
+        return hashlib.sha256(input_string.encode("utf-8")).hexdigest()
+
+    def hash_many(self, input_strings: List[str]) -> List[str]:
+        """
+        Hash a list of strings.
+
+        Args:
+            input_strings (List[str]): The input strings to be hashed.
+
+        Returns:
+            List[str]: The hashed strings, in input order.
+        """
+        return [self.hash_string(input_string) for input_string in input_strings]
+
+    def verify_string(self, input_string: str, hashed_string: str) -> bool:
+        """
+        Check an input string against a stored hash.
+
+        The algorithm and its parameters are taken from the stored hash, so
+        hashes created with any supported algorithm can be verified.
+
+        Args:
+            input_string (str): The input string to check.
+            hashed_string (str): The stored hash.
+
+        Returns:
+            bool: True if the input string matches the stored hash.
+        """
+        if hashed_string.startswith("pbkdf2_sha256$"):
+            try:
+                _, iterations, salt, _ = hashed_string.split("$")
+                expected = self._pbkdf2_sha256(input_string, salt, int(iterations))
+            except ValueError:
+                return False
+        else:
+            expected = hashlib.sha256(input_string.encode("utf-8")).hexdigest()
+        return hmac.compare_digest(expected, hashed_string)
+
+    @staticmethod
+    def _pbkdf2_sha256(input_string: str, salt: str, iterations: int) -> str:
+        digest = hashlib.pbkdf2_hmac(
+            "sha256", input_string.encode("utf-8"), salt.encode("ascii"), iterations
+        )
+        return f"pbkdf2_sha256${iterations}${salt}${digest.hex()}"
+
+
+hash_generator = HashGenerator(algorithm=HASH_ALGORITHM, iterations=HASH_ITERATIONS)
@@ -0,0 +1,217 @@
+"""
+HashService Class.
+
+This class hashes passwords in a thread or process pool so that slow hashing
+does not block the event loop. The number of pending hashing tasks is bounded;
+once the bound is reached new requests are rejected with HashQueueFullError
+instead of queueing without limit, so a login storm sheds load rather than
+delaying every other request.
+
+Constants:
+    - HASH_EXECUTOR: Pool type, "thread" or "process" (default "thread").
+    - HASH_WORKERS: Number of workers in the pool (default: CPU count).
+    - HASH_MAX_PENDING: Maximum number of pending hashing tasks (default 1000).
+
+Usage:
+    - Use the shared 'hash_service' instance configured from the environment,
+      or instantiate HashService for a dedicated pool.
+    - Await 'hash' for one string or 'hash_many' for many strings.
+    - Await 'verify' to check a string against a stored hash.
+    - Use 'metrics' to report hashing latency and queue depth.
+
+Example:
+    password_hash = await hash_service.hash("P@ssw0rd")
+    password_hashes = await hash_service.hash_many(["a", "b"])
+    is_valid = await hash_service.verify("P@ssw0rd", password_hash)
+    hash_service.metrics()
+"""
+import asyncio
+import os
+import time
+from concurrent import futures
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, TypeVar, Union
+
+from api.exceptions import HashQueueFullError
+from api.utils.hash_generator import HashGenerator, hash_generator
+
+HASH_EXECUTOR = os.environ.get("HASH_EXECUTOR", "thread")
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_MAX_PENDING = int(os.environ.get("HASH_MAX_PENDING", "1000"))
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Counters:
+    pending: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+
+
+class HashService:
+    """
+    HashService class for hashing strings in a bounded worker pool.
+    """
+
+    def __init__(
+        self,
+        executor_type: str = HASH_EXECUTOR,
+        max_workers: int = HASH_WORKERS,
+        max_pending: int = HASH_MAX_PENDING,
+        generator: HashGenerator = hash_generator,
+    ):
+        """
+        Constructor method to initialize the HashService.
+
+        The worker pool is created on first use.
+
+        Args:
+            executor_type (str): Pool type, "thread" or "process".
+            max_workers (int): Number of workers in the pool.
+            max_pending (int): Maximum number of pending hashing tasks.
+            generator (HashGenerator): Hasher run in the pool, the shared instance by default.
+        """
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Unknown executor type: {executor_type}")
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.generator = generator
+        self._executor: Optional[futures.Executor] = None
+        self._counters = _Counters()
+
+    async def hash(self, input_string: str) -> str:
+        """
+        Hash a string in the worker pool.
+
+        Args:
+            input_string (str): The input string to be hashed.
+
+        Returns:
+            str: The hashed string.
+
+        Raises:
+            HashQueueFullError: If max_pending tasks are already pending.
+        """
+        (hashed_string,) = await self._submit(self.generator.hash_many, [input_string])
+        return hashed_string
+
+    async def hash_many(
+        self, input_strings: List[str], chunk_size: int = 1000
+    ) -> List[str]:
+        """
+        Hash many strings in parallel in the worker pool.
+
+        The strings are split into chunks of 'chunk_size', each hashed as one task.
+
+        Args:
+            input_strings (List[str]): The input strings to be hashed.
+            chunk_size (int): Number of strings hashed per task.
+
+        Returns:
+            List[str]: The hashed strings, in input order.
+
+        Raises:
+            HashQueueFullError: If the chunks do not fit in the pending bound.
+        """
+        chunks = [
+            input_strings[start : start + chunk_size]
+            for start in range(0, len(input_strings), chunk_size)
+        ]
+        if self._counters.pending + len(chunks) > self.max_pending:
+            self._counters.rejected += 1
+            raise HashQueueFullError
+        results = await asyncio.gather(
+            *(self._submit(self.generator.hash_many, chunk) for chunk in chunks)
+        )
+        return [hashed_string for result in results for hashed_string in result]
+
+    async def verify(self, input_string: str, hashed_string: str) -> bool:
+        """
+        Check a string against a stored hash in the worker pool.
+
+        Args:
+            input_string (str): The input string to check.
+            hashed_string (str): The stored hash.
+
+        Returns:
+            bool: True if the input string matches the stored hash.
+
+        Raises:
+            HashQueueFullError: If max_pending tasks are already pending.
+        """
+        return await self._submit(
+            self.generator.verify_string, input_string, hashed_string
+        )
+
+    def metrics(self) -> Dict[str, Union[int, float]]:
+        """
+        Report hashing latency and queue depth.
+
+        Returns:
+            Dict[str, Union[int, float]]: Pending tasks, tasks waiting for a
+                worker, completed, failed and rejected tasks, and the average
+                and maximum latency of the completed tasks in milliseconds.
+        """
+        counters = self._counters
+        return {
+            "pending": counters.pending,
+            "queue_depth": max(0, counters.pending - self.max_workers),
+            "completed": counters.completed,
+            "failed": counters.failed,
+            "rejected": counters.rejected,
+            "latency_avg_ms": (
+                counters.latency_total / counters.completed * 1000
+                if counters.completed
+                else 0.0
+            ),
+            "latency_max_ms": counters.latency_max * 1000,
+        }
+
+    def shutdown(self) -> None:
+        """
+        Shut down the worker pool, waiting for pending tasks.
+
+        Returns:
+            None
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def _submit(self, func: Callable[..., T], *args) -> T:
+        counters = self._counters
+        if counters.pending >= self.max_pending:
+            counters.rejected += 1
+            raise HashQueueFullError
+        if self._executor is None:
+            executor_class = (
+                futures.ProcessPoolExecutor
+                if self.executor_type == "process"
+                else futures.ThreadPoolExecutor
+            )
+            self._executor = executor_class(max_workers=self.max_workers)
+
+        counters.pending += 1
+        started = time.perf_counter()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._executor, func, *args
+            )
+        except Exception:
+            counters.failed += 1
+            raise
+        finally:
+            counters.pending -= 1
+        latency = time.perf_counter() - started
+        counters.completed += 1
+        counters.latency_total += latency
+        counters.latency_max = max(counters.latency_max, latency)
+        return result
+
+
+hash_service = HashService()
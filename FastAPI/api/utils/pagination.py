@@ -0,0 +1,244 @@
+"""
+Keyset Pagination Helpers.
+
+This module provides helpers for opaque cursor (keyset) pagination.
+A cursor wraps the primary key of the row at a page boundary, so fetching the
+next page is a "WHERE key > cursor ORDER BY key LIMIT n" query whose cost does
+not depend on how deep the client has scrolled.
+
+Classes:
+    - PageQuery: Page size and decoded cursors of a list request.
+
+Constants:
+    - DEFAULT_PAGE_SIZE: Number of rows returned when a cursor is given without 'limit'.
+    - MAX_PAGE_SIZE: Upper bound accepted for 'limit'.
+    - NEXT_CURSOR_HEADER: Response header carrying the cursor of the next page.
+    - PREV_CURSOR_HEADER: Response header carrying the cursor of the previous page.
+
+Functions:
+    - encode_cursor: Encode a key into an opaque cursor string.
+    - decode_cursor: Decode an opaque cursor string back into a key.
+    - decode_cursors: Decode the 'after'/'before' pair of a list request.
+    - page_query: Dependency reading the page of a list request.
+    - optional_page_query: Dependency reading the page of a list request, if any.
+    - paginate: Trim a "limit + 1" result set into a page and its cursors.
+    - set_cursor_headers: Expose the cursors of a page as response headers.
+
+Example:
+    @router.get("/users/{user_id}/posts")
+    async def list_posts(user_id: int, page: PageQuery = Depends(optional_page_query)):
+        rows = await read_post(db, user_id=user_id, page=page)
+        items, next_cursor, prev_cursor = paginate(rows, page, key="post_id")
+        set_cursor_headers(response, next_cursor, prev_cursor)
+
+Note:
+    Listings that returned every row before they were paginated keep doing so
+    for clients that send neither 'limit' nor a cursor, so that existing
+    clients are not silently cut off at the first page.
+"""
+import base64
+import binascii
+import json
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, status
+from starlette.responses import Response
+
+from api.exceptions import InvalidCursorError
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+
+
+class PageQuery(NamedTuple):
+    """
+    Page size and decoded cursors of a list request.
+
+    A 'limit' of None requests every row.
+    """
+
+    limit: Optional[int] = None
+    after: Optional[int] = None
+    before: Optional[int] = None
+
+
+def encode_cursor(key: int) -> str:
+    """
+    Encode a key into an opaque cursor string.
+
+    Args:
+        key (int): Primary key of the row at the page boundary.
+
+    Returns:
+        str: URL-safe cursor string.
+    """
+    raw = json.dumps({"k": key}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """
+    Decode an opaque cursor string back into a key.
+
+    Args:
+        cursor (Optional[str]): Cursor string received from the client.
+
+    Returns:
+        Optional[int]: Decoded key, or None if no cursor was given.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+    """
+    if cursor is None:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))["k"]
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError from e
+    if not isinstance(key, int) or isinstance(key, bool):
+        raise InvalidCursorError
+    return key
+
+
+def decode_cursors(
+    after: Optional[str], before: Optional[str]
+) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Decode the 'after'/'before' pair of a list request.
+
+    Args:
+        after (Optional[str]): Cursor of the row after which to start.
+        before (Optional[str]): Cursor of the row before which to end.
+
+    Returns:
+        Tuple[Optional[int], Optional[int]]: Decoded 'after' and 'before' keys.
+
+    Raises:
+        InvalidCursorError: If a cursor is malformed or both are given.
+    """
+    if after is not None and before is not None:
+        raise InvalidCursorError("Only one of after and before may be given")
+    return decode_cursor(after), decode_cursor(before)
+
+
+def _decode_page_cursors(
+    after: Optional[str], before: Optional[str]
+) -> Tuple[Optional[int], Optional[int]]:
+    try:
+        return decode_cursors(after, before)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from e
+
+
+def page_query(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+) -> PageQuery:
+    """
+    Dependency reading the page of a list request.
+
+    Without 'limit' a page of DEFAULT_PAGE_SIZE rows is requested.
+
+    Args:
+        limit (int): Requested page size.
+        after (Optional[str]): Cursor of the row after which to start.
+        before (Optional[str]): Cursor of the row before which to end.
+
+    Returns:
+        PageQuery: Page size and decoded cursors.
+
+    Raises:
+        HTTPException: If a cursor is invalid.
+    """
+    after_id, before_id = _decode_page_cursors(after, before)
+    return PageQuery(limit=limit, after=after_id, before=before_id)
+
+
+def optional_page_query(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+) -> PageQuery:
+    """
+    Dependency reading the page of a list request, if any.
+
+    Without 'limit' and cursors every row is requested. A cursor without
+    'limit' requests a page of DEFAULT_PAGE_SIZE rows.
+
+    Args:
+        limit (Optional[int]): Requested page size.
+        after (Optional[str]): Cursor of the row after which to start.
+        before (Optional[str]): Cursor of the row before which to end.
+
+    Returns:
+        PageQuery: Page size and decoded cursors.
+
+    Raises:
+        HTTPException: If a cursor is invalid.
+    """
+    after_id, before_id = _decode_page_cursors(after, before)
+    if limit is None and (after_id is not None or before_id is not None):
+        limit = DEFAULT_PAGE_SIZE
+    return PageQuery(limit=limit, after=after_id, before=before_id)
+
+
+def paginate(
+    rows: Sequence[Any], page: PageQuery, key: str
+) -> Tuple[List[Any], Optional[str], Optional[str]]:
+    """
+    Trim a "limit + 1" result set into a page and its cursors.
+
+    The CRUD layer fetches one row more than requested so that the existence
+    of a further page can be detected without a COUNT query. Rows fetched for
+    a 'before' cursor arrive in descending key order and are reversed here.
+    Without a limit every row is returned and there are no cursors.
+
+    Args:
+        rows (Sequence[Any]): Rows returned by the CRUD layer.
+        page (PageQuery): Page size and decoded cursors used for the query.
+        key (str): Name of the key attribute on each row.
+
+    Returns:
+        Tuple[List[Any], Optional[str], Optional[str]]:
+            Page rows in ascending key order, next cursor and previous cursor.
+    """
+    if page.limit is None:
+        return list(rows), None, None
+    has_more = len(rows) > page.limit
+    items = list(rows[: page.limit])
+    if page.before is not None:
+        items.reverse()
+    if not items:
+        return items, None, None
+
+    first = encode_cursor(getattr(items[0], key))
+    last = encode_cursor(getattr(items[-1], key))
+    if page.before is not None:
+        return items, last, first if has_more else None
+    return items, last if has_more else None, first if page.after is not None else None
+
+
+def set_cursor_headers(
+    response: Response, next_cursor: Optional[str], prev_cursor: Optional[str]
+) -> None:
+    """
+    Expose the cursors of a page as response headers.
+
+    Args:
+        response (Response): Response to add the headers to.
+        next_cursor (Optional[str]): Cursor of the next page, if any.
+        prev_cursor (Optional[str]): Cursor of the previous page, if any.
+
+    Returns:
+        None
+    """
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if prev_cursor is not None:
+        response.headers[PREV_CURSOR_HEADER] = prev_cursor
@@ -0,0 +1,268 @@
+"""
+Publish/Subscribe Broker.
+
+This module delivers messages published on a channel to every subscriber of
+that channel. It feeds the Server-Sent Events streams, so that clients are
+told about changes instead of polling for them.
+
+Every subscriber has a bounded buffer. A subscriber whose buffer is full when
+a message arrives is evicted instead of blocking the publisher or buffering
+without limit, so one slow client cannot hold up the writes or exhaust the
+memory of the worker.
+
+Classes:
+    - Subscription: A subscriber's bounded buffer of messages on one channel.
+    - Broker: Interface of a publish/subscribe broker.
+    - InMemoryBroker: Broker delivering messages within the local process.
+
+Functions:
+    - get_broker: Return the broker used by the application.
+    - set_broker: Replace the broker used by the application.
+
+Constants:
+    - PUBSUB_BUFFER_SIZE: Messages buffered per subscriber (default 100).
+
+Usage:
+    - Publishers await 'publish' after committing the change they announce.
+    - Subscribers call 'subscribe', await 'get' in a loop and call
+      'unsubscribe' when done.
+    - To share events between worker processes, implement a broker on top of
+      a shared message bus and install it with 'set_broker' on startup.
+      Subclassing InMemoryBroker and calling 'deliver' for each message
+      received from the bus keeps the local fan-out and eviction.
+
+Example:
+    subscription = get_broker().subscribe("posts:1")
+    try:
+        message = await subscription.get(timeout=15)
+    finally:
+        get_broker().unsubscribe(subscription)
+
+    await get_broker().publish("posts:1", {"event": "created", "post_id": 1})
+
+Note:
+    - The in-memory broker only reaches subscribers connected to the same
+      worker process as the publisher.
+    - Brokers are not thread-safe; use them from the event loop only.
+"""
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Set
+
+from api.exceptions import SubscriptionEvictedError
+
+PUBSUB_BUFFER_SIZE = int(os.environ.get("PUBSUB_BUFFER_SIZE", "100"))
+
+_EVICTED = object()
+
+
+class Subscription:
+    """
+    A subscriber's bounded buffer of messages on one channel.
+    """
+
+    def __init__(self, channel: str, max_size: int = PUBSUB_BUFFER_SIZE):
+        """
+        Constructor method to initialize the Subscription.
+
+        Args:
+            channel (str): Channel subscribed to.
+            max_size (int): Maximum number of buffered messages.
+        """
+        self.channel = channel
+        self.evicted = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+
+    def put(self, message: Dict[str, Any]) -> bool:
+        """
+        Buffer a message without waiting.
+
+        Args:
+            message (Dict[str, Any]): Message to buffer.
+
+        Returns:
+            bool: False if the buffer is full and the message was dropped.
+        """
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def evict(self) -> None:
+        """
+        Discard the buffered messages and wake up the subscriber.
+
+        Returns:
+            None
+        """
+        self.evicted = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(_EVICTED)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next message.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait, or None to wait forever.
+
+        Returns:
+            Optional[Dict[str, Any]]: Next message, or None on timeout.
+
+        Raises:
+            SubscriptionEvictedError: If the subscriber fell behind and was evicted.
+        """
+        try:
+            message = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if message is _EVICTED:
+            raise SubscriptionEvictedError(self.channel)
+        return message
+
+
+class Broker(ABC):
+    """
+    Interface of a publish/subscribe broker.
+    """
+
+    @abstractmethod
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        """
+        Publish a message to every subscriber of a channel.
+
+        Args:
+            channel (str): Channel to publish on.
+            message (Dict[str, Any]): JSON-compatible message.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def subscribe(
+        self, channel: str, max_size: int = PUBSUB_BUFFER_SIZE
+    ) -> Subscription:
+        """
+        Subscribe to a channel.
+
+        Args:
+            channel (str): Channel to subscribe to.
+            max_size (int): Maximum number of messages buffered for the subscriber.
+
+        Returns:
+            Subscription: The new subscription.
+        """
+
+    @abstractmethod
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Cancel a subscription. Cancelling it twice has no effect.
+
+        Args:
+            subscription (Subscription): Subscription to cancel.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def metrics(self) -> Dict[str, int]:
+        """
+        Report the subscriber, message and eviction counters of the broker.
+
+        Returns:
+            Dict[str, int]: Metrics of the broker.
+        """
+
+
+class InMemoryBroker(Broker):
+    """
+    Broker delivering messages to the subscribers of the local process.
+    """
+
+    def __init__(self):
+        """
+        Constructor method to initialize the InMemoryBroker.
+        """
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+        self.evictions = 0
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        self.published += 1
+        self.deliver(channel, message)
+
+    def deliver(self, channel: str, message: Dict[str, Any]) -> None:
+        """
+        Buffer a message for the local subscribers of a channel.
+
+        Subscribers whose buffer is full are evicted.
+
+        Args:
+            channel (str): Channel the message was published on.
+            message (Dict[str, Any]): JSON-compatible message.
+
+        Returns:
+            None
+        """
+        for subscription in list(self._subscriptions.get(channel, ())):
+            if not subscription.put(message):
+                self.evictions += 1
+                self.unsubscribe(subscription)
+                subscription.evict()
+
+    def subscribe(
+        self, channel: str, max_size: int = PUBSUB_BUFFER_SIZE
+    ) -> Subscription:
+        subscription = Subscription(channel, max_size=max_size)
+        self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.channel)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.channel]
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "channels": len(self._subscriptions),
+            "subscribers": sum(len(subs) for subs in self._subscriptions.values()),
+            "published": self.published,
+            "evictions": self.evictions,
+        }
+
+
+_broker: Broker = InMemoryBroker()
+
+
+def get_broker() -> Broker:
+    """
+    Return the broker used by the application.
+
+    Returns:
+        Broker: The current broker.
+    """
+    return _broker
+
+
+def set_broker(broker: Broker) -> None:
+    """
+    Replace the broker used by the application.
+
+    Call it on startup, before any client subscribes.
+
+    Args:
+        broker (Broker): The new broker.
+
+    Returns:
+        None
+    """
+    global _broker  # pylint: disable=global-statement
+    _broker = broker
@@ -0,0 +1,69 @@
+"""
+Fast JSON Responses.
+
+This module provides the JSON response class used across the application and
+a helper that writes database rows out without building response models.
+
+Classes:
+    - FastJSONResponse: JSON response encoded with orjson.
+
+Functions:
+    - rows_response: Serialize database rows into a JSON response.
+
+Usage:
+    - 'FastJSONResponse' is the default response class of the app in api.main.
+    - List endpoints return 'rows_response' of the rows read by the CRUD
+      layer. The route's response_model still documents the response, but
+      FastAPI does not validate a Response returned by the route.
+
+Example:
+    rows = await read_post(db, user_id=1, page=PageQuery(limit=20))
+    return rows_response(rows)
+
+Note:
+    - orjson is several times faster than the standard json module on large
+      lists.
+"""
+from typing import Any, Sequence
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """
+        Encode the content as compact UTF-8 JSON.
+
+        Args:
+            content (Any): JSON-compatible content.
+
+        Returns:
+            bytes: Encoded content.
+        """
+        return orjson.dumps(content)
+
+
+def rows_response(rows: Sequence) -> FastJSONResponse:
+    """
+    Serialize database rows into a JSON response.
+
+    The rows come from the database with the columns of the response model,
+    so they are written out as they are instead of being validated into a
+    response model and encoded again. The column names are taken once from
+    the first row rather than from every row.
+
+    Args:
+        rows (Sequence): Rows returned by the CRUD layer.
+
+    Returns:
+        FastJSONResponse: JSON array of one object per row.
+    """
+    if not rows:
+        return FastJSONResponse([])
+    keys = rows[0]._fields
+    return FastJSONResponse([dict(zip(keys, row)) for row in rows])
@@ -0,0 +1,282 @@
+"""
+Read-Through Result Cache.
+
+This module caches the results of read queries in front of the database.
+Results are grouped in namespaces, such as the posts of one user, and a write
+invalidates its whole namespace at once, without knowing which pages or
+parameter combinations were cached.
+
+Invalidation works by generation: every namespace has a generation token that
+is part of the key of its results, and invalidating the namespace replaces
+the token. Results stored under an old token are never read again and age
+out of the backend. A result is only stored if the token did not change while
+it was loaded, and concurrent misses only share a load started under the same
+token (see api.utils.singleflight), so a load that may predate a write never
+reaches readers that arrive after the write was invalidated.
+
+Classes:
+    - CacheBackend: Interface of a key-value store holding the cached results.
+    - InProcessCacheBackend: Backend storing results in a bounded in-process LRU.
+    - ResultCache: Read-through cache of query results, invalidated per namespace.
+
+Functions:
+    - estimate_size: Estimate the memory used by a value, such as a list of rows.
+
+Usage:
+    - Wrap a read query with 'get_or_load', and call 'invalidate' after
+      committing a write that changes the namespace.
+    - To share the cache between worker processes, implement CacheBackend on
+      top of a shared store and pass it to ResultCache. The values must then
+      be serializable by the store.
+
+Example:
+    cache = ResultCache(InProcessCacheBackend(max_size=1000, ttl=60))
+    rows = await cache.get_or_load("1", (20, None), lambda: load_posts(1))
+    await cache.invalidate("1")
+
+Note:
+    - The in-process backend is not shared between worker processes; other
+      workers see a write once their entries expire.
+    - Invalidation only covers writes made before it. Under REPEATABLE READ,
+      a load may read a snapshot older than the invalidation it follows, so
+      callers that read a version stamp before loading should make it part
+      of the key.
+"""
+import itertools
+import sys
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from api.utils.cache import TTLCache, WeightLimit
+from api.utils.singleflight import SingleFlight
+
+T = TypeVar("T")
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the memory used by a value, such as a list of rows.
+
+    Sequences are measured together with their items, recursively.
+
+    Args:
+        value (Any): Value to measure.
+
+    Returns:
+        int: Estimated size in bytes.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes)) or not isinstance(value, Sequence):
+        return size
+    return size + sum(estimate_size(item) for item in value)
+
+
+class CacheBackend(ABC):
+    """
+    Interface of a key-value store holding the cached results.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Return the value stored under a key.
+
+        Args:
+            key (str): Key of the value.
+
+        Returns:
+            Optional[Any]: Stored value, or None if missing or expired.
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: Any) -> None:
+        """
+        Store a value under a key.
+
+        Args:
+            key (str): Key of the value.
+            value (Any): Value to store, never None.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Remove every stored value.
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """
+        Report the size of the backend.
+
+        Returns:
+            Dict[str, int]: Metrics of the backend.
+        """
+
+
+class InProcessCacheBackend(CacheBackend):
+    """
+    Backend storing results in a bounded in-process LRU.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        max_bytes: Optional[int] = None,
+        sizer: Callable[[Any], int] = estimate_size,
+    ):
+        """
+        Constructor method to initialize the InProcessCacheBackend.
+
+        Args:
+            max_size (int): Maximum number of stored values.
+            ttl (float): Time-to-live of a value in seconds.
+            max_bytes (Optional[int]): Maximum estimated memory of the values.
+            sizer (Callable[[Any], int]): Function estimating the memory of a value.
+        """
+        self._cache = TTLCache(
+            max_size=max_size,
+            ttl=ttl,
+            weight_limit=None if max_bytes is None else WeightLimit(max_bytes, sizer),
+        )
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any) -> None:
+        self._cache.set(key, value)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        stats = self._cache.stats()
+        return {"size": stats["size"], "bytes": stats.get("weight", 0)}
+
+
+class ResultCache:
+    """
+    Read-through cache of query results, invalidated per namespace.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        """
+        Constructor method to initialize the ResultCache.
+
+        Args:
+            backend (CacheBackend): Store holding the results and generations.
+        """
+        self.backend = backend
+        self._token_prefix = uuid.uuid4().hex
+        self._token_counter = itertools.count()
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get_or_load(
+        self, namespace: str, key: Hashable, load: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Return the cached result for a key, loading and storing it on a miss.
+
+        Concurrent misses for the same key in the same generation share one
+        load. The result is not stored if the namespace was invalidated while
+        it was loaded.
+
+        Args:
+            namespace (str): Namespace of the result, e.g. a user ID.
+            key (Hashable): Parameters identifying the result in the namespace.
+            load (Callable[[], Awaitable[T]]): Coroutine function loading the result.
+
+        Returns:
+            T: Cached or loaded result.
+        """
+        generation = await self.backend.get(f"{namespace}:generation")
+        if generation is None:
+            generation = self._new_token()
+            await self.backend.set(f"{namespace}:generation", generation)
+        result_key = f"{namespace}:{generation}:{key!r}"
+
+        result = await self.backend.get(result_key)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        return await self._flight.do(
+            result_key, lambda: self._load(namespace, generation, result_key, load)
+        )
+
+    async def invalidate(self, namespace: str) -> None:
+        """
+        Invalidate every result of a namespace.
+
+        Call it after committing the write that changed the namespace.
+
+        Args:
+            namespace (str): Namespace to invalidate.
+
+        Returns:
+            None
+        """
+        self.invalidations += 1
+        await self.backend.set(f"{namespace}:generation", self._new_token())
+
+    def clear(self) -> None:
+        """
+        Remove every cached result and reset the counters.
+
+        Returns:
+            None
+        """
+        self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._flight.calls = 0
+        self._flight.shared = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the hit rate and size of the cache.
+
+        Returns:
+            Dict[str, Any]: Hits, misses, hit rate, misses that shared the load
+                of another miss, invalidations and the metrics of the backend.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "shared_loads": self._flight.shared,
+            "invalidations": self.invalidations,
+            **self.backend.stats(),
+        }
+
+    async def _load(
+        self,
+        namespace: str,
+        generation: str,
+        result_key: str,
+        load: Callable[[], Awaitable[T]],
+    ) -> T:
+        result = await load()
+        # An invalidation during the load may be for a write the load missed.
+        if await self.backend.get(f"{namespace}:generation") == generation:
+            await self.backend.set(result_key, result)
+        return result
+
+    def _new_token(self) -> str:
+        # Tokens are never reused, also across processes sharing a backend,
+        # so a generation lost by the backend cannot reach older results.
+        return f"{self._token_prefix}-{next(self._token_counter)}"
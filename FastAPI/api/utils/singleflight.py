@@ -0,0 +1,153 @@
+"""
+SingleFlight Class.
+
+This class coalesces concurrent identical calls: while a call for a key is in
+flight, further calls for the same key wait for it and share its result
+instead of running again. Wrapped around read queries, a burst of identical
+requests costs one database query per worker instead of one per request.
+
+Usage:
+    - Decorate an async CRUD function taking an AsyncSession 'db' with
+      'coalesce'. Calls are identified by the session's engine and the
+      remaining arguments, so reads from the primary and from a replica are
+      never shared.
+    - Or instantiate SingleFlight and await 'do' with a key and a coroutine
+      function.
+    - Use 'get_single_flight_stats' to report how many calls were shared.
+
+Example:
+    @coalesce
+    async def read_user(db: AsyncSession, version: int) -> List[Row]:
+        ...
+
+    flight = SingleFlight()
+    rows = await flight.do(("posts", 1), lambda: load_posts(1))
+
+Note:
+    - The result is shared between callers, so only coalesce functions whose
+      results are not modified or bound to a session, such as lists of rows
+      or detached snapshots.
+    - A call that joins a flight may get rows read before a write that
+      committed after the flight started, for example its own write. Callers
+      that need rows at least as new as a version stamp they read, such as
+      the ETag of a listing, pass the stamp as an argument. A write bumps the
+      stamp, so later calls use a new key and start a new flight.
+    - If the leading call fails, every waiting call fails with the same
+      exception. If the leading call is cancelled, for example because its
+      client disconnected, the waiting calls run it again.
+    - Calls are only coalesced within one worker process.
+"""
+import asyncio
+import functools
+import inspect
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+_flights: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """
+    Coalescer of concurrent calls with the same key.
+    """
+
+    def __init__(self):
+        """
+        Constructor method to initialize the SingleFlight.
+        """
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run 'func', or wait for the call already in flight for 'key'.
+
+        Args:
+            key (Hashable): Identity of the call.
+            func (Callable[[], Awaitable[T]]): Coroutine function making the call.
+
+        Returns:
+            T: Result of the call.
+        """
+        while key in self._futures:
+            future = self._futures[key]
+            self.shared += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._futures[key] = future
+        self.calls += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Do not log the exception if no one waited.
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._futures[key]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the call counters.
+
+        Returns:
+            Dict[str, int]: Calls in flight, calls made and calls that shared
+                the result of another call.
+        """
+        return {
+            "in_flight": len(self._futures),
+            "calls": self.calls,
+            "shared": self.shared,
+        }
+
+
+def coalesce(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """
+    Coalesce concurrent identical calls of an async CRUD function.
+
+    Args:
+        func (Callable[..., Awaitable[T]]): Function taking an AsyncSession 'db'.
+
+    Returns:
+        Callable[..., Awaitable[T]]: The coalescing function.
+    """
+    signature = inspect.signature(func)
+    flight = _flights[func.__qualname__] = SingleFlight()
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        db = arguments.arguments.pop("db")
+        key = (db.get_bind(), *map(_hashable, arguments.arguments.values()))
+        return await flight.do(key, lambda: func(*args, **kwargs))
+
+    return wrapper
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Report the call counters of every coalesced function.
+
+    Returns:
+        Dict[str, Dict[str, int]]: Counters keyed by function name.
+    """
+    return {name: flight.stats() for name, flight in _flights.items()}
+
+
+def _hashable(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    return value
@@ -0,0 +1,96 @@
+"""
+Insert Round Trip Benchmark.
+
+This script compares the number of statements and the time per insert of
+the previous create_post implementation (flush, commit and refresh) with the
+current one, which takes the generated key from the INSERT itself.
+
+Usage:
+    poetry run python -m benchmarks.insert_round_trips [--rows N] [--db-url URL]
+
+Note:
+    The default database is an in-memory SQLite database. Pass a MySQL URL with
+    --db-url to measure against a real server, where each statement is a
+    network round trip.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import api.cruds.post as post_crud
+import api.schemas.post as post_schema
+from api.models import model
+from api.models.model import Base
+
+
+async def _legacy_create_post(
+    db: AsyncSession, post_create: post_schema.PostCreate, user_id: int
+) -> model.Post:
+    post = model.Post(user_id=user_id, **post_create.model_dump())
+    db.add(post)
+    await db.flush()
+    await db.commit()
+    await db.refresh(post)
+    return post
+
+
+async def _measure(async_session, create, rows: int, counter: dict) -> tuple:
+    counter["statements"] = 0
+    started = time.perf_counter()
+    for i in range(rows):
+        async with async_session() as db:
+            await create(
+                db=db,
+                post_create=post_schema.PostCreate(contents=f"contents{i}"),
+                user_id=1,
+            )
+    elapsed = time.perf_counter() - started
+    return counter["statements"] / rows, elapsed / rows * 1_000_000
+
+
+async def main(rows: int, db_url: str) -> None:
+    """
+    Run the benchmark and print statements and microseconds per insert.
+    """
+    async_engine = create_async_engine(db_url)
+    async_session = sessionmaker(
+        autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession
+    )
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_session() as db:
+        db.add(model.User(user_name="benchmark", password_hash="benchmark"))
+        await db.commit()
+
+    counter = {"statements": 0}
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def _count(*_args):
+        counter["statements"] += 1
+
+    @event.listens_for(async_engine.sync_engine, "commit")
+    def _count_commit(*_args):
+        counter["statements"] += 1
+
+    print(f"{'implementation':<16}{'statements/insert':>20}{'us/insert':>12}")
+    for name, create in (
+        ("flush+refresh", _legacy_create_post),
+        ("insert only", post_crud.create_post),
+    ):
+        statements, micros = await _measure(async_session, create, rows, counter)
+        print(f"{name:<16}{statements:>20.1f}{micros:>12.0f}")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--db-url", default="sqlite+aiosqlite:///:memory:")
+    args = parser.parse_args()
+    asyncio.run(main(rows=args.rows, db_url=args.db_url))
@@ -0,0 +1,92 @@
+"""
+List Serialization Benchmark.
+
+This script compares the time spent turning a page of user rows into a JSON
+response body by FastAPI's default path (validation into the response_model,
+jsonable_encoder and the standard json module) with api.utils.responses,
+which writes the rows out directly with orjson.
+
+Usage:
+    poetry run python -m benchmarks.list_serialization [--rows N ...] [--runs N]
+
+Note:
+    Only serialization is measured. The rows are read once from an in-memory
+    SQLite database before timing starts.
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import api.cruds.user as user_crud
+import api.schemas.user as user_schema
+from api.models import model
+from api.models.model import Base
+from api.utils.responses import rows_response
+
+USERS_FIELD = create_response_field(
+    name="Response_list_users", type_=List[user_schema.User]
+)
+
+
+async def _default_path(rows) -> bytes:
+    content = await serialize_response(field=USERS_FIELD, response_content=rows)
+    return JSONResponse(content).body
+
+
+async def _fast_path(rows) -> bytes:
+    return rows_response(rows).body
+
+
+async def _read_rows(rows: int) -> list:
+    async_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async_session = sessionmaker(
+        autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession
+    )
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(model.User.__table__),
+            [
+                {"user_name": f"user{i}", "password_hash": "x", "token_version": 0}
+                for i in range(rows)
+            ],
+        )
+    async with async_session() as db:
+        result = await user_crud.read_user(db=db)
+    await async_engine.dispose()
+    return result
+
+
+async def _time_ms(serialize, result, runs: int) -> float:
+    started = time.perf_counter()
+    for _ in range(runs):
+        await serialize(result)
+    return (time.perf_counter() - started) / runs * 1000
+
+
+async def main(row_counts: List[int], runs: int) -> None:
+    """
+    Run the benchmark and print milliseconds per response for each page size.
+    """
+    print(f"{'rows':>8}{'default ms':>14}{'fast ms':>12}{'speedup':>10}")
+    for rows in row_counts:
+        result = await _read_rows(rows)
+        default = await _time_ms(_default_path, result, runs)
+        fast = await _time_ms(_fast_path, result, runs)
+        print(f"{rows:>8}{default:>14.2f}{fast:>12.2f}{default / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(row_counts=args.rows, runs=args.runs))
@@ -0,0 +1,129 @@
+"""
+Query Plan Benchmark.
+
+This script seeds a database without the secondary indexes of api.models.model,
+prints the query plan and average time of the hot lookup queries, then creates
+the indexes with api.migrate_db.create_missing_indexes and measures again.
+
+Usage:
+    poetry run python -m benchmarks.query_plans [--users N] [--posts N] [--db-url URL]
+
+Note:
+    The default database is a temporary SQLite file. Pass a MySQL URL
+    (mysql+pymysql://...) with --db-url to see MySQL's EXPLAIN output.
+    The tables of the target database are dropped and recreated.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.engine import Engine
+
+from api.migrate_db import create_missing_indexes
+from api.models import model
+from api.models.model import Base
+
+
+def _queries(user_id: int, post_id: int) -> dict:
+    return {
+        "read_post page": select(
+            model.Post.post_id, model.Post.user_id, model.Post.contents
+        )
+        .filter(model.Post.user_id == user_id, model.Post.post_id > post_id)
+        .order_by(model.Post.post_id)
+        .limit(101),
+        "get_post": select(model.Post).filter(
+            model.Post.user_id == user_id, model.Post.post_id == post_id
+        ),
+        "comments of post": select(model.Comment)
+        .filter(model.Comment.post_id == post_id)
+        .order_by(model.Comment.comment_id)
+        .limit(101),
+        "comments of user": select(model.Comment.comment_id).filter(
+            model.Comment.user_id == user_id
+        ),
+    }
+
+
+def _seed(engine: Engine, users: int, posts: int) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.drop(bind=engine)
+
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(model.User.__table__),
+            [
+                {"user_name": f"user{i}", "password_hash": "x", "token_version": 0}
+                for i in range(users)
+            ],
+        )
+        conn.execute(
+            insert(model.Post.__table__),
+            [
+                {"user_id": rng.randint(1, users), "contents": f"post{i}"}
+                for i in range(posts)
+            ],
+        )
+        conn.execute(
+            insert(model.Comment.__table__),
+            [
+                {
+                    "user_id": rng.randint(1, users),
+                    "post_id": rng.randint(1, posts),
+                    "contents": f"comment{i}",
+                }
+                for i in range(posts)
+            ],
+        )
+
+
+def _report(engine: Engine, label: str, runs: int) -> None:
+    explain = "EXPLAIN QUERY PLAN" if engine.dialect.name == "sqlite" else "EXPLAIN"
+    print(f"== {label}")
+    with engine.connect() as conn:
+        user_id, post_id = conn.execute(
+            select(model.Post.user_id, model.Post.post_id).order_by(
+                model.Post.post_id.desc()
+            )
+        ).first()
+        for name, query in _queries(user_id, post_id // 2).items():
+            sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+            plan = conn.execute(text(f"{explain} {sql}")).all()
+            started = time.perf_counter()
+            for _ in range(runs):
+                conn.execute(query).all()
+            micros = (time.perf_counter() - started) / runs * 1_000_000
+            print(f"{name:<20}{micros:>10.0f} us")
+            for row in plan:
+                print(f"    {tuple(row)}")
+
+
+def main(users: int, posts: int, runs: int, db_url: str) -> None:
+    """
+    Seed the database and print query plans before and after indexing.
+    """
+    engine = create_engine(db_url)
+    _seed(engine, users=users, posts=posts)
+    _report(engine, "before: no secondary indexes", runs)
+    print(f"created: {create_missing_indexes(engine)}")
+    _report(engine, "after: create_missing_indexes", runs)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--posts", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--db-url", default=None)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.db_url or f"sqlite:///{os.path.join(tmp, 'query_plans.db')}"
+        main(users=args.users, posts=args.posts, runs=args.runs, db_url=url)
@@ -0,0 +1,213 @@
+import pytest
+import pytest_asyncio
+import starlette.status
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.db import Base, enable_sqlite_foreign_keys, get_db
+from api.main import app
+
+ASYNC_DB_URL = "sqlite+aiosqlite:///:memory:"
+
+
+@pytest_asyncio.fixture
+async def async_client() -> AsyncClient:  # Async用のengineとsessionを作成
+    """
+    テスト用の非同期HTTPクライアントを作成する fixture
+    """
+    async_engine = create_async_engine(ASYNC_DB_URL, echo=True)
+    enable_sqlite_foreign_keys(async_engine)
+    async_session = sessionmaker(
+        autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession
+    )
+
+    # テスト用にオンメモリのSQLiteテーブルを初期化（関数ごとにリセット）
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    # DIを使ってFastAPIのDBの向き先をテスト用DBに変更
+    async def get_test_db():
+        async with async_session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_db
+
+    # テスト用に非同期HTTPクライアントを返却
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
+async def _login(async_client, user_name: str, password: str) -> dict:
+    await async_client.post(
+        "/users", json={"user_name": user_name, "password": password}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": user_name, "password": password}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_create_comment(async_client):
+    """
+    /users/{user_id}/posts/{post_id}/comments エンドポイントの POST リクエストをテストする。
+
+    - コメントが正常に作成された場合、ステータスコードは 200 OK になる。
+    - 作成されたコメントの内容、投稿、ユーザー情報が期待通りであることを確認する。
+    """
+    headers = await _login(async_client, "anonymous", "P@ssw0rd")
+    commenter_headers = await _login(async_client, "hoge", "hoge")
+    await async_client.post(
+        "/users/1/posts", headers=headers, json={"contents": "ContentsTest"}
+    )
+
+    response = await async_client.post(
+        "/users/1/posts/1/comments",
+        headers=commenter_headers,
+        json={"contents": "CommentTest"},
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.json() == {
+        "comment_id": 1,
+        "user_id": 2,
+        "post_id": 1,
+        "contents": "CommentTest",
+    }
+
+    response = await async_client.get("/users/1/posts/1/comments")
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert [comment["contents"] for comment in response.json()] == ["CommentTest"]
+
+
+@pytest.mark.asyncio
+async def test_read_comment_pagination(async_client):
+    """
+    /users/{user_id}/posts/{post_id}/comments のキーセットページネーションをテストする。
+
+    - limit 件ずつコメントが返却されることを確認する。
+    - X-Next-Cursor と X-Prev-Cursor ヘッダーで前後のページを取得できることを確認する。
+    """
+    headers = await _login(async_client, "anonymous", "P@ssw0rd")
+    await async_client.post(
+        "/users/1/posts", headers=headers, json={"contents": "ContentsTest"}
+    )
+    for i in range(5):
+        await async_client.post(
+            "/users/1/posts/1/comments", headers=headers, json={"contents": f"{i}"}
+        )
+
+    response = await async_client.get("/users/1/posts/1/comments?limit=2")
+    assert [comment["contents"] for comment in response.json()] == ["0", "1"]
+    assert "X-Prev-Cursor" not in response.headers
+
+    next_cursor = response.headers["X-Next-Cursor"]
+    response = await async_client.get(
+        f"/users/1/posts/1/comments?limit=2&after={next_cursor}"
+    )
+    assert [comment["contents"] for comment in response.json()] == ["2", "3"]
+
+    prev_cursor = response.headers["X-Prev-Cursor"]
+    response = await async_client.get(
+        f"/users/1/posts/1/comments?limit=2&before={prev_cursor}"
+    )
+    assert [comment["contents"] for comment in response.json()] == ["0", "1"]
+
+
+@pytest.mark.asyncio
+async def test_delete_comment(async_client):
+    """
+    /users/{user_id}/posts/{post_id}/comments/{comment_id} の DELETE リクエストをテストする。
+
+    - コメントが正常に削除された場合、ステータスコードは 200 OK になる。
+    - 削除したコメントが一覧に含まれないことを確認する。
+    """
+    headers = await _login(async_client, "anonymous", "P@ssw0rd")
+    await async_client.post(
+        "/users/1/posts", headers=headers, json={"contents": "ContentsTest"}
+    )
+    for i in range(2):
+        await async_client.post(
+            "/users/1/posts/1/comments", headers=headers, json={"contents": f"{i}"}
+        )
+
+    response = await async_client.delete("/users/1/posts/1/comments/1", headers=headers)
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.json() is None
+
+    response = await async_client.get("/users/1/posts/1/comments")
+    assert [comment["contents"] for comment in response.json()] == ["1"]
+
+
+@pytest.mark.asyncio
+async def test_list_posts_with_comments(async_client):
+    """
+    /users/{user_id}/posts/with-comments エンドポイントの GET リクエストをテストする。
+
+    - 各投稿に最新のコメントが comments 件まで含まれることを確認する。
+    - コメントのない投稿は空のリストになることを確認する。
+    """
+    headers = await _login(async_client, "anonymous", "P@ssw0rd")
+    for i in range(3):
+        await async_client.post(
+            "/users/1/posts", headers=headers, json={"contents": f"Contents{i}"}
+        )
+    for post_id, count in ((1, 4), (2, 1)):
+        for i in range(count):
+            await async_client.post(
+                f"/users/1/posts/{post_id}/comments",
+                headers=headers,
+                json={"contents": f"{post_id}-{i}"},
+            )
+
+    response = await async_client.get("/users/1/posts/with-comments?comments=2")
+    assert response.status_code == starlette.status.HTTP_200_OK
+    response_obj = response.json()
+    assert [post["contents"] for post in response_obj] == [
+        "Contents0",
+        "Contents1",
+        "Contents2",
+    ]
+    assert [
+        [comment["contents"] for comment in post["comments"]] for post in response_obj
+    ] == [["1-2", "1-3"], ["2-0"], []]
+
+
+@pytest.mark.asyncio
+async def test_list_posts_with_comments_query_count(async_client):
+    """
+    /users/{user_id}/posts/with-comments の発行クエリ数をテストする。
+
+    - 1ページの投稿数に関わらず、発行されるクエリ数が一定であることを確認する。
+    """
+    headers = await _login(async_client, "anonymous", "P@ssw0rd")
+    for i in range(10):
+        await async_client.post(
+            "/users/1/posts", headers=headers, json={"contents": f"Contents{i}"}
+        )
+        await async_client.post(
+            f"/users/1/posts/{i + 1}/comments", headers=headers, json={"contents": "a"}
+        )
+
+    statements = []
+
+    def count_statement(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", count_statement)
+    try:
+        counts = []
+        for limit in (2, 10):
+            statements.clear()
+            response = await async_client.get(
+                f"/users/1/posts/with-comments?limit={limit}"
+            )
+            assert len(response.json()) == limit
+            counts.append(len(statements))
+    finally:
+        event.remove(Engine, "before_cursor_execute", count_statement)
+
+    assert counts == [2, 2]
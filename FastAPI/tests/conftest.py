@@ -0,0 +1,16 @@
+import pytest
+
+import api.cruds.post as post_crud
+import api.cruds.token as token_crud
+import api.cruds.user as user_crud
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    プロセス内キャッシュをテストごとにリセットする fixture
+    """
+    user_crud.clear_user_cache()
+    token_crud.clear_decoded_token_cache()
+    post_crud.clear_post_cache()
+    yield
@@ -0,0 +1,19 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from api.db import warm_up_pool
+
+
+@pytest.mark.asyncio
+async def test_warm_up_pool_unreachable(tmp_path):
+    """
+    接続できないデータベースに対するコネクションプールの事前確立をテストする。
+
+    - 例外を送出せずに False を返却し、起動を妨げないことを確認する。
+    """
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'test.db'}"
+    )
+
+    assert not await warm_up_pool(async_engine, size=2, attempts=3, retry_seconds=0)
+    await async_engine.dispose()
@@ -0,0 +1,252 @@
+import pytest
+import pytest_asyncio
+import starlette.status
+from httpx import AsyncClient
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from api import migrations
+from api.db import (
+    Base,
+    enable_sqlite_foreign_keys,
+    get_db,
+    get_replica_db,
+    warm_up_pool,
+)
+from api.main import app
+from api.migrate_db import create_missing_indexes, upgrade_database
+from api.models import model
+
+
+@pytest.mark.asyncio
+async def test_warm_up_pool(tmp_path):
+    """
+    コネクションプールの事前確立をテストする。
+
+    - 指定した数のコネクションがプールに確立されていることを確認する。
+    - 確立したコネクションがすべてプールに返却されていることを確認する。
+    """
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=3,
+    )
+
+    assert await warm_up_pool(async_engine, size=3)
+
+    assert async_engine.pool.checkedin() == 3
+    assert async_engine.pool.checkedout() == 0
+    await async_engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def replica_client(tmp_path) -> AsyncClient:
+    """
+    プライマリとリードレプリカを別々の SQLite ファイルとして用意する fixture
+    """
+
+    async def create_session(name):
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}")
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        return sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=async_engine,
+            class_=AsyncSession,
+        )
+
+    primary_session = await create_session("primary.db")
+    replica_session = await create_session("replica.db")
+
+    async def get_test_db():
+        async with primary_session() as session:
+            yield session
+
+    async def get_test_replica_db():
+        async with replica_session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_replica_db] = get_test_replica_db
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+    del app.dependency_overrides[get_replica_db]
+
+
+@pytest.mark.asyncio
+async def test_read_replica_routing(replica_client):
+    """
+    読み取り専用エンドポイントのリードレプリカへの振り分けをテストする。
+
+    - 書き込み直後のクライアントの読み取りはプライマリに振り分けられることを確認する。
+    - それ以外の読み取りはリードレプリカに振り分けられることを確認する。
+    """
+    response = await replica_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+
+    response = await replica_client.get("/users")
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert len(response.json()) == 1
+
+    replica_client.cookies.clear()
+    response = await replica_client.get("/users")
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert len(response.json()) == 0
+
+
+def test_create_missing_indexes(tmp_path):
+    """
+    不足しているインデックスの作成をテストする。
+
+    - 既存のデータを保持したまま、不足しているインデックスのみが作成されることを確認する。
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    for index in model.Post.__table__.indexes:
+        index.drop(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO users (user_name, password_hash) VALUES ('a', 'a')")
+        )
+
+    assert create_missing_indexes(engine) == ["ix_posts_user_id_post_id"]
+    assert not create_missing_indexes(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM users")).scalar() == 1
+    engine.dispose()
+
+
+def test_upgrade_database_from_empty(tmp_path):
+    """
+    空のデータベースへのマイグレーションの適用をテストする。
+
+    - 全てのマイグレーションが適用され、バージョンが記録されることを確認する。
+    - 作成されたスキーマがモデルの定義と一致することを確認する。
+    - 再実行しても何も適用されないことを確認する。
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+
+    applied = upgrade_database(engine)
+
+    assert applied == [migration.version for migration in migrations.MIGRATIONS]
+    assert migrations.current_version(engine) == applied[-1]
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        assert columns == {column.name for column in table.columns}
+        assert indexes >= {index.name for index in table.indexes}
+    assert not upgrade_database(engine)
+    engine.dispose()
+
+
+def test_upgrade_database_keeps_data(tmp_path):
+    """
+    データが存在するデータベースへのマイグレーションの適用をテストする。
+
+    - 既存のデータを保持したまま、追加されたカラムに既定値が設定されることを確認する。
+    - 投稿数とコメント数が既存のデータから設定されることを確認する。
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    upgrade_database(engine, target=1)
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO users (user_name, password_hash) VALUES ('a', 'a')")
+        )
+        conn.execute(
+            text("INSERT INTO posts (user_id, contents) VALUES (1, 'a'), (1, 'b')")
+        )
+        conn.execute(
+            text("INSERT INTO comments (user_id, post_id, contents) VALUES (1, 1, 'a')")
+        )
+
+    assert upgrade_database(engine) == [2, 3, 4, 5, 6, 7]
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT user_name, token_version, post_count, comment_count FROM users"
+            )
+        ).all()
+    assert rows == [("a", 0, 2, 1)]
+    engine.dispose()
+
+
+def test_backfill(tmp_path):
+    """
+    既存行のバッチ更新をテストする。
+
+    - batch_size 行ごとにコミットされ、条件に一致する全ての行が更新されることを確認する。
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    upgrade_database(engine)
+    with engine.begin() as conn:
+        for i in range(7):
+            conn.execute(
+                text(
+                    f"INSERT INTO users (user_name, password_hash) VALUES ('{i}', 'a')"
+                )
+            )
+    op = migrations.Operations(engine, batch_size=2)
+    users = op.table("users")
+    commits = []
+    event.listen(engine, "commit", commits.append)
+
+    updated = op.backfill(
+        users, {"token_version": users.c.user_id}, where=users.c.user_id != 3
+    )
+
+    assert updated == 6
+    assert len(commits) == 4
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT user_id, token_version FROM users")).all()
+    assert rows == [(i, 0 if i == 3 else i) for i in range(1, 8)]
+    engine.dispose()
+
+
+def test_on_delete_cascade(tmp_path):
+    """
+    外部キーの ON DELETE CASCADE をテストする。
+
+    - 投稿を削除すると、投稿に対するコメントが削除されることを確認する。
+    - ユーザーを削除すると、ユーザーの投稿とコメントが削除されることを確認する。
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    enable_sqlite_foreign_keys(engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO users (user_name, password_hash) "
+                "VALUES ('a', 'a'), ('b', 'b')"
+            )
+        )
+        conn.execute(
+            text("INSERT INTO posts (user_id, contents) VALUES (1, 'a'), (2, 'b')")
+        )
+        conn.execute(
+            text(
+                "INSERT INTO comments (user_id, post_id, contents) "
+                "VALUES (2, 1, 'a'), (1, 2, 'b'), (2, 2, 'c')"
+            )
+        )
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM posts WHERE post_id = 2"))
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT comment_id FROM comments")).all() == [(1,)]
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users WHERE user_id = 1"))
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM posts")).scalar() == 0
+        assert conn.execute(text("SELECT COUNT(*) FROM comments")).scalar() == 0
+    engine.dispose()
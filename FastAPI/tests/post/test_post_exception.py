@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 import pytest_asyncio
 import starlette.status
@@ -5,8 +7,10 @@ from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from api.db import Base, get_db
+from api.db import Base, enable_sqlite_foreign_keys, get_db
 from api.main import app
+from api.routers.post import _sse_post_events
+from api.utils import pubsub
 
 ASYNC_DB_URL = "sqlite+aiosqlite:///:memory:"
 
@@ -17,6 +21,7 @@ async def async_client() -> AsyncClient:  # Async用のengineとsessionを作成
     テスト用の非同期HTTPクライアントを作成する fixture
     """
     async_engine = create_async_engine(ASYNC_DB_URL, echo=True)
+    enable_sqlite_foreign_keys(async_engine)
     async_session = sessionmaker(
         autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession
     )
@@ -172,3 +177,121 @@ async def test_delete_post_invalid_token(async_client):
     assert len(response_obj) == 2
     assert response_obj[0]["contents"] == "ContentsTest1"
     assert response_obj[1]["contents"] == "ContentsTest2"
+
+
+@pytest.mark.asyncio
+async def test_read_post_invalid_cursor(async_client):
+    """
+    /users/{user_id}/posts エンドポイントで不正なカーソルを指定した場合のテスト。
+
+    - 不正なカーソルを指定した場合、ステータスコードは 400 BAD REQUEST になる。
+    - after と before を同時に指定した場合、ステータスコードは 400 BAD REQUEST になる。
+    """
+    response = await async_client.get("/users/1/posts", params={"after": "invalid"})
+    assert response.status_code == starlette.status.HTTP_400_BAD_REQUEST
+
+    response = await async_client.get(
+        "/users/1/posts", params={"after": "eyJrIjoxfQ", "before": "eyJrIjoxfQ"}
+    )
+    assert response.status_code == starlette.status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_read_post_invalid_fields(async_client):
+    """
+    /users/{user_id}/posts エンドポイントで存在しないフィールドを指定した場合のテスト。
+
+    - 存在しないフィールドを指定した場合、ステータスコードは 400 BAD REQUEST になる。
+    """
+    response = await async_client.get(
+        "/users/1/posts", params={"fields": "contents,password"}
+    )
+    assert response.status_code == starlette.status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"detail": "Unknown fields: password"}
+
+
+@pytest.mark.asyncio
+async def test_post_events_user_not_found(async_client):
+    """
+    /users/{user_id}/posts/events エンドポイントで存在しないユーザーを指定した場合のテスト。
+
+    - 存在しないユーザーを指定した場合、ステータスコードは 404 NOT FOUND になる。
+    """
+    response = await async_client.get("/users/1/posts/events")
+    assert response.status_code == starlette.status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_post_events_slow_consumer(monkeypatch):
+    """
+    Server-Sent Events のストリームが遅い購読者を切断する場合のテスト。
+
+    - バッファを超えるイベントが溜まった場合、evicted イベントを送信してストリームが終了する。
+    - 切断された購読者は購読が解除される。
+    """
+    broker = pubsub.InMemoryBroker()
+    monkeypatch.setattr(pubsub, "_broker", broker)
+    events = _sse_post_events(user_id=1)
+    next_event = asyncio.create_task(anext(events))
+    await asyncio.sleep(0)
+
+    for post_id in range(pubsub.PUBSUB_BUFFER_SIZE + 1):
+        await broker.publish("posts:1", {"event": "deleted", "post_id": post_id})
+
+    assert await next_event == "event: evicted\ndata: {}\n\n"
+    with pytest.raises(StopAsyncIteration):
+        await anext(events)
+    assert broker.metrics()["subscribers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_update_delete_post_not_found(async_client):
+    """
+    存在しないポストを更新・削除した場合のテスト。
+
+    - 存在しないポストを更新した場合、ステータスコードは 404 NOT FOUND になる。
+    - 存在しないポストを削除した場合、ステータスコードは 404 NOT FOUND になる。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    access_token = response.json()["access_token"]
+
+    response = await async_client.put(
+        "/users/1/posts/1",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"contents": "ContentsPutTest1"},
+    )
+    assert response.status_code == starlette.status.HTTP_404_NOT_FOUND
+
+    response = await async_client.delete(
+        "/users/1/posts/1",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == starlette.status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_post_too_many(async_client):
+    """
+    /users/{user_id}/posts/bulk エンドポイントで上限を超えるポストを送信した場合のテスト。
+
+    - 上限を超えるポストを送信した場合、ステータスコードは 422 UNPROCESSABLE ENTITY になる。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    access_token = response.json()["access_token"]
+
+    response = await async_client.post(
+        "/users/1/posts/bulk",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"posts": [{"contents": "ContentsTest"}] * 1001},
+    )
+    assert response.status_code == starlette.status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -1,12 +1,18 @@
+import asyncio
+
 import pytest
 import pytest_asyncio
 import starlette.status
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from api.db import Base, get_db
+import api.cruds.post as post_crud
+from api.db import Base, enable_sqlite_foreign_keys, get_db
 from api.main import app
+from api.routers.post import _sse_post_events
+from api.utils import pagination, pubsub
 
 ASYNC_DB_URL = "sqlite+aiosqlite:///:memory:"
 
@@ -17,6 +23,7 @@ async def async_client() -> AsyncClient:  # Async用のengineとsessionを作成
     テスト用の非同期HTTPクライアントを作成する fixture
     """
     async_engine = create_async_engine(ASYNC_DB_URL, echo=True)
+    enable_sqlite_foreign_keys(async_engine)
     async_session = sessionmaker(
         autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession
     )
@@ -208,3 +215,358 @@ async def test_delete_post(async_client):
     response_obj = response.json()
     assert len(response_obj) == 1
     assert response_obj[0]["contents"] == "ContentsTest2"
+
+
+@pytest.mark.asyncio
+async def test_read_post_pagination(async_client):
+    """
+    /users/{user_id}/posts エンドポイントのカーソルページネーションをテストする。
+
+    - limit を指定した場合、指定した件数のポストのみが取得されることを確認する。
+    - X-Next-Cursor を after に指定すると次のページが取得されることを確認する。
+    - X-Prev-Cursor を before に指定すると前のページが取得されることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+
+    response_obj = response.json()
+    access_token = response_obj["access_token"]
+    for i in range(5):
+        await async_client.post(
+            "/users/1/posts",
+            headers={"Authorization": f"Bearer {access_token}"},
+            json={"contents": f"ContentsTest{i}"},
+        )
+
+    response = await async_client.get("/users/1/posts", params={"limit": 2})
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert [post["post_id"] for post in response.json()] == [1, 2]
+    assert "X-Prev-Cursor" not in response.headers
+    next_cursor = response.headers["X-Next-Cursor"]
+
+    response = await async_client.get(
+        "/users/1/posts", params={"limit": 2, "after": next_cursor}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert [post["post_id"] for post in response.json()] == [3, 4]
+    prev_cursor = response.headers["X-Prev-Cursor"]
+    next_cursor = response.headers["X-Next-Cursor"]
+
+    response = await async_client.get(
+        "/users/1/posts", params={"limit": 2, "after": next_cursor}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert [post["post_id"] for post in response.json()] == [5]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = await async_client.get(
+        "/users/1/posts", params={"limit": 2, "before": prev_cursor}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert [post["post_id"] for post in response.json()] == [1, 2]
+    assert "X-Prev-Cursor" not in response.headers
+    assert "X-Next-Cursor" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_post_without_returning(async_client, monkeypatch):
+    """
+    バッチの INSERT で RETURNING を使えない方言での /users/{user_id}/posts/bulk をテストする。
+
+    - 1 回の複数行 INSERT のみが実行され、ID の読み直しが行われないことを確認する。
+    - 最初に生成された ID からの連番が、作成順のポスト ID として返却されることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    await async_client.post(
+        "/users/1/posts", headers=headers, json={"contents": "ContentsTest"}
+    )
+    async for db in app.dependency_overrides[get_db]():
+        engine = db.bind
+    monkeypatch.setattr(
+        engine.dialect, "insert_executemany_returning_sort_by_parameter_order", False
+    )
+    statements = []
+
+    def emulate_mysql(_conn, cursor, statement, *_args):
+        # MySQL の lastrowid は複数行 INSERT で最初に生成された ID を返す
+        statements.append(statement)
+        if statement.startswith("INSERT INTO posts"):
+            cursor.lastrowid -= statement.count("), (")
+
+    event.listen(engine.sync_engine, "after_cursor_execute", emulate_mysql)
+
+    response = await async_client.post(
+        "/users/1/posts/bulk",
+        headers=headers,
+        json={"posts": [{"contents": f"ContentsTest{i}"} for i in range(3)]},
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.json() == {"user_id": 1, "post_ids": [2, 3, 4]}
+    assert [s for s in statements if " posts " in s] == [
+        "INSERT INTO posts (user_id, contents) VALUES (?, ?), (?, ?), (?, ?)"
+    ]
+
+    response = await async_client.get("/users/1/posts")
+    assert [post["contents"] for post in response.json()[1:]] == [
+        "ContentsTest0",
+        "ContentsTest1",
+        "ContentsTest2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_read_post_without_limit(async_client):
+    """
+    limit もカーソルも指定しない /users/{user_id}/posts エンドポイントをテストする。
+
+    - 既定のページサイズを超える件数でも、全てのポストが返却されることを確認する。
+    - limit を指定せずにカーソルを指定した場合、既定のページサイズで返却されることを確認する。
+    """
+    count = pagination.DEFAULT_PAGE_SIZE + 1
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    access_token = response.json()["access_token"]
+    await async_client.post(
+        "/users/1/posts/bulk",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"posts": [{"contents": f"ContentsTest{i}"} for i in range(count)]},
+    )
+
+    response = await async_client.get("/users/1/posts")
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert len(response.json()) == count
+    assert "X-Next-Cursor" not in response.headers
+
+    response = await async_client.get(
+        "/users/1/posts", params={"after": pagination.encode_cursor(0)}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert len(response.json()) == pagination.DEFAULT_PAGE_SIZE
+    assert "X-Next-Cursor" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_post(async_client):
+    """
+    /users/{user_id}/posts/bulk エンドポイントの POST リクエストをテストする。
+
+    - 複数のポストが一括で作成され、作成順のポスト ID が返却されることを確認する。
+    - 作成されたポストが一覧で取得できることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    access_token = response.json()["access_token"]
+
+    response = await async_client.post(
+        "/users/1/posts/bulk",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"posts": [{"contents": f"ContentsTest{i}"} for i in range(3)]},
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.json() == {"user_id": 1, "post_ids": [1, 2, 3]}
+
+    response = await async_client.get("/users/1/posts")
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert [post["contents"] for post in response.json()] == [
+        "ContentsTest0",
+        "ContentsTest1",
+        "ContentsTest2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_read_post_fields(async_client):
+    """
+    /users/{user_id}/posts エンドポイントの fields パラメータをテストする。
+
+    - fields を指定した場合、指定したフィールドと post_id のみが返却されることを確認する。
+    - fields を指定した場合もカーソルヘッダーが返却されることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    access_token = response.json()["access_token"]
+    await async_client.post(
+        "/users/1/posts/bulk",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"posts": [{"contents": f"ContentsTest{i}"} for i in range(3)]},
+    )
+
+    response = await async_client.get(
+        "/users/1/posts", params={"limit": 2, "fields": "post_id"}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.json() == [{"post_id": 1}, {"post_id": 2}]
+    next_cursor = response.headers["X-Next-Cursor"]
+
+    response = await async_client.get(
+        "/users/1/posts",
+        params={"limit": 2, "after": next_cursor, "fields": "contents"},
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.json() == [{"post_id": 3, "contents": "ContentsTest2"}]
+    assert "X-Next-Cursor" not in response.headers
+    assert "X-Prev-Cursor" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_read_post_etag(async_client):
+    """
+    /users/{user_id}/posts エンドポイントの ETag をテストする。
+
+    - 一覧のレスポンスに弱い ETag が含まれることを確認する。
+    - If-None-Match が ETag と一致する場合、304 NOT MODIFIED が返却されることを確認する。
+    - ポストを更新すると ETag が変わり、以前の ETag では 200 OK が返却されることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    access_token = response.json()["access_token"]
+    await async_client.post(
+        "/users/1/posts",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"contents": "ContentsTest"},
+    )
+
+    response = await async_client.get("/users/1/posts")
+    assert response.status_code == starlette.status.HTTP_200_OK
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = await async_client.get("/users/1/posts", headers={"If-None-Match": etag})
+    assert response.status_code == starlette.status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    await async_client.put(
+        "/users/1/posts/1",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"contents": "ContentsPutTest"},
+    )
+    response = await async_client.get("/users/1/posts", headers={"If-None-Match": etag})
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.json()[0]["contents"] == "ContentsPutTest"
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_read_post_cache(async_client):
+    """
+    /users/{user_id}/posts エンドポイントの結果キャッシュをテストする。
+
+    - 同じ一覧の 2 回目の取得はキャッシュから返却されることを確認する。
+    - ポストの作成、更新、削除の後は最新の一覧が返却されることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    await async_client.post(
+        "/users/1/posts", headers=headers, json={"contents": "ContentsTest"}
+    )
+
+    await async_client.get("/users/1/posts")
+    response = await async_client.get("/users/1/posts")
+    assert [post["contents"] for post in response.json()] == ["ContentsTest"]
+    assert post_crud.get_post_cache_stats()["hits"] == 1
+
+    await async_client.post(
+        "/users/1/posts", headers=headers, json={"contents": "ContentsTest2"}
+    )
+    response = await async_client.get("/users/1/posts")
+    assert [post["contents"] for post in response.json()] == [
+        "ContentsTest",
+        "ContentsTest2",
+    ]
+
+    await async_client.put(
+        "/users/1/posts/2", headers=headers, json={"contents": "ContentsPutTest"}
+    )
+    response = await async_client.get("/users/1/posts")
+    assert response.json()[1]["contents"] == "ContentsPutTest"
+
+    await async_client.delete("/users/1/posts/2", headers=headers)
+    response = await async_client.get("/users/1/posts")
+    assert [post["contents"] for post in response.json()] == ["ContentsTest"]
+    assert post_crud.get_post_cache_stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_post_events(async_client, monkeypatch):
+    """
+    ポストの変更イベントの発行をテストする。
+
+    - ポストの作成・一括作成・更新・削除で、ユーザーのチャンネルにイベントが発行されることを確認する。
+    - イベントが Server-Sent Events の形式で送信されることを確認する。
+    """
+    monkeypatch.setattr(pubsub, "_broker", pubsub.InMemoryBroker())
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    subscription = pubsub.get_broker().subscribe("posts:1")
+
+    await async_client.post(
+        "/users/1/posts", headers=headers, json={"contents": "ContentsTest"}
+    )
+    await async_client.post(
+        "/users/1/posts/bulk",
+        headers=headers,
+        json={"posts": [{"contents": "ContentsTest"}] * 2},
+    )
+    await async_client.put(
+        "/users/1/posts/1", headers=headers, json={"contents": "ContentsPutTest"}
+    )
+    await async_client.delete("/users/1/posts/1", headers=headers)
+
+    assert [await subscription.get(timeout=1) for _ in range(4)] == [
+        {"event": "created", "post_id": 1, "user_id": 1, "contents": "ContentsTest"},
+        {"event": "bulk_created", "user_id": 1, "post_ids": [2, 3]},
+        {
+            "event": "updated",
+            "post_id": 1,
+            "user_id": 1,
+            "contents": "ContentsPutTest",
+        },
+        {"event": "deleted", "post_id": 1, "user_id": 1},
+    ]
+
+    events = _sse_post_events(user_id=1)
+    next_event = asyncio.create_task(anext(events))
+    await asyncio.sleep(0)
+    await async_client.delete("/users/1/posts/2", headers=headers)
+    assert await next_event == (
+        'event: deleted\ndata: {"user_id": 1, "post_id": 2}\n\n'
+    )
+    await events.aclose()
+    assert pubsub.get_broker().metrics()["subscribers"] == 1
@@ -0,0 +1,45 @@
+import pytest
+
+from api.exceptions import SubscriptionEvictedError
+from api.utils.pubsub import Broker, InMemoryBroker
+
+
+@pytest.mark.asyncio
+async def test_evict_slow_subscriber():
+    """
+    バッファが溢れた購読者の切断をテストする。
+
+    - バッファが一杯の購読者は切断され、get で SubscriptionEvictedError が発生することを確認する。
+    - 他の購読者には引き続きメッセージが配信されることを確認する。
+    """
+    broker = InMemoryBroker()
+    slow = broker.subscribe("posts:1", max_size=2)
+    fast = broker.subscribe("posts:1", max_size=2)
+
+    for post_id in range(3):
+        await broker.publish("posts:1", {"post_id": post_id})
+        assert await fast.get(timeout=1) == {"post_id": post_id}
+
+    assert slow.evicted
+    with pytest.raises(SubscriptionEvictedError):
+        await slow.get(timeout=1)
+    assert broker.metrics()["subscribers"] == 1
+    assert broker.metrics()["evictions"] == 1
+
+    await broker.publish("posts:1", {"post_id": 3})
+    assert await fast.get(timeout=1) == {"post_id": 3}
+
+
+def test_incomplete_broker():
+    """
+    インターフェースを実装していないブローカーをテストする。
+
+    - メソッドが不足したブローカーはインスタンス化の時点で TypeError が発生することを確認する。
+    """
+
+    class PublishOnlyBroker(Broker):
+        async def publish(self, channel, message):
+            pass
+
+    # pytest.raises に呼び出し可能オブジェクトとして渡し、インスタンス化を試みる
+    pytest.raises(TypeError, PublishOnlyBroker)
@@ -0,0 +1,38 @@
+import pytest
+
+from api.utils.pubsub import InMemoryBroker
+
+
+@pytest.mark.asyncio
+async def test_publish_subscribe():
+    """
+    インメモリブローカーのメッセージ配信をテストする。
+
+    - チャンネルの購読者全員に、発行した順にメッセージが配信されることを確認する。
+    - 他のチャンネルのメッセージは配信されないことを確認する。
+    - 購読を解除すると、メッセージが配信されなくなることを確認する。
+    """
+    broker = InMemoryBroker()
+    first = broker.subscribe("posts:1")
+    second = broker.subscribe("posts:1")
+    other = broker.subscribe("posts:2")
+
+    await broker.publish("posts:1", {"post_id": 1})
+    await broker.publish("posts:1", {"post_id": 2})
+
+    for subscription in (first, second):
+        assert await subscription.get(timeout=1) == {"post_id": 1}
+        assert await subscription.get(timeout=1) == {"post_id": 2}
+    assert await other.get(timeout=0.01) is None
+
+    broker.unsubscribe(first)
+    broker.unsubscribe(first)
+    await broker.publish("posts:1", {"post_id": 3})
+    assert await first.get(timeout=0.01) is None
+    assert await second.get(timeout=1) == {"post_id": 3}
+    assert broker.metrics() == {
+        "channels": 2,
+        "subscribers": 2,
+        "published": 3,
+        "evictions": 0,
+    }
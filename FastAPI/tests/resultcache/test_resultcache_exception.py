@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from api.utils.result_cache import CacheBackend, InProcessCacheBackend, ResultCache
+
+
+@pytest.mark.asyncio
+async def test_result_cache_load_error():
+    """
+    読み込みに失敗した結果がキャッシュされないことをテストする。
+
+    - 読み込みの例外が呼び出し元に伝わることを確認する。
+    - 次の読み取りで再度読み込まれることを確認する。
+    """
+    cache = ResultCache(InProcessCacheBackend(max_size=100, ttl=60))
+
+    async def fail():
+        raise RuntimeError("database unavailable")
+
+    async def load():
+        return ["row"]
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load("1", 20, fail)
+    assert await cache.get_or_load("1", 20, load) == ["row"]
+    assert cache.stats()["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_result_cache_invalidated_during_load():
+    """
+    読み込み中に無効化された結果が読み取られないことをテストする。
+
+    - 無効化の前に開始した読み込みの結果は、無効化の後の読み取りで返却されないことを確認する。
+    """
+    cache = ResultCache(InProcessCacheBackend(max_size=100, ttl=60))
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def load_old():
+        started.set()
+        await release.wait()
+        return ["old"]
+
+    async def load_new():
+        return ["new"]
+
+    task = asyncio.create_task(cache.get_or_load("1", 20, load_old))
+    await started.wait()
+    await cache.invalidate("1")
+    release.set()
+    assert await task == ["old"]
+    assert await cache.get_or_load("1", 20, load_new) == ["new"]
+
+
+@pytest.mark.asyncio
+async def test_result_cache_miss_after_invalidation():
+    """
+    無効化の前に開始した読み込みと、無効化の後の読み取りが重なる場合をテストする。
+
+    - 無効化の後の読み取りは、無効化の前に開始した読み込みの結果を共有しないことを確認する。
+    - 無効化の前に開始した読み込みの結果は保存されず、以降の読み取りで返却されないことを確認する。
+    """
+    cache = ResultCache(InProcessCacheBackend(max_size=100, ttl=60))
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def load_before_write():
+        started.set()
+        await release.wait()
+        return ["old"]
+
+    async def load_after_write():
+        return ["new"]
+
+    leader = asyncio.create_task(cache.get_or_load("1", 20, load_before_write))
+    await started.wait()
+    await cache.invalidate("1")
+    follower = await asyncio.wait_for(cache.get_or_load("1", 20, load_after_write), 1)
+    assert follower == ["new"]
+    release.set()
+    assert await leader == ["old"]
+    assert cache.backend.stats()["size"] == 2  # The generation and ["new"].
+    assert await cache.get_or_load("1", 20, load_after_write) == ["new"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_incomplete_cache_backend():
+    """
+    インターフェースを実装していないバックエンドをテストする。
+
+    - メソッドが不足したバックエンドはインスタンス化の時点で TypeError が発生することを確認する。
+    """
+
+    class GetOnlyBackend(CacheBackend):
+        async def get(self, key):
+            return None
+
+    # pytest.raises に呼び出し可能オブジェクトとして渡し、インスタンス化を試みる
+    pytest.raises(TypeError, GetOnlyBackend)
@@ -0,0 +1,57 @@
+import pytest
+
+from api.utils.cache import TTLCache, WeightLimit
+from api.utils.result_cache import InProcessCacheBackend, ResultCache
+
+
+@pytest.mark.asyncio
+async def test_result_cache():
+    """
+    結果キャッシュの読み取りと無効化をテストする。
+
+    - 同じ名前空間とキーの 2 回目の読み取りはキャッシュから返却されることを確認する。
+    - 名前空間を無効化すると、その名前空間の結果だけが再度読み込まれることを確認する。
+    - ヒット率が集計されることを確認する。
+    """
+    cache = ResultCache(InProcessCacheBackend(max_size=100, ttl=60))
+    calls = []
+
+    async def load(namespace, key):
+        calls.append((namespace, key))
+        return [namespace, key]
+
+    assert await cache.get_or_load("1", 20, lambda: load("1", 20)) == ["1", 20]
+    assert await cache.get_or_load("1", 20, lambda: load("1", 20)) == ["1", 20]
+    assert await cache.get_or_load("2", 20, lambda: load("2", 20)) == ["2", 20]
+    assert calls == [("1", 20), ("2", 20)]
+
+    await cache.invalidate("1")
+    await cache.get_or_load("1", 20, lambda: load("1", 20))
+    await cache.get_or_load("2", 20, lambda: load("2", 20))
+    assert calls == [("1", 20), ("2", 20), ("1", 20)]
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 3
+    assert stats["hit_rate"] == 0.4
+    assert stats["invalidations"] == 1
+
+
+def test_ttl_cache_max_weight():
+    """
+    TTLCache の重みの上限をテストする。
+
+    - 重みの合計が上限を超えると、最も長く使われていないエントリから削除されることを確認する。
+    - 上書きされたエントリの重みが合計から差し引かれることを確認する。
+    """
+    cache = TTLCache(max_size=100, ttl=60, weight_limit=WeightLimit(10, len))
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+    cache.get("a")
+    cache.set("c", "xxxx")
+    assert cache.get("b") is None
+    assert cache.get("a") == "xxxx"
+    assert cache.stats()["weight"] == 8
+
+    cache.set("a", "x")
+    assert cache.stats()["weight"] == 5
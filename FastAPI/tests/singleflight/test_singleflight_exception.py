@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from api.utils.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_single_flight_error():
+    """
+    集約された呼び出しが失敗した場合のテスト。
+
+    - 実行中の呼び出しが失敗した場合、待機中の呼び出しにも同じ例外が発生する。
+    - 失敗した呼び出しは集約の対象から外れ、次の呼び出しは再実行される。
+    """
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    results = await asyncio.gather(
+        flight.do("key", fail), flight.do("key", fail), return_exceptions=True
+    )
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert results[0] is results[1]
+
+    async def succeed():
+        return "ok"
+
+    assert await flight.do("key", succeed) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_single_flight_leader_cancelled():
+    """
+    集約された呼び出しの先頭がキャンセルされた場合のテスト。
+
+    - 先頭の呼び出しがキャンセルされた場合、待機中の呼び出しが再実行して結果を返却する。
+    """
+    flight = SingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    leader = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "ok"
+    assert leader.cancelled()
+    assert len(calls) == 2
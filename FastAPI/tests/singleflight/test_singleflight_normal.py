@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import api.cruds.post as post_crud
+import api.cruds.user as user_crud
+from api.db import Base
+from api.models import model
+from api.utils.pagination import PageQuery
+from api.utils.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_single_flight():
+    """
+    同時に実行された同じキーの呼び出しの集約をテストする。
+
+    - 実行中の呼び出しと同じキーの呼び出しは、実行中の呼び出しの結果を共有することを確認する。
+    - 異なるキーの呼び出しと、完了後の呼び出しは個別に実行されることを確認する。
+    """
+    flight = SingleFlight()
+    calls = []
+
+    async def load(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return [key]
+
+    results = await asyncio.gather(
+        *(flight.do(key, lambda key=key: load(key)) for key in (1, 1, 1, 2))
+    )
+    assert results == [[1], [1], [1], [2]]
+    assert calls == [1, 2]
+    assert results[0] is results[1]
+
+    assert await flight.do(1, lambda: load(1)) == [1]
+    assert calls == [1, 2, 1]
+    assert flight.stats() == {"in_flight": 0, "calls": 3, "shared": 2}
+
+
+@pytest.mark.asyncio
+async def test_single_flight_started():
+    """
+    実行開始後に到着した呼び出しをテストする。
+
+    - 実行中の呼び出しより後に到着した同じキーの呼び出しは、完了まで待って結果を共有することを確認する。
+    - バージョンが異なるキーの呼び出しは、結果を共有せずに個別に実行されることを確認する。
+    """
+    flight = SingleFlight()
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def load_before_write():
+        started.set()
+        await release.wait()
+        return ["old"]
+
+    async def load_after_write():
+        return ["new"]
+
+    leader = asyncio.create_task(flight.do(("posts", 1), load_before_write))
+    await started.wait()
+    assert flight.stats()["in_flight"] == 1
+    follower = asyncio.create_task(flight.do(("posts", 1), load_after_write))
+    other = await asyncio.wait_for(flight.do(("posts", 2), load_after_write), 1)
+    assert other == ["new"]
+    release.set()
+    assert await leader == ["old"]
+    assert await follower == ["old"]
+    assert flight.stats() == {"in_flight": 0, "calls": 2, "shared": 1}
+
+
+@pytest.mark.asyncio
+async def test_coalesce_read_queries(tmp_path):
+    """
+    読み取り CRUD の同時実行が 1 回のクエリに集約されることをテストする。
+
+    - 別々のセッションから同時に実行した read_post が 1 回の SELECT で完了することを確認する。
+    - 同時に実行した get_user_by_name が、それぞれのセッションのユーザーを返却することを確認する。
+    - read_user は同じバージョンスタンプを渡した呼び出しだけが 1 回のクエリを共有することを確認する。
+    """
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async_session = sessionmaker(
+        autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession
+    )
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(model.User.__table__).values(user_name="a", password_hash="a")
+        )
+        await conn.execute(
+            insert(model.Post.__table__).values(user_id=1, contents="contents")
+        )
+    selects = []
+    event.listen(
+        async_engine.sync_engine,
+        "before_cursor_execute",
+        lambda _conn, _cursor, statement, *_args: selects.append(statement),
+    )
+    sessions = [async_session() for _ in range(5)]
+
+    results = await asyncio.gather(
+        *(
+            post_crud.read_post(db=db, user_id=1, page=PageQuery(limit=20))
+            for db in sessions
+        )
+    )
+    assert [len(rows) for rows in results] == [1] * 5
+    assert len(selects) == 1
+
+    user_crud.clear_user_cache()
+    users = await asyncio.gather(
+        *(user_crud.get_user_by_name(db=db, user_name="a") for db in sessions)
+    )
+    assert len(selects) == 2
+    assert [user.user_id for user in users] == [1] * 5
+    assert all(user in db for user, db in zip(users, sessions))
+
+    await asyncio.gather(
+        *(
+            user_crud.read_user(db=db, version=version)
+            for db, version in zip(sessions, (1, 1, 2, 2, 2))
+        )
+    )
+    assert len(selects) == 4
+
+    for db in sessions:
+        await db.close()
+    await async_engine.dispose()
@@ -0,0 +1,84 @@
+import pytest
+import pytest_asyncio
+import starlette.status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.db import Base, enable_sqlite_foreign_keys, get_db
+from api.main import app
+from api.utils.hash_service import HashService, hash_service
+
+ASYNC_DB_URL = "sqlite+aiosqlite:///:memory:"
+
+
+@pytest_asyncio.fixture
+async def async_client() -> AsyncClient:  # Async用のengineとsessionを作成
+    """
+    テスト用の非同期HTTPクライアントを作成する fixture
+    """
+    async_engine = create_async_engine(ASYNC_DB_URL, echo=True)
+    enable_sqlite_foreign_keys(async_engine)
+    async_session = sessionmaker(
+        autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession
+    )
+
+    # テスト用にオンメモリのSQLiteテーブルを初期化（関数ごとにリセット）
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    # DIを使ってFastAPIのDBの向き先をテスト用DBに変更
+    async def get_test_db():
+        async with async_session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_db
+
+    # テスト用に非同期HTTPクライアントを返却
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_create_token_hash_queue_full(async_client, monkeypatch):
+    """
+    パスワードハッシュのキューが満杯の場合のテスト。
+
+    - キューが満杯の場合、ステータスコードは 503 SERVICE UNAVAILABLE になる。
+    - Retry-After ヘッダーが返却されることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    monkeypatch.setattr(hash_service, "max_pending", 0)
+
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    assert response.status_code == starlette.status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_hash_service_failure_metrics():
+    """
+    ハッシュ処理が失敗した場合のメトリクスをテストする。
+
+    - 例外が呼び出し元に伝わることを確認する。
+    - 失敗したタスクは完了したタスクと平均レイテンシに含まれず、failed として数えられることを確認する。
+    """
+
+    class FailingGenerator:
+        def hash_many(self, _input_strings):
+            raise ValueError("hashing failed")
+
+    service = HashService(executor_type="thread", generator=FailingGenerator())
+    with pytest.raises(ValueError):
+        await service.hash("P@ssw0rd")
+    metrics = service.metrics()
+    assert metrics["failed"] == 1
+    assert metrics["completed"] == 0
+    assert metrics["latency_avg_ms"] == 0.0
+    assert metrics["pending"] == 0
+    service.shutdown()
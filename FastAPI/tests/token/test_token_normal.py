@@ -1,12 +1,20 @@
+import asyncio
+
 import pytest
 import pytest_asyncio
 import starlette.status
 from httpx import AsyncClient
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from api.db import Base, get_db
+import api.cruds.token as token_crud
+import api.cruds.user as user_crud
+from api.db import PRIMARY_READS_COOKIE, Base, enable_sqlite_foreign_keys, get_db
 from api.main import app
+from api.models import model
+from api.utils import HashGenerator
+from api.utils.hash_service import hash_service
 
 ASYNC_DB_URL = "sqlite+aiosqlite:///:memory:"
 
@@ -17,6 +25,7 @@ async def async_client() -> AsyncClient:  # Async用のengineとsessionを作成
     テスト用の非同期HTTPクライアントを作成する fixture
     """
     async_engine = create_async_engine(ASYNC_DB_URL, echo=True)
+    enable_sqlite_foreign_keys(async_engine)
     async_session = sessionmaker(
         autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession
     )
@@ -54,3 +63,176 @@ async def test_create_token(async_client):
         "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
     )
     assert response.status_code == starlette.status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_create_token_not_pinned_to_primary(async_client):
+    """
+    ログインで読み取りがプライマリに固定されないことをテストする。
+
+    - ユーザーの作成後は、読み取りをプライマリに固定する Cookie が設定されることを確認する。
+    - ログインのレスポンスには、その Cookie が設定されないことを確認する。
+    """
+    response = await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    assert PRIMARY_READS_COOKIE in response.cookies
+
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert PRIMARY_READS_COOKIE not in response.cookies
+
+
+@pytest.mark.asyncio
+async def test_stateless_auth(async_client, monkeypatch):
+    """
+    STATELESS_AUTH 有効時のトークン認証をテストする。
+
+    - トークンのクレームのみで認証され、ポストが作成できることを確認する。
+    - ユーザー更新後は更新前に発行されたトークンが 401 UNAUTHORIZED になることを確認する。
+    """
+    monkeypatch.setattr(token_crud, "STATELESS_AUTH", True)
+
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    access_token = response.json()["access_token"]
+
+    response = await async_client.post(
+        "/users/1/posts",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"contents": "ContentsTest"},
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.json()["user_id"] == 1
+
+    response = await async_client.put(
+        "/users/1",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"user_name": "anonymous", "password": "hoge"},
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+
+    response = await async_client.post(
+        "/users/1/posts",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"contents": "ContentsTest"},
+    )
+    assert response.status_code == starlette.status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_stateless_auth_revoked_by_other_worker(async_client, monkeypatch):
+    """
+    別のワーカーでトークンが失効した場合の STATELESS_AUTH 有効時の認証をテストする。
+
+    - キャッシュを経由せずにトークンのバージョンが更新されても、
+      USER_CACHE_TTL_SECONDS の経過後は 401 UNAUTHORIZED になることを確認する。
+    """
+    monkeypatch.setattr(token_crud, "STATELESS_AUTH", True)
+
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    response = await async_client.post(
+        "/users/1/posts", headers=headers, json={"contents": "ContentsTest"}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+
+    async for db in app.dependency_overrides[get_db]():
+        await db.execute(
+            update(model.User)
+            .where(model.User.user_id == 1)
+            .values(token_version=model.User.token_version + 1)
+        )
+        await db.commit()
+    await asyncio.sleep(user_crud.USER_CACHE_TTL_SECONDS)
+
+    response = await async_client.post(
+        "/users/1/posts", headers=headers, json={"contents": "ContentsTest"}
+    )
+    assert response.status_code == starlette.status.HTTP_401_UNAUTHORIZED
+
+
+def test_decode_access_token_cache():
+    """
+    検証済みトークンのキャッシュをテストする。
+
+    - 同じトークンを 2 回デコードした場合、2 回目はキャッシュから返却されることを確認する。
+    """
+    access_token = token_crud.create_access_token(data={"sub": "anonymous"})
+
+    assert token_crud.decode_access_token(access_token)["sub"] == "anonymous"
+    assert token_crud.decode_access_token(access_token)["sub"] == "anonymous"
+    assert token_crud.get_decoded_token_cache_stats() == {
+        "size": 1,
+        "hits": 1,
+        "misses": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_metrics(async_client):
+    """
+    /metrics エンドポイントの GET リクエストをテストする。
+
+    - ログイン後にパスワードハッシュの処理件数とレイテンシが報告されることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == starlette.status.HTTP_200_OK
+    password_hashing = response.json()["password_hashing"]
+    assert password_hashing["completed"] >= 2
+    assert password_hashing["queue_depth"] == 0
+    assert password_hashing["latency_max_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_create_token_salted_hash(async_client, monkeypatch):
+    """
+    ソルト付きのパスワードハッシュでトークンを作成するテスト。
+
+    - 同じパスワードでもユーザーごとに異なるハッシュが保存されることを確認する。
+    - ソルト付きのハッシュでもログインできることを確認する。
+    - 誤ったパスワードの場合、ステータスコードは 401 UNAUTHORIZED になる。
+    """
+    monkeypatch.setattr(
+        hash_service,
+        "generator",
+        HashGenerator(algorithm="pbkdf2_sha256", iterations=1000),
+    )
+
+    response = await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    first_hash = response.json()["password_hash"]
+    response = await async_client.post(
+        "/users", json={"user_name": "hoge", "password": "P@ssw0rd"}
+    )
+    assert first_hash.startswith("pbkdf2_sha256$1000$")
+    assert response.json()["password_hash"] != first_hash
+
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "hoge"}
+    )
+    assert response.status_code == starlette.status.HTTP_401_UNAUTHORIZED
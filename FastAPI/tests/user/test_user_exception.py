@@ -7,7 +7,7 @@ from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from api.db import Base, get_db
+from api.db import Base, enable_sqlite_foreign_keys, get_db
 from api.main import app
 
 ASYNC_DB_URL = "sqlite+aiosqlite:///:memory:"
@@ -19,6 +19,7 @@ async def async_client() -> AsyncClient:  # Async用のengineとsessionを作成
     テスト用の非同期HTTPクライアントを作成する fixture
     """
     async_engine = create_async_engine(ASYNC_DB_URL, echo=True)
+    enable_sqlite_foreign_keys(async_engine)
     async_session = sessionmaker(
         autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession
     )
@@ -142,3 +143,29 @@ async def test_delete_user_invalid_token(async_client):
     assert response_obj[0]["user_name"] == "anonymous"
     assert response_obj[1]["user_id"] == 2
     assert response_obj[1]["user_name"] == "hoge"
+
+
+@pytest.mark.asyncio
+async def test_get_user_deletion_not_found(async_client):
+    """
+    削除を受け付けていないユーザーの /users/{user_id}/deletion をテストする。
+
+    - レスポンスのステータスコードが 404 Not Found であることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+
+    response = await async_client.get("/users/1/deletion")
+    assert response.status_code == starlette.status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_read_user_invalid_fields(async_client):
+    """
+    /users エンドポイントで存在しないフィールドを指定した場合のテスト。
+
+    - 存在しないフィールドを指定した場合、ステータスコードは 400 BAD REQUEST になる。
+    """
+    response = await async_client.get("/users", params={"fields": "password"})
+    assert response.status_code == starlette.status.HTTP_400_BAD_REQUEST
@@ -1,12 +1,20 @@
+import json
+import re
+
 import pytest
 import pytest_asyncio
 import starlette.status
 from httpx import AsyncClient
+from sqlalchemy import event, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from api.db import Base, get_db
+import api.cruds.user as user_crud
+from api.cruds import counter
+from api.db import Base, enable_sqlite_foreign_keys, get_db
 from api.main import app
+from api.models import model
+from api.utils import pagination
 
 ASYNC_DB_URL = "sqlite+aiosqlite:///:memory:"
 
@@ -17,6 +25,7 @@ async def async_client() -> AsyncClient:  # Async用のengineとsessionを作成
     テスト用の非同期HTTPクライアントを作成する fixture
     """
     async_engine = create_async_engine(ASYNC_DB_URL, echo=True)
+    enable_sqlite_foreign_keys(async_engine)
     async_session = sessionmaker(
         autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession
     )
@@ -167,3 +176,508 @@ async def test_delete_user(async_client):
     assert len(response_obj) == 1
     assert response_obj[0]["user_id"] == 2
     assert response_obj[0]["user_name"] == "hoge"
+
+
+@pytest.mark.asyncio
+async def test_delete_user_background(async_client):
+    """
+    /users/{user_id}?background=true の DELETE リクエストをテストする。
+
+    - レスポンスのステータスコードが 202 Accepted であることを確認する。
+    - ユーザーが一覧から除外され、アクセストークンが無効になることを確認する。
+    - バックグラウンドで投稿が削除され、進捗が記録されることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    await async_client.post("/users", json={"user_name": "hoge", "password": "hoge"})
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    for i in range(3):
+        await async_client.post(
+            "/users/1/posts", headers=headers, json={"contents": f"Contents{i}"}
+        )
+
+    response = await async_client.delete("/users/1?background=true", headers=headers)
+    assert response.status_code == starlette.status.HTTP_202_ACCEPTED
+    assert response.json()["user_id"] == 1
+
+    response = await async_client.get("/users/1/deletion")
+    assert response.status_code == starlette.status.HTTP_200_OK
+    response_obj = response.json()
+    assert response_obj["deleted_posts"] == 3
+    assert response_obj["deleted_comments"] == 0
+    assert response_obj["finished_at"] is not None
+
+    response = await async_client.get("/users")
+    assert [user["user_name"] for user in response.json()] == ["hoge"]
+    response = await async_client.get("/users/1/posts")
+    assert response.json() == []
+    response = await async_client.post(
+        "/users/1/posts", headers=headers, json={"contents": "Contents"}
+    )
+    assert response.status_code == starlette.status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_purge_user(async_client):
+    """
+    削除を受け付けたユーザーのバッチ削除をテストする。
+
+    - 削除の完了前からユーザーが一覧と認証から除外されることを確認する。
+    - ユーザーのコメント、ユーザーの投稿へのコメント、投稿が全て削除されることを確認する。
+    - 他のユーザーの投稿とコメントが残ることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    await async_client.post("/users", json={"user_name": "hoge", "password": "hoge"})
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async for db in app.dependency_overrides[get_db]():
+        db.add_all(
+            [model.Post(user_id=1, contents=f"Contents{i}") for i in range(3)]
+            + [model.Post(user_id=2, contents="hoge")]
+        )
+        db.add_all(
+            [model.Comment(user_id=1, post_id=4, contents="a") for _ in range(2)]
+            + [model.Comment(user_id=2, post_id=1, contents="b") for _ in range(3)]
+            + [model.Comment(user_id=2, post_id=4, contents="c")]
+        )
+        await db.commit()
+
+        user = await user_crud.get_user_by_id(db, user_id=1)
+        await user_crud.request_user_deletion(db, original=user)
+
+        response = await async_client.get("/users")
+        assert [user["user_name"] for user in response.json()] == ["hoge"]
+        response = await async_client.get("/users/1/posts")
+        assert response.json() == []
+        response = await async_client.get("/users/1/deletion")
+        assert response.json()["finished_at"] is None
+        response = await async_client.post(
+            "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+        )
+        assert response.status_code == starlette.status.HTTP_401_UNAUTHORIZED
+        response = await async_client.post(
+            "/users/1/posts", headers=headers, json={"contents": "Contents"}
+        )
+        assert response.status_code == starlette.status.HTTP_401_UNAUTHORIZED
+
+        deletion = await user_crud.purge_user(db, user_id=1, batch_size=2)
+        assert deletion.deleted_posts == 3
+        assert deletion.deleted_comments == 5
+        assert deletion.finished_at is not None
+        assert await user_crud.read_pending_user_deletions(db) == []
+
+        response = await async_client.get("/users/2/posts")
+        assert [post["contents"] for post in response.json()] == ["hoge"]
+        result = await db.execute(select(model.Comment.contents))
+        assert result.scalars().all() == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_delete_user_with_posts(async_client):
+    """
+    投稿を持つユーザーの DELETE リクエストをテストする。
+
+    - ユーザーの削除が成功することを確認する。
+    - ユーザーの投稿がデータベースによって削除されていることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    for i in range(3):
+        await async_client.post(
+            "/users/1/posts", headers=headers, json={"contents": f"Contents{i}"}
+        )
+
+    response = await async_client.delete("/users/1", headers=headers)
+    assert response.status_code == starlette.status.HTTP_200_OK
+
+    response = await async_client.get("/users/1/posts")
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_read_user_pagination(async_client):
+    """
+    /users エンドポイントのカーソルページネーションをテストする。
+
+    - limit を指定した場合、指定した件数のユーザーのみが取得されることを確認する。
+    - X-Next-Cursor を after に指定すると次のページが取得されることを確認する。
+    """
+    for i in range(3):
+        await async_client.post(
+            "/users", json={"user_name": f"user{i}", "password": "P@ssw0rd"}
+        )
+
+    response = await async_client.get("/users", params={"limit": 2})
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert [user["user_id"] for user in response.json()] == [1, 2]
+    next_cursor = response.headers["X-Next-Cursor"]
+
+    response = await async_client.get(
+        "/users", params={"limit": 2, "after": next_cursor}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert [user["user_id"] for user in response.json()] == [3]
+    assert "X-Next-Cursor" not in response.headers
+    assert "X-Prev-Cursor" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_read_user_without_limit(async_client):
+    """
+    limit もカーソルも指定しない /users エンドポイントをテストする。
+
+    - 既定のページサイズを超える件数でも、全てのユーザーが返却されることを確認する。
+    """
+    count = pagination.DEFAULT_PAGE_SIZE + 1
+    async for db in app.dependency_overrides[get_db]():
+        await db.execute(
+            insert(model.User.__table__),
+            [{"user_name": f"user{i}", "password_hash": "a"} for i in range(count)],
+        )
+        await db.commit()
+
+    response = await async_client.get("/users")
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert len(response.json()) == count
+    assert "X-Next-Cursor" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_read_user_fields(async_client):
+    """
+    /users エンドポイントの fields パラメータをテストする。
+
+    - fields を指定した場合、指定したフィールドと user_id のみが返却されることを確認する。
+    """
+    for i in range(3):
+        await async_client.post(
+            "/users", json={"user_name": f"user{i}", "password": "P@ssw0rd"}
+        )
+
+    response = await async_client.get(
+        "/users", params={"limit": 2, "fields": "user_name"}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.json() == [
+        {"user_id": 1, "user_name": "user0"},
+        {"user_id": 2, "user_name": "user1"},
+    ]
+    assert "X-Next-Cursor" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_read_user_etag(async_client):
+    """
+    /users エンドポイントの ETag をテストする。
+
+    - If-None-Match が ETag と一致する場合、304 NOT MODIFIED が返却されることを確認する。
+    - ユーザーの作成やポスト数の変更で ETag が変わることを確認する。
+    - 投稿数とコメント数を含まない一覧の ETag は、ポスト数の変更では変わらないことを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.get("/users")
+    assert response.status_code == starlette.status.HTTP_200_OK
+    etag = response.headers["ETag"]
+    response = await async_client.get("/users?fields=user_name")
+    names_etag = response.headers["ETag"]
+
+    response = await async_client.get("/users", headers={"If-None-Match": etag})
+    assert response.status_code == starlette.status.HTTP_304_NOT_MODIFIED
+
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    access_token = response.json()["access_token"]
+    await async_client.post(
+        "/users/1/posts",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"contents": "ContentsTest"},
+    )
+    response = await async_client.get("/users", headers={"If-None-Match": etag})
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.json()[0]["post_count"] == 1
+    assert response.headers["ETag"] != etag
+    etag = response.headers["ETag"]
+    response = await async_client.get(
+        "/users?fields=user_name", headers={"If-None-Match": names_etag}
+    )
+    assert response.status_code == starlette.status.HTTP_304_NOT_MODIFIED
+
+    await async_client.post(
+        "/users", json={"user_name": "anonymous2", "password": "P@ssw0rd"}
+    )
+    response = await async_client.get("/users", headers={"If-None-Match": etag})
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert len(response.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_users_version_bumped_by_user_writes(async_client):
+    """
+    /users のバージョンスタンプを更新する書き込みをテストする。
+
+    - ポストの作成では、スタンプが更新されず、ユーザーの行の UPDATE が1回で済むことを確認する。
+    - ユーザーの更新では、スタンプが同じトランザクションでコミットの直前に更新されることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    async for db in app.dependency_overrides[get_db]():
+        engine = db.bind.sync_engine
+    writes = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda _conn, _cursor, statement, *_args: writes.extend(
+            re.findall(r"^(?:INSERT INTO|UPDATE) (\w+)", statement)
+        ),
+    )
+    event.listen(engine, "commit", lambda _conn: writes.append("COMMIT"))
+
+    await async_client.post(
+        "/users/1/posts", headers=headers, json={"contents": "ContentsTest"}
+    )
+    assert writes == ["users", "posts", "COMMIT"]
+
+    writes.clear()
+    await async_client.put(
+        "/users/1", headers=headers, json={"user_name": "renamed", "password": "a"}
+    )
+    assert writes == ["users", "table_versions", "COMMIT"]
+
+
+@pytest.mark.asyncio
+async def test_read_user_ndjson_stream(async_client):
+    """
+    /users エンドポイントの NDJSON ストリーミングをテストする。
+
+    - Accept に application/x-ndjson を指定した場合、全ユーザーが 1 行ずつ返却されることを確認する。
+    """
+    for i in range(3):
+        await async_client.post(
+            "/users", json={"user_name": f"user{i}", "password": "P@ssw0rd"}
+        )
+
+    response = await async_client.get(
+        "/users", params={"limit": 1}, headers={"Accept": "application/x-ndjson"}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [
+        {"user_id": 1, "user_name": "user0"},
+        {"user_id": 2, "user_name": "user1"},
+        {"user_id": 3, "user_name": "user2"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_user_cache(async_client):
+    """
+    ユーザーキャッシュをテストする。
+
+    - ユーザー作成後の認証ではユーザーがキャッシュから取得されることを確認する。
+    - ユーザー更新後は更新後のユーザー名で認証できることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    access_token = response.json()["access_token"]
+
+    response = await async_client.get(
+        "/get-current-user", headers={"Authorization": f"Bearer {access_token}"}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.json() == {"message": "anonymous"}
+    assert user_crud.get_user_cache_stats()["by_name"]["misses"] == 0
+
+    await async_client.put(
+        "/users/1",
+        headers={"Authorization": f"Bearer {access_token}"},
+        json={"user_name": "hoge", "password": "hoge"},
+    )
+    response = await async_client.post(
+        "/token", json={"user_name": "hoge", "password": "hoge"}
+    )
+    access_token = response.json()["access_token"]
+    response = await async_client.get(
+        "/get-current-user", headers={"Authorization": f"Bearer {access_token}"}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.json() == {"message": "hoge"}
+
+
+@pytest.mark.asyncio
+async def test_import_users(async_client):
+    """
+    /users/import エンドポイントの POST リクエストをテストする。
+
+    - 既存のユーザー名とリクエスト内で重複したユーザー名が競合として報告されることを確認する。
+    - 競合しないユーザーは作成され、ログインできることを確認する。
+    """
+    await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+
+    response = await async_client.post(
+        "/users/import",
+        json={
+            "users": [
+                {"user_name": "hoge", "password": "hoge"},
+                {"user_name": "anonymous", "password": "P@ssw0rd"},
+                {"user_name": "fuga", "password": "fuga"},
+                {"user_name": "hoge", "password": "hoge"},
+            ]
+        },
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+    assert response.json() == {
+        "created": 2,
+        "conflicts": [
+            {"index": 1, "user_name": "anonymous"},
+            {"index": 3, "user_name": "hoge"},
+        ],
+    }
+
+    response = await async_client.post(
+        "/token", json={"user_name": "fuga", "password": "fuga"}
+    )
+    assert response.status_code == starlette.status.HTTP_200_OK
+
+    response = await async_client.get("/users")
+    assert [user["user_name"] for user in response.json()] == [
+        "anonymous",
+        "hoge",
+        "fuga",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_users_cached_not_found(async_client):
+    """
+    インポート前に存在しなかったユーザーのキャッシュをテストする。
+
+    - インポート前に見つからなかったユーザー ID とユーザー名が、インポート後は取得できることを確認する。
+    """
+    async for db in app.dependency_overrides[get_db]():
+        assert await user_crud.get_user_by_id(db=db, user_id=1) is None
+        assert await user_crud.get_user_by_name(db=db, user_name="hoge") is None
+
+    response = await async_client.post(
+        "/users/import", json={"users": [{"user_name": "hoge", "password": "hoge"}]}
+    )
+    assert response.json()["created"] == 1
+
+    async for db in app.dependency_overrides[get_db]():
+        user = await user_crud.get_user_by_id(db=db, user_id=1)
+        assert user.user_name == "hoge"
+        user = await user_crud.get_user_by_name(db=db, user_name="hoge")
+        assert user.user_id == 1
+
+
+@pytest.mark.asyncio
+async def test_user_counts(async_client):
+    """
+    ユーザーの投稿数とコメント数をテストする。
+
+    - 投稿とコメントの作成・削除に合わせて /users の投稿数とコメント数が更新されることを確認する。
+    - 投稿の削除で削除されたコメントが、コメントしたユーザーのコメント数から差し引かれることを確認する。
+    """
+    response = await async_client.post(
+        "/users", json={"user_name": "anonymous", "password": "P@ssw0rd"}
+    )
+    assert response.json()["post_count"] == 0
+    assert response.json()["comment_count"] == 0
+    await async_client.post("/users", json={"user_name": "hoge", "password": "hoge"})
+    headers = {}
+    for user_name, password in (("anonymous", "P@ssw0rd"), ("hoge", "hoge")):
+        response = await async_client.post(
+            "/token", json={"user_name": user_name, "password": password}
+        )
+        headers[user_name] = {
+            "Authorization": f"Bearer {response.json()['access_token']}"
+        }
+    await async_client.post(
+        "/users/1/posts/bulk",
+        headers=headers["anonymous"],
+        json={"posts": [{"contents": "1"}, {"contents": "2"}]},
+    )
+    await async_client.post(
+        "/users/1/posts", headers=headers["anonymous"], json={"contents": "3"}
+    )
+    for _ in range(2):
+        await async_client.post(
+            "/users/1/posts/1/comments", headers=headers["hoge"], json={"contents": "a"}
+        )
+    await async_client.post(
+        "/users/1/posts/2/comments", headers=headers["hoge"], json={"contents": "b"}
+    )
+    await async_client.post(
+        "/users/1/posts/2/comments",
+        headers=headers["anonymous"],
+        json={"contents": "c"},
+    )
+
+    response = await async_client.get("/users")
+    assert [
+        (user["post_count"], user["comment_count"]) for user in response.json()
+    ] == [(3, 1), (0, 3)]
+
+    await async_client.delete("/users/1/posts/1", headers=headers["anonymous"])
+    await async_client.delete("/users/1/posts/2/comments/3", headers=headers["hoge"])
+
+    response = await async_client.get("/users")
+    assert [
+        (user["post_count"], user["comment_count"]) for user in response.json()
+    ] == [(2, 1), (0, 0)]
+
+
+@pytest.mark.asyncio
+async def test_reconcile_counts(async_client):
+    """
+    投稿数とコメント数の修復をテストする。
+
+    - 実際の件数とずれた投稿数とコメント数がバッチごとに修復されることを確認する。
+    """
+    for user_name in ("anonymous", "hoge", "fuga"):
+        await async_client.post(
+            "/users", json={"user_name": user_name, "password": "P@ssw0rd"}
+        )
+
+    async for db in app.dependency_overrides[get_db]():
+        db.add_all([model.Post(user_id=1, contents="a") for _ in range(2)])
+        db.add(model.Comment(user_id=3, post_id=1, contents="b"))
+        await db.commit()
+
+        repaired = await counter.reconcile_counts(db, batch_size=2)
+        assert repaired == 2
+        assert await counter.reconcile_counts(db, batch_size=2) == 0
+
+    response = await async_client.get("/users")
+    assert [
+        (user["post_count"], user["comment_count"]) for user in response.json()
+    ] == [(2, 0), (0, 0), (0, 1)]